@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import gc
+import os
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+# Um worker por padrao: base ingerida, reload, watcher, rate limits e cache de tokens vivem
+# na memoria de cada processo e nao sao coordenados entre workers.
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+
+# O mestre carrega a base e o modelo uma unica vez; os workers herdam tudo por copy-on-write.
+preload_app = True
+os.environ.setdefault("APP_PRELOAD", "true")
+
+
+def when_ready(server):
+    # Congela os objetos do mestre para o GC dos workers nao reescrever as paginas compartilhadas.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from radar_preventivo import prepare_worker
+
+    prepare_worker(worker.app.wsgi())
@@ -2,14 +2,19 @@ from __future__ import annotations
 
 from flask import Flask, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from .auth.service import AuthService
 from .config import AppSettings
 from .repositories.dataset_repository import CsvDatasetRepository
-from .repositories.user_repository import JsonUserRepository
+from .repositories.user_repository import build_user_repository
+from .routes.admin import admin_bp
+from .routes.analytics import analytics_bp
 from .routes.auth import auth_bp
 from .routes.health import health_bp
 from .routes.predictions import predictions_bp
+from .services.admission import RequestRateLimiter
+from .services.dataset_watcher import DatasetWatcher
 from .services.prediction_service import PredictionService
 
 
@@ -20,6 +25,9 @@ def create_app(overrides: dict | None = None) -> Flask:
     app.config["SECRET_KEY"] = settings.secret_key
     app.config["JSON_SORT_KEYS"] = False
     app.config["SETTINGS"] = settings
+    if settings.trust_proxy_hops > 0:
+        # Atras do proxy da plataforma, o IP do cliente vem do X-Forwarded-For.
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=settings.trust_proxy_hops)
 
     CORS(
         app,
@@ -34,21 +42,39 @@ def create_app(overrides: dict | None = None) -> Flask:
     )
     app.extensions["auth_service"] = AuthService(
         settings=settings,
-        user_repository=JsonUserRepository(settings),
+        user_repository=build_user_repository(settings),
     )
 
+    app.extensions["rate_limiter"] = RequestRateLimiter(settings)
+
     prediction_service: PredictionService = app.extensions["prediction_service"]
     prediction_service.initialize()
 
+    app.extensions["dataset_watcher"] = DatasetWatcher(
+        prediction_service=prediction_service,
+        poll_seconds=settings.dataset_poll_seconds,
+    )
+    if not settings.preload_app:
+        app.extensions["dataset_watcher"].start()
+
     register_blueprints(app)
     register_root_routes(app)
     return app
 
 
+def prepare_worker(app: Flask) -> None:
+    # Chamado em cada worker do gunicorn depois do fork de um app pre-carregado.
+    app.extensions["prediction_service"].after_fork()
+    app.extensions["auth_service"].after_fork()
+    app.extensions["dataset_watcher"].start()
+
+
 def register_blueprints(app: Flask) -> None:
     app.register_blueprint(health_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(predictions_bp)
+    app.register_blueprint(analytics_bp)
+    app.register_blueprint(admin_bp)
 
 
 def register_root_routes(app: Flask) -> None:
@@ -62,6 +88,18 @@ def register_root_routes(app: Flask) -> None:
                 "predictor_mode": settings.predictor_mode,
                 "auth_enabled": True,
                 "public_endpoints": ["/", "/health", "/auth/login"],
-                "protected_endpoints": ["/auth/me", "/auth/users", "/predict"],
+                "protected_endpoints": [
+                    "/auth/me",
+                    "/auth/users",
+                    "/predict",
+                    "/predict/range",
+                    "/drivers/<nome>",
+                    "/locations/<nome>",
+                    "/hotspots",
+                    "/heatmap",
+                    "/health/stats",
+                    "/admin/reload",
+                    "/admin/ingest",
+                ],
             }
         )
@@ -1,4 +1,4 @@
-from .decorators import auth_required
+from .decorators import auth_required, rate_limited, rejection_response
 from .service import AuthService
 
-__all__ = ["auth_required", "AuthService"]
+__all__ = ["auth_required", "rate_limited", "rejection_response", "AuthService"]
@@ -5,6 +5,7 @@ from functools import wraps
 from flask import current_app, g, jsonify, request
 
 from radar_preventivo.auth.service import AuthService
+from radar_preventivo.services.admission import AdmissionRejected, RequestRateLimiter
 
 
 def auth_required(*allowed_roles: str):
@@ -22,6 +23,7 @@ def auth_required(*allowed_roles: str):
                 return jsonify({"error": "Seu perfil nao possui permissao para este recurso."}), 403
 
             g.current_user = user
+            g.auth_token = token
             return view_func(*args, **kwargs)
 
         return wrapper
@@ -29,6 +31,30 @@ def auth_required(*allowed_roles: str):
     return decorator
 
 
+def rate_limited(view_func):
+    # Aplicado depois de auth_required: usa o usuario autenticado quando houver.
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        rate_limiter: RequestRateLimiter = current_app.extensions["rate_limiter"]
+        current_user = g.get("current_user")
+        try:
+            rate_limiter.check(
+                current_user.id if current_user is not None else None,
+                request.remote_addr,
+            )
+        except AdmissionRejected as exc:
+            return rejection_response(exc)
+        return view_func(*args, **kwargs)
+
+    return wrapper
+
+
+def rejection_response(exc: AdmissionRejected):
+    response = jsonify({"error": str(exc)})
+    response.headers["Retry-After"] = str(exc.retry_after)
+    return response, exc.status_code
+
+
 def _extract_bearer_token(authorization_header: str | None) -> str | None:
     if not authorization_header:
         return None
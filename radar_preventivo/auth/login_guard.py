@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from radar_preventivo.auth.security import verify_password
+from radar_preventivo.services.admission import AdmissionRejected
+
+
+class LoginRejected(AdmissionRejected):
+    pass
+
+
+class PasswordVerifier:
+    def __init__(self, workers: int, queue_limit: int, timeout_seconds: float) -> None:
+        self.workers = max(int(workers), 0)
+        self.queue_limit = max(int(queue_limit), 0)
+        self.timeout_seconds = float(timeout_seconds)
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1) + self.queue_limit)
+        self._in_flight = 0
+        self._rejected = 0
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        # Sem slot livre a resposta e imediata: rajadas de login nao ocupam as threads do gunicorn.
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise LoginRejected("Muitos logins simultaneos. Tente novamente em instantes.", 429, 1)
+
+        with self._lock:
+            self._in_flight += 1
+        if self.workers == 0:
+            try:
+                return verify_password(password, password_hash)
+            finally:
+                self._release_slot()
+
+        try:
+            future = self._get_executor().submit(verify_password, password, password_hash)
+        except (BrokenProcessPool, RuntimeError):
+            self._release_slot()
+            self._reset_executor()
+            raise LoginRejected("Verificacao de senha indisponivel.", 503, 5) from None
+
+        # O slot so volta quando o processo termina, mesmo que esta requisicao desista antes.
+        future.add_done_callback(lambda _future: self._release_slot())
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            raise LoginRejected("Verificacao de senha demorou demais.", 503, 5) from None
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise LoginRejected("Verificacao de senha indisponivel.", 503, 5) from None
+
+    def after_fork(self) -> None:
+        # O pool do mestre nao pertence ao worker; cada worker cria o seu no primeiro login.
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1) + self.queue_limit)
+        self._in_flight = 0
+        self._executor = None
+        self._executor_pid = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor_pid != os.getpid():
+                self._executor = None
+            if self._executor is None:
+                # "spawn" evita herdar locks de threads do processo web no filho.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+
+class LoginThrottle:
+    def __init__(self, window_seconds: float, max_keys: int = 10_000) -> None:
+        self.window_seconds = float(window_seconds)
+        self.max_keys = max_keys
+        self._failures: OrderedDict[str, deque[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, limits: dict[str, int]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key, limit in limits.items():
+                failures = self._recent_failures(key, now)
+                if limit > 0 and failures is not None and len(failures) >= limit:
+                    raise LoginRejected(
+                        "Muitas tentativas de login. Aguarde antes de tentar novamente.",
+                        429,
+                        failures[0] + self.window_seconds - now,
+                    )
+
+    def record_failure(self, keys: list[str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                failures = self._recent_failures(key, now)
+                if failures is None:
+                    failures = self._failures[key] = deque()
+                failures.append(now)
+                self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def _recent_failures(self, key: str, now: float) -> deque[float] | None:
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
@@ -2,25 +2,54 @@ from __future__ import annotations
 
 from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
 
+from radar_preventivo.auth.login_guard import LoginThrottle, PasswordVerifier
+from radar_preventivo.auth.token_cache import TokenCache
 from radar_preventivo.config import AppSettings
 from radar_preventivo.models import ROLE_PROFILES, UserRecord
-from radar_preventivo.repositories.user_repository import JsonUserRepository
+from radar_preventivo.repositories.user_repository import UserRepository
 
 
 class AuthService:
-    def __init__(self, settings: AppSettings, user_repository: JsonUserRepository) -> None:
+    def __init__(self, settings: AppSettings, user_repository: UserRepository) -> None:
         self.settings = settings
         self.user_repository = user_repository
         self.serializer = URLSafeTimedSerializer(settings.secret_key, salt="radar-preventivo-auth")
+        self.token_cache = TokenCache(settings.token_cache_size, settings.token_cache_ttl_seconds)
+        self.password_verifier = PasswordVerifier(
+            workers=settings.login_workers,
+            queue_limit=settings.login_queue_limit,
+            timeout_seconds=settings.login_timeout_seconds,
+        )
+        self.login_throttle = LoginThrottle(settings.login_throttle_window_seconds)
+
+    def authenticate(
+        self,
+        email: str,
+        password: str,
+        client_ip: str | None = None,
+    ) -> dict | None:
+        email_key = f"email:{email.strip().lower()}"
+        ip_key = f"ip:{client_ip or 'desconhecido'}"
+        # Bloqueio checado antes do PBKDF2: tentativas em excesso nao consomem CPU.
+        self.login_throttle.check(
+            {
+                email_key: self.settings.login_email_max_failures,
+                ip_key: self.settings.login_ip_max_failures,
+            }
+        )
 
-    def authenticate(self, email: str, password: str) -> dict | None:
         user = self.user_repository.get_by_email(email)
-        if not user or not self.user_repository.verify(user, password):
+        if not user or not self.password_verifier.verify(password, user.password_hash):
+            self.login_throttle.record_failure([email_key, ip_key])
             return None
 
+        self.login_throttle.reset(email_key)
         token = self._issue_token(user)
         return self.build_session_payload(user=user, token=token)
 
+    def after_fork(self) -> None:
+        self.password_verifier.after_fork()
+
     def _issue_token(self, user: UserRecord) -> str:
         return self.serializer.dumps(
             {
@@ -34,12 +63,37 @@ class AuthService:
         if not token:
             return None
 
+        token_key = self.token_cache.key_for(token)
+        users_version = self.user_repository.users_version()
+        cached_user = self.token_cache.get(token_key, users_version)
+        if cached_user is not None:
+            return cached_user
+
         try:
-            payload = self.serializer.loads(token, max_age=self.settings.token_ttl_seconds)
+            payload, issued_at = self.serializer.loads(
+                token,
+                max_age=self.settings.token_ttl_seconds,
+                return_timestamp=True,
+            )
         except (BadSignature, SignatureExpired):
             return None
 
-        return self.user_repository.get_by_email(payload.get("email"))
+        # Busca pelo id indexado; trocar o email do usuario invalida os tokens antigos.
+        user = self.user_repository.get_by_id(payload.get("sub"))
+        if user is None or user.email != payload.get("email"):
+            return None
+
+        self.token_cache.put(
+            token_key,
+            user,
+            token_expires_at=issued_at.timestamp() + self.settings.token_ttl_seconds,
+            users_version=users_version,
+        )
+        return user
+
+    def forget_token(self, token: str | None) -> None:
+        if token:
+            self.token_cache.discard(self.token_cache.key_for(token))
 
     def build_session_payload(self, user: UserRecord, token: str) -> dict:
         role_profile = ROLE_PROFILES.get(user.role)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass
+from typing import Any
+
+from radar_preventivo.models import UserRecord
+
+
+@dataclass(frozen=True, slots=True)
+class CachedToken:
+    user: UserRecord
+    expires_at: float
+
+
+class TokenCache:
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max(int(max_entries), 0)
+        self.ttl_seconds = float(ttl_seconds)
+        self._entries: OrderedDict[bytes, CachedToken] = OrderedDict()
+        self._lock = threading.Lock()
+        self._users_version: Hashable = None
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def key_for(token: str) -> bytes:
+        # Guarda so o digest: o token em si nunca fica residente no cache.
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes, users_version: Hashable) -> UserRecord | None:
+        with self._lock:
+            self._sync_users_version(users_version)
+            cached = self._entries.get(key)
+            if cached is None:
+                self._misses += 1
+                return None
+            if cached.expires_at <= time.time():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return cached.user
+
+    def put(
+        self,
+        key: bytes,
+        user: UserRecord,
+        token_expires_at: float,
+        users_version: Hashable,
+    ) -> None:
+        if self.max_entries == 0 or self.ttl_seconds <= 0:
+            return
+
+        # Nunca alem da expiracao do proprio token.
+        expires_at = min(time.time() + self.ttl_seconds, token_expires_at)
+        with self._lock:
+            self._sync_users_version(users_version)
+            self._entries[key] = CachedToken(user=user, expires_at=expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def discard(self, key: bytes) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "expirations": self._expirations,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _sync_users_version(self, users_version: Hashable) -> None:
+        # Base de usuarios recarregada (ou usuario desativado): nenhuma entrada antiga vale mais.
+        if users_version != self._users_version:
+            if self._entries:
+                self._entries.clear()
+                self._invalidations += 1
+            self._users_version = users_version
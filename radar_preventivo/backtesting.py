@@ -0,0 +1,223 @@
+"""Backtest com origem movel dos motores de previsao registrados.
+
+Para cada origem, treina o motor com os dias anteriores, preve o horizonte
+e compara com o total diario observado. O relatorio JSON traz MAE/MAPE por
+passo do horizonte, tempos de ajuste e de previsao e o pico do heap Python.
+
+Uso:
+    python -m radar_preventivo.backtesting --folds 8 --step 7 --horizon 14
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+import tracemalloc
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from radar_preventivo.config import AppSettings
+from radar_preventivo.repositories.dataset_repository import CsvDatasetRepository
+from radar_preventivo.services.prediction_service import PredictionService
+from radar_preventivo.services.predictors import (
+    PREDICTOR_BACKENDS,
+    StatelessPredictorBackend,
+    build_predictor_backend,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def daily_actuals(training_df: pd.DataFrame) -> pd.Series:
+    actuals = training_df.groupby(pd.to_datetime(training_df["ds"]).dt.normalize())["y"].sum()
+    return actuals.asfreq("D", fill_value=0).astype("float64")
+
+
+def rolling_origins(actuals: pd.Series, horizon: int, folds: int, step: int) -> list[pd.Timestamp]:
+    last_origin = actuals.index[-1] - pd.Timedelta(days=horizon - 1)
+    origins = [last_origin - pd.Timedelta(days=step * fold) for fold in range(folds)]
+    # Cada origem precisa de pelo menos duas semanas de historico para os motores sazonais.
+    minimum_origin = actuals.index[0] + pd.Timedelta(days=14)
+    return sorted(origin for origin in origins if origin >= minimum_origin)
+
+
+def backtest_backend(
+    backend_factory,
+    training_df: pd.DataFrame,
+    actuals: pd.Series,
+    origins: list[pd.Timestamp],
+    horizon: int,
+) -> dict[str, Any]:
+    errors = np.full((len(origins), horizon), np.nan)
+    fit_seconds = []
+    predict_seconds = []
+    peak_heap_bytes = 0
+    backend_name = None
+    fits_in_forecast = False
+    event_days = pd.to_datetime(training_df["ds"]).dt.normalize()
+
+    for fold, origin in enumerate(origins):
+        fold_training_df = training_df.loc[event_days < origin].reset_index(drop=True)
+        backend = backend_factory()
+        backend_name = backend.backend_name
+        # Motores sem estado ajustam dentro de forecast(): o tempo de ajuste deles sai perto de zero.
+        fits_in_forecast = isinstance(backend, StatelessPredictorBackend)
+
+        # tracemalloc so enxerga o heap Python; buffers nativos (NumPy, torch) ficam de fora.
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        model_ready = backend.ensure_trained(fold_training_df, wait=True)
+        fitted_at = time.perf_counter()
+        if not model_ready:
+            tracemalloc.stop()
+            raise RuntimeError(backend.training_state().get("last_error") or "modelo nao treinou")
+        forecast = backend.forecast(fold_training_df, periods=horizon)
+        predict_seconds.append(time.perf_counter() - fitted_at)
+        fit_seconds.append(fitted_at - started_at)
+        peak_heap_bytes = max(peak_heap_bytes, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        forecast_by_day = pd.Series(
+            forecast["yhat1"].to_numpy(dtype="float64"),
+            index=pd.to_datetime(forecast["ds"]).dt.normalize(),
+        )
+        expected_days = pd.date_range(origin, periods=horizon, freq="D")
+        predicted = forecast_by_day.groupby(level=0).sum().reindex(expected_days)
+        errors[fold] = predicted.to_numpy() - actuals.reindex(expected_days).to_numpy()
+
+    observed = np.vstack(
+        [actuals.reindex(pd.date_range(origin, periods=horizon, freq="D")) for origin in origins]
+    )
+    absolute_errors = np.abs(errors)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentage_errors = np.where(observed > 0, absolute_errors / observed * 100, np.nan)
+
+    return {
+        "backend_name": backend_name,
+        "status": "ok",
+        "mae": _round_metric(np.nanmean(absolute_errors)),
+        "mape": _round_metric(_nanmean(percentage_errors)),
+        "mae_by_horizon": [_round_metric(value) for value in np.nanmean(absolute_errors, axis=0)],
+        "mape_by_horizon": [_round_metric(_nanmean(column)) for column in percentage_errors.T],
+        "fit_seconds": _timing_summary(fit_seconds),
+        "predict_seconds": _timing_summary(predict_seconds),
+        "fits_in_forecast": fits_in_forecast,
+        "python_heap_peak_mb": round(peak_heap_bytes / (1024 * 1024), 3),
+    }
+
+
+def run_backtest(
+    training_df: pd.DataFrame,
+    settings: AppSettings,
+    modes: Iterable[str] | None = None,
+    horizon: int = 14,
+    folds: int = 8,
+    step: int = 7,
+) -> dict[str, Any]:
+    actuals = daily_actuals(training_df)
+    origins = rolling_origins(actuals, horizon, folds, step)
+    if not origins:
+        raise ValueError("Historico curto demais para o horizonte e o numero de origens pedidos.")
+
+    # O backtest precisa medir o ajuste real, sem reaproveitar modelos salvos.
+    backtest_settings = settings.with_overrides({"model_store_enabled": False})
+    results: dict[str, Any] = {}
+    for mode in modes or sorted(PREDICTOR_BACKENDS):
+        mode_settings = backtest_settings.with_overrides({"predictor_mode": mode})
+        try:
+            results[mode] = backtest_backend(
+                lambda: build_predictor_backend(mode_settings),
+                training_df,
+                actuals,
+                origins,
+                horizon,
+            )
+        except Exception as exc:
+            logger.warning("Backtest do modo %s falhou: %s", mode, exc)
+            results[mode] = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+
+    ranking = sorted(
+        (mode for mode, result in results.items() if result["status"] == "ok"),
+        key=lambda mode: results[mode]["mae"],
+    )
+    return {
+        "generated_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        "horizon_days": horizon,
+        "step_days": step,
+        "origins": [origin.date().isoformat() for origin in origins],
+        "history_start": actuals.index[0].date().isoformat(),
+        "history_end": actuals.index[-1].date().isoformat(),
+        "backends": results,
+        "ranking_by_mae": ranking,
+    }
+
+
+def _nanmean(values: np.ndarray) -> float | None:
+    finite_values = values[~np.isnan(values)]
+    return float(finite_values.mean()) if finite_values.size else None
+
+
+def _round_metric(value: float | None) -> float | None:
+    if value is None or np.isnan(value):
+        return None
+    return round(float(value), 4)
+
+
+def _timing_summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "mean": round(float(np.mean(samples)), 6),
+        "max": round(float(np.max(samples)), 6),
+    }
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    settings = AppSettings.from_env()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-file", type=Path, default=settings.data_file)
+    parser.add_argument("--horizon", type=int, default=14)
+    parser.add_argument("--folds", type=int, default=8)
+    parser.add_argument("--step", type=int, default=7)
+    parser.add_argument(
+        "--backends",
+        default=None,
+        help="Modos separados por virgula (padrao: todos os registrados).",
+    )
+    parser.add_argument("--output", type=Path, default=Path("backtest_report.json"))
+    args = parser.parse_args(argv)
+
+    settings = settings.with_overrides(
+        {"data_file": args.data_file, "predictor_mode": "mock", "preload_app": False}
+    )
+    service = PredictionService(settings, CsvDatasetRepository(settings))
+    training_df = service._training_frame(service._load_dataset_bundle())
+    modes = [mode.strip() for mode in args.backends.split(",")] if args.backends else None
+
+    report = run_backtest(training_df, settings, modes, args.horizon, args.folds, args.step)
+    report["data_file"] = str(args.data_file)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    for position, mode in enumerate(report["ranking_by_mae"], start=1):
+        result = report["backends"][mode]
+        print(
+            f"{position}. {mode:<15} MAE {result['mae']:>9.2f} | "
+            f"ajuste {result['fit_seconds']['mean'] * 1000:9.2f} ms | "
+            f"previsao {result['predict_seconds']['mean'] * 1000:9.2f} ms | "
+            f"pico heap Python {result['python_heap_peak_mb']:8.2f} MB"
+            + (" | ajusta dentro da previsao" if result["fits_in_forecast"] else "")
+        )
+    for mode, result in report["backends"].items():
+        if result["status"] == "error":
+            print(f"-  {mode:<15} falhou: {result['error']}")
+    print(f"Relatorio salvo em {args.output}.")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -12,14 +12,42 @@ class AppSettings:
     data_file: Path
     dismissed_drivers_file: Path
     auth_users_file: Path
+    auth_users_db: Path
+    user_store: str
     forecast_days: int
     recent_history_days: int
     predictor_mode: str
     secret_key: str
     token_ttl_seconds: int
+    token_cache_size: int
+    token_cache_ttl_seconds: float
+    login_workers: int
+    login_queue_limit: int
+    login_timeout_seconds: float
+    login_email_max_failures: int
+    login_ip_max_failures: int
+    login_throttle_window_seconds: float
+    trust_proxy_hops: int
+    rate_limit_user_per_minute: float
+    rate_limit_user_burst: int
+    rate_limit_ip_per_minute: float
+    rate_limit_ip_burst: int
+    forecast_max_concurrency: int
     allow_demo_users: bool
     cors_origins: tuple[str, ...]
     bootstrap_prediction_date: str | None
+    prediction_cache_size: int
+    dataset_load_mode: str
+    dataset_snapshot_enabled: bool
+    cache_dir: Path | None
+    dataset_poll_seconds: float
+    model_store_enabled: bool
+    preload_app: bool
+    breakdown_mode: str
+    hierarchical_top_entities: int
+    hierarchical_workers: int
+    ranking_windows_days: tuple[int, ...]
+    ranking_half_life_days: float
 
     @classmethod
     def from_env(cls) -> "AppSettings":
@@ -39,16 +67,54 @@ class AppSettings:
                 )
             ),
             auth_users_file=Path(os.getenv("APP_AUTH_USERS_FILE", base_dir / "auth_users.json")),
+            auth_users_db=Path(os.getenv("APP_AUTH_USERS_DB", base_dir / "auth_users.sqlite3")),
+            user_store=os.getenv("APP_USER_STORE", "json").strip().lower(),
             forecast_days=int(os.getenv("FORECAST_DAYS", "45")),
             recent_history_days=int(os.getenv("RECENT_HISTORY_DAYS", "14")),
             predictor_mode=os.getenv("APP_PREDICTOR_MODE", "neuralprophet").strip().lower(),
             secret_key=os.getenv("APP_SECRET_KEY", secrets.token_urlsafe(32)),
             token_ttl_seconds=int(os.getenv("APP_TOKEN_TTL_SECONDS", str(8 * 60 * 60))),
+            token_cache_size=int(os.getenv("APP_TOKEN_CACHE_SIZE", "1024")),
+            token_cache_ttl_seconds=float(os.getenv("APP_TOKEN_CACHE_TTL_SECONDS", "300")),
+            login_workers=int(os.getenv("APP_LOGIN_WORKERS", "1")),
+            login_queue_limit=int(os.getenv("APP_LOGIN_QUEUE_LIMIT", "4")),
+            login_timeout_seconds=float(os.getenv("APP_LOGIN_TIMEOUT_SECONDS", "10")),
+            login_email_max_failures=int(os.getenv("APP_LOGIN_EMAIL_MAX_FAILURES", "5")),
+            login_ip_max_failures=int(os.getenv("APP_LOGIN_IP_MAX_FAILURES", "20")),
+            login_throttle_window_seconds=float(
+                os.getenv("APP_LOGIN_THROTTLE_WINDOW_SECONDS", "300")
+            ),
+            trust_proxy_hops=int(os.getenv("APP_TRUST_PROXY_HOPS", "0")),
+            rate_limit_user_per_minute=float(os.getenv("APP_RATE_LIMIT_USER_PER_MINUTE", "60")),
+            rate_limit_user_burst=int(os.getenv("APP_RATE_LIMIT_USER_BURST", "20")),
+            rate_limit_ip_per_minute=float(os.getenv("APP_RATE_LIMIT_IP_PER_MINUTE", "300")),
+            rate_limit_ip_burst=int(os.getenv("APP_RATE_LIMIT_IP_BURST", "60")),
+            forecast_max_concurrency=int(os.getenv("APP_FORECAST_MAX_CONCURRENCY", "2")),
             allow_demo_users=os.getenv("APP_ALLOW_DEMO_USERS", "false").lower() == "true",
             cors_origins=cors_origins,
             bootstrap_prediction_date=os.getenv("APP_BOOTSTRAP_PREDICTION_DATE"),
+            prediction_cache_size=int(os.getenv("APP_PREDICTION_CACHE_SIZE", "128")),
+            dataset_load_mode=os.getenv("APP_DATASET_LOAD_MODE", "pruned").strip().lower(),
+            dataset_snapshot_enabled=os.getenv("APP_DATASET_SNAPSHOT", "true").lower() == "true",
+            cache_dir=Path(os.environ["APP_CACHE_DIR"]) if os.getenv("APP_CACHE_DIR") else None,
+            dataset_poll_seconds=float(os.getenv("APP_DATASET_POLL_SECONDS", "0")),
+            model_store_enabled=os.getenv("APP_MODEL_STORE", "true").lower() == "true",
+            preload_app=os.getenv("APP_PRELOAD", "false").lower() == "true",
+            breakdown_mode=os.getenv("APP_BREAKDOWN_MODE", "share").strip().lower(),
+            hierarchical_top_entities=int(os.getenv("APP_HIERARCHICAL_TOP_ENTITIES", "50")),
+            hierarchical_workers=int(os.getenv("APP_HIERARCHICAL_WORKERS", "1")),
+            ranking_windows_days=tuple(
+                int(window)
+                for window in os.getenv("APP_RANKING_WINDOWS", "7,30,90").split(",")
+                if window.strip()
+            ),
+            ranking_half_life_days=float(os.getenv("APP_RANKING_HALF_LIFE_DAYS", "30")),
         )
 
+    @property
+    def resolved_cache_dir(self) -> Path:
+        return self.cache_dir or self.data_file.parent / ".radar_cache"
+
     def with_overrides(self, overrides: dict) -> "AppSettings":
         valid_overrides = {key: value for key, value in overrides.items() if hasattr(self, key)}
         return replace(self, **valid_overrides)
@@ -1,4 +1,15 @@
 from .dataset_repository import CsvDatasetRepository
-from .user_repository import JsonUserRepository
+from .user_repository import (
+    JsonUserRepository,
+    SqliteUserRepository,
+    UserRepository,
+    build_user_repository,
+)
 
-__all__ = ["CsvDatasetRepository", "JsonUserRepository"]
+__all__ = [
+    "CsvDatasetRepository",
+    "JsonUserRepository",
+    "SqliteUserRepository",
+    "UserRepository",
+    "build_user_repository",
+]
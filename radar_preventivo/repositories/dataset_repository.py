@@ -1,20 +1,148 @@
 from __future__ import annotations
 
+import hashlib
+import io
+import logging
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 
 from radar_preventivo.config import AppSettings
+from radar_preventivo.repositories.dataset_snapshot import DatasetSnapshotStore
+
+
+logger = logging.getLogger(__name__)
+
+
+EVENT_ID_COLUMN = "Id"
+REQUIRED_EVENT_COLUMNS = ("Data", "QUANTIDADE")
+FILTER_EVENT_COLUMNS = ("Empresa", "Cliente", "Frota", "Turno", "Tipo de Operação")
+CATEGORICAL_EVENT_COLUMNS = (
+    "Motorista",
+    "Localidade",
+    "Tipo de Evento",
+    "Criticidade",
+    *FILTER_EVENT_COLUMNS,
+)
+TEXT_COLUMN_FALLBACKS = {
+    "Motorista": "Nao informado",
+    "Localidade": "Nao informada",
+    "Tipo de Evento": "Nao informado",
+    "Criticidade": "Nao informada",
+}
+COORDINATE_COLUMNS = ("Lat/Long Inicial", "Lat/Long Final")
+EVENT_COLUMNS = (
+    EVENT_ID_COLUMN,
+    *REQUIRED_EVENT_COLUMNS,
+    *CATEGORICAL_EVENT_COLUMNS,
+    *COORDINATE_COLUMNS,
+)
+EVENT_DATE_FORMAT = "%d/%m/%Y %H:%M"
 
 
 class CsvDatasetRepository:
     def __init__(self, settings: AppSettings) -> None:
         self.settings = settings
+        self.snapshot_store = DatasetSnapshotStore(settings.resolved_cache_dir)
+
+    def load_prepared_events(self) -> pd.DataFrame:
+        data_file: Path = self.settings.data_file
+        if not data_file.exists():
+            raise FileNotFoundError(f"Arquivo de dados nao encontrado: {data_file}")
+
+        if not self.settings.dataset_snapshot_enabled:
+            return self.prepare_events(self.load_events())
+
+        variant = self._snapshot_variant()
+        snapshot = self.snapshot_store.load(data_file, variant)
+        if snapshot is not None:
+            logger.info("Base carregada do snapshot colunar de %s.", data_file.name)
+            return snapshot
+
+        prepared = self.prepare_events(self.load_events())
+        snapshot_file = self.snapshot_store.save(prepared, data_file, variant)
+        if snapshot_file is not None:
+            logger.info("Snapshot colunar gravado em %s.", snapshot_file)
+        return prepared
 
     def load_events(self) -> pd.DataFrame:
-        if not self.settings.data_file.exists():
-            raise FileNotFoundError(f"Arquivo de dados nao encontrado: {self.settings.data_file}")
-        return pd.read_csv(self.settings.data_file, delimiter=";")
+        data_file: Path = self.settings.data_file
+        if not data_file.exists():
+            raise FileNotFoundError(f"Arquivo de dados nao encontrado: {data_file}")
+
+        if self.settings.dataset_load_mode == "full":
+            return pd.read_csv(data_file, delimiter=";")
+
+        available_columns = pd.read_csv(data_file, delimiter=";", nrows=0).columns
+        if not set(REQUIRED_EVENT_COLUMNS).issubset(available_columns):
+            logger.warning(
+                "Layout desconhecido em %s; carregando todas as colunas do arquivo.",
+                data_file,
+            )
+            return pd.read_csv(data_file, delimiter=";")
+
+        selected_columns = [column for column in EVENT_COLUMNS if column in available_columns]
+        return pd.read_csv(
+            data_file,
+            delimiter=";",
+            usecols=selected_columns,
+            dtype=self._event_column_dtypes(selected_columns),
+        )
+
+    def parse_event_batch(self, payload: str, content_type: str | None = None) -> pd.DataFrame:
+        if not payload.strip():
+            raise ValueError("Lote de eventos vazio.")
+
+        if content_type and "json" in content_type:
+            raw_df = pd.read_json(io.StringIO(payload), lines=True, dtype=False)
+            selected_columns = [column for column in EVENT_COLUMNS if column in raw_df.columns]
+            raw_df = raw_df[selected_columns].astype(
+                {
+                    column: dtype
+                    for column, dtype in self._event_column_dtypes(selected_columns).items()
+                    if column != "Data"
+                }
+            )
+        else:
+            raw_df = pd.read_csv(
+                io.StringIO(payload),
+                delimiter=";",
+                usecols=lambda column: column in EVENT_COLUMNS,
+                dtype=self._event_column_dtypes(EVENT_COLUMNS),
+            )
+
+        if EVENT_ID_COLUMN not in raw_df.columns:
+            raise ValueError(f"Coluna '{EVENT_ID_COLUMN}' obrigatoria para ingestao incremental.")
+
+        raw_df = raw_df.dropna(subset=[EVENT_ID_COLUMN]).copy()
+        raw_df[EVENT_ID_COLUMN] = raw_df[EVENT_ID_COLUMN].astype(str).str.strip()
+        return self.prepare_events(raw_df)
+
+    @staticmethod
+    def append_events(existing_df: pd.DataFrame, batch_df: pd.DataFrame) -> pd.DataFrame:
+        absent_columns = set(existing_df.columns).difference(batch_df.columns)
+        batch_df = batch_df.reindex(columns=existing_df.columns)
+        for column in existing_df.columns:
+            if not isinstance(existing_df[column].dtype, pd.CategoricalDtype):
+                continue
+            # Como texto as categorias do lote tem o mesmo tipo das da base (union_categoricals
+            # recusa misturar float, int e str); coluna ausente recebe o rotulo de dado faltante.
+            values = batch_df[column].astype(object)
+            values = values.where(values.isna(), values.astype(str))
+            if column in absent_columns:
+                values = values.fillna(TEXT_COLUMN_FALLBACKS.get(column, "Nao informado"))
+            batch_df[column] = values.astype("category")
+
+        combined = pd.concat([existing_df, batch_df], ignore_index=True)
+        for column in existing_df.columns:
+            if isinstance(existing_df[column].dtype, pd.CategoricalDtype):
+                combined[column] = union_categoricals(
+                    [existing_df[column], batch_df[column]],
+                    sort_categories=True,
+                )
+        return combined
 
     def load_dismissed_drivers(self) -> list[str]:
         file_path: Path = self.settings.dismissed_drivers_file
@@ -40,26 +168,95 @@ class CsvDatasetRepository:
 
         cleaned = raw_df.copy()
 
-        for column, fallback in {
-            "Motorista": "Nao informado",
-            "Localidade": "Nao informada",
-            "Tipo de Evento": "Nao informado",
-            "Criticidade": "Nao informada",
-        }.items():
+        for column, fallback in TEXT_COLUMN_FALLBACKS.items():
             if column in cleaned.columns:
                 cleaned[column] = self._fill_text_column(cleaned[column], fallback)
 
+        # Nos filtros a moda atribuiria eventos sem turno ou frota a quem nao os gerou.
+        for column in FILTER_EVENT_COLUMNS:
+            if column in cleaned.columns:
+                cleaned[column] = self._fill_missing_label(cleaned[column], "Nao informado")
+
+        if any(column in cleaned.columns for column in COORDINATE_COLUMNS):
+            cleaned = self._parse_coordinates(cleaned)
+
         cleaned["QUANTIDADE"] = pd.to_numeric(cleaned["QUANTIDADE"], errors="coerce").fillna(0)
-        cleaned["Data"] = pd.to_datetime(cleaned["Data"], format="mixed", dayfirst=True, errors="coerce")
-        cleaned = cleaned.dropna(subset=["Data"]).copy()
+        cleaned["Data"] = self._parse_event_dates(cleaned["Data"])
+        cleaned = cleaned.dropna(subset=["Data"]).reset_index(drop=True)
 
         if cleaned.empty:
             raise ValueError("Nenhum dado valido restou apos a limpeza da coluna 'Data'.")
 
         return cleaned
 
+    def _snapshot_variant(self) -> str:
+        layout_digest = hashlib.blake2b(
+            "|".join(EVENT_COLUMNS).encode("utf-8"),
+            digest_size=4,
+        ).hexdigest()
+        return f"{self.settings.dataset_load_mode}-{layout_digest}"
+
+    @staticmethod
+    def _event_column_dtypes(columns) -> dict[str, str]:
+        dtypes = {EVENT_ID_COLUMN: "object", "Data": "object"}
+        dtypes.update({column: "category" for column in CATEGORICAL_EVENT_COLUMNS})
+        return {column: dtype for column, dtype in dtypes.items() if column in columns}
+
+    @staticmethod
+    def _parse_event_dates(series: pd.Series) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+
+        parsed = pd.to_datetime(series, format=EVENT_DATE_FORMAT, errors="coerce")
+        unparsed = parsed.isna() & series.notna()
+        if unparsed.any():
+            parsed.loc[unparsed] = pd.to_datetime(
+                series.loc[unparsed],
+                format="mixed",
+                dayfirst=True,
+                errors="coerce",
+            )
+        return parsed
+
+    @staticmethod
+    def _parse_coordinates(cleaned: pd.DataFrame) -> pd.DataFrame:
+        # "-22.88 , -49.60" vira Latitude/Longitude float; a posicao final cobre a inicial vazia.
+        latitude = pd.Series(np.nan, index=cleaned.index)
+        longitude = pd.Series(np.nan, index=cleaned.index)
+        for column in COORDINATE_COLUMNS:
+            if column not in cleaned.columns:
+                continue
+            parts = cleaned[column].astype("string").str.split(",", n=1, expand=True)
+            if parts.shape[1] < 2:
+                continue
+            column_latitude = pd.to_numeric(parts[0].str.strip(), errors="coerce")
+            column_longitude = pd.to_numeric(parts[1].str.strip(), errors="coerce")
+            valid = (
+                column_latitude.between(-90, 90)
+                & column_longitude.between(-180, 180)
+                & ((column_latitude != 0) | (column_longitude != 0))
+            )
+            missing = latitude.isna() & valid
+            latitude = latitude.mask(missing, column_latitude)
+            longitude = longitude.mask(missing, column_longitude)
+
+        return cleaned.drop(columns=list(COORDINATE_COLUMNS), errors="ignore").assign(
+            Latitude=latitude.astype("float64"),
+            Longitude=longitude.astype("float64"),
+        )
+
+    @staticmethod
+    def _fill_missing_label(series: pd.Series, label: str) -> pd.Series:
+        if not series.isna().any():
+            return series
+        if isinstance(series.dtype, pd.CategoricalDtype) and label not in series.cat.categories:
+            series = series.cat.add_categories([label])
+        return series.fillna(label)
+
     @staticmethod
     def _fill_text_column(series: pd.Series, fallback: str) -> pd.Series:
         mode = series.mode(dropna=True)
         replacement = mode.iloc[0] if not mode.empty else fallback
+        if isinstance(series.dtype, pd.CategoricalDtype) and replacement not in series.cat.categories:
+            series = series.cat.add_categories([replacement])
         return series.fillna(replacement)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+SNAPSHOT_FORMAT_VERSION = 1
+_META_KEY = "__meta__"
+
+
+class DatasetSnapshotStore:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def snapshot_path(self, source_file: Path, variant: str) -> Path:
+        return self.directory / f"{source_file.stem}.{variant}.snapshot.npz"
+
+    def load(self, source_file: Path, variant: str) -> pd.DataFrame | None:
+        snapshot_file = self.snapshot_path(source_file, variant)
+        if not snapshot_file.exists():
+            return None
+
+        try:
+            with np.load(snapshot_file, allow_pickle=False) as archive:
+                meta = json.loads(str(archive[_META_KEY]))
+                if not self._signature_matches(meta.get("source", {}), source_file):
+                    return None
+                return self._decode_frame(archive, meta["columns"])
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning("Snapshot invalido em %s (%s); ignorando.", snapshot_file, exc)
+            return None
+
+    def save(self, frame: pd.DataFrame, source_file: Path, variant: str) -> Path | None:
+        arrays, columns = self._encode_frame(frame)
+        if arrays is None:
+            return None
+
+        meta = {
+            "source": self._source_signature(source_file, with_digest=True),
+            "columns": columns,
+        }
+        arrays[_META_KEY] = np.array(json.dumps(meta))
+
+        snapshot_file = self.snapshot_path(source_file, variant)
+        temporary_name: str | None = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            file_descriptor, temporary_name = tempfile.mkstemp(
+                dir=self.directory,
+                suffix=".tmp",
+            )
+            with os.fdopen(file_descriptor, "wb") as handle:
+                np.savez(handle, **arrays)
+            os.replace(temporary_name, snapshot_file)
+        except OSError as exc:
+            logger.warning("Nao foi possivel gravar o snapshot %s: %s", snapshot_file, exc)
+            return None
+        finally:
+            # Depois do os.replace o temporario ja nao existe; em qualquer falha ele sai daqui.
+            if temporary_name is not None:
+                Path(temporary_name).unlink(missing_ok=True)
+        return snapshot_file
+
+    def _signature_matches(self, stored: dict[str, Any], source_file: Path) -> bool:
+        if stored.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            return False
+
+        current = self._source_signature(source_file, with_digest=False)
+        if stored.get("size") != current["size"]:
+            return False
+        if stored.get("mtime_ns") == current["mtime_ns"]:
+            return True
+        return stored.get("digest") == self._file_digest(source_file)
+
+    def _source_signature(self, source_file: Path, with_digest: bool) -> dict[str, Any]:
+        stat = source_file.stat()
+        signature: dict[str, Any] = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if with_digest:
+            signature["digest"] = self._file_digest(source_file)
+        return signature
+
+    @staticmethod
+    def _file_digest(source_file: Path) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        with source_file.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _encode_frame(frame: pd.DataFrame) -> tuple[dict[str, np.ndarray] | None, list[dict]]:
+        arrays: dict[str, np.ndarray] = {}
+        columns: list[dict] = []
+
+        for position, (name, series) in enumerate(frame.items()):
+            key = f"c{position}"
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                kind = "category"
+                codes = series.cat.codes.to_numpy()
+                categories = series.cat.categories
+            elif pd.api.types.is_datetime64_any_dtype(series):
+                if getattr(series.dt, "tz", None) is not None:
+                    return None, []
+                kind = "datetime"
+                arrays[key] = series.to_numpy(dtype="datetime64[ns]").view("int64")
+                columns.append({"name": name, "kind": kind, "key": key})
+                continue
+            elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                kind = "numeric"
+                arrays[key] = series.to_numpy()
+                columns.append({"name": name, "kind": kind, "key": key})
+                continue
+            elif series.dtype == object:
+                kind = "object"
+                codes, categories = pd.factorize(series, use_na_sentinel=True)
+                categories = pd.Index(categories)
+            else:
+                return None, []
+
+            if not all(isinstance(value, str) for value in categories):
+                return None, []
+
+            arrays[key] = np.asarray(codes, dtype=np.int32)
+            arrays[f"{key}_values"] = np.asarray(categories.tolist(), dtype=str)
+            columns.append({"name": name, "kind": kind, "key": key})
+
+        return arrays, columns
+
+    @staticmethod
+    def _decode_frame(archive: Any, columns: list[dict]) -> pd.DataFrame:
+        data: dict[str, Any] = {}
+        for column in columns:
+            values = archive[column["key"]]
+            if column["kind"] == "datetime":
+                data[column["name"]] = pd.to_datetime(values.view("datetime64[ns]"))
+            elif column["kind"] == "numeric":
+                data[column["name"]] = values
+            else:
+                categories = archive[f"{column['key']}_values"].astype(object)
+                decoded = pd.Categorical.from_codes(values, categories=categories)
+                data[column["name"]] = (
+                    decoded if column["kind"] == "category" else np.asarray(decoded, dtype=object)
+                )
+        return pd.DataFrame(data)
@@ -1,41 +1,63 @@
 from __future__ import annotations
 
 import json
-from functools import cached_property
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Hashable
+from dataclasses import dataclass
+from pathlib import Path
 
-from radar_preventivo.auth.security import hash_password, verify_password
 from radar_preventivo.config import AppSettings
 from radar_preventivo.models import ROLE_PROFILES, UserRecord
 
 
-class JsonUserRepository:
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class UserIndex:
+    active_users: tuple[UserRecord, ...]
+    by_email: dict[str, UserRecord]
+    by_id: dict[str, UserRecord]
+    signature: tuple[int, int] | None = None
+
+    @classmethod
+    def build(
+        cls,
+        users: list[UserRecord],
+        signature: tuple[int, int] | None = None,
+    ) -> "UserIndex":
+        active_users = tuple(user for user in users if user.active)
+        return cls(
+            active_users=active_users,
+            by_email={user.email.lower(): user for user in active_users},
+            by_id={user.id: user for user in active_users},
+            signature=signature,
+        )
+
+
+class UserRepository(ABC):
     def __init__(self, settings: AppSettings) -> None:
         self.settings = settings
 
-    @cached_property
-    def _users(self) -> list[UserRecord]:
-        if self.settings.auth_users_file.exists():
-            payload = json.loads(self.settings.auth_users_file.read_text(encoding="utf-8"))
-            return [self._to_user(record) for record in payload]
+    @abstractmethod
+    def list_users(self) -> list[UserRecord]: ...
 
-        if self.settings.allow_demo_users:
-            return self._demo_users()
+    @abstractmethod
+    def get_by_email(self, email: str | None) -> UserRecord | None: ...
 
-        return []
+    @abstractmethod
+    def get_by_id(self, user_id: str | None) -> UserRecord | None: ...
 
-    def list_users(self) -> list[UserRecord]:
-        return [user for user in self._users if user.active]
-
-    def get_by_email(self, email: str | None) -> UserRecord | None:
-        normalized_email = (email or "").strip().lower()
-        for user in self.list_users():
-            if user.email.lower() == normalized_email:
-                return user
-        return None
+    @abstractmethod
+    def users_version(self) -> Hashable: ...
 
     @staticmethod
-    def verify(user: UserRecord, password: str) -> bool:
-        return verify_password(password, user.password_hash)
+    def _normalize_email(email: str | None) -> str:
+        return (email or "").strip().lower()
 
     def _to_user(self, record: dict) -> UserRecord:
         role = record["role"].strip().lower()
@@ -52,27 +74,37 @@ class JsonUserRepository:
         )
 
     def _demo_users(self) -> list[UserRecord]:
+        # Hashes pre-calculados das senhas do README: subir em modo demo nao roda PBKDF2.
         seed_users = [
             {
                 "id": "admin-demo",
                 "name": "Admin Demo",
                 "email": "admin@radar.local",
                 "role": "admin",
-                "password": "Admin123!",
+                "password_hash": (
+                    "pbkdf2_sha256$390000$radar-demo-admin$"
+                    "0SgEU52z4WC_FK7DACK1aqPSsIcxWqa3b-h-6t70vy8"
+                ),
             },
             {
                 "id": "gestor-demo",
                 "name": "Gestor Demo",
                 "email": "gestor@radar.local",
                 "role": "gestor",
-                "password": "Gestor123!",
+                "password_hash": (
+                    "pbkdf2_sha256$390000$radar-demo-gestor$"
+                    "be69_1OrjOODbmDbWvCnsEAKI4OOQb0WVEsYYQDylms"
+                ),
             },
             {
                 "id": "analista-demo",
                 "name": "Analista Demo",
                 "email": "analista@radar.local",
                 "role": "analista",
-                "password": "Analista123!",
+                "password_hash": (
+                    "pbkdf2_sha256$390000$radar-demo-analista$"
+                    "wb-n_rQ4oSSB69rDIz9ge00J3nwoZHdzWAqnNYk9tRw"
+                ),
             },
         ]
 
@@ -82,7 +114,194 @@ class JsonUserRepository:
                 name=record["name"],
                 email=record["email"],
                 role=record["role"],
-                password_hash=hash_password(record["password"]),
+                password_hash=record["password_hash"],
             )
             for record in seed_users
         ]
+
+
+class JsonUserRepository(UserRepository):
+    def __init__(self, settings: AppSettings) -> None:
+        super().__init__(settings)
+        self._index: UserIndex | None = None
+        self._index_lock = threading.Lock()
+
+    def list_users(self) -> list[UserRecord]:
+        return list(self._current_index().active_users)
+
+    def get_by_email(self, email: str | None) -> UserRecord | None:
+        return self._current_index().by_email.get(self._normalize_email(email))
+
+    def get_by_id(self, user_id: str | None) -> UserRecord | None:
+        return self._current_index().by_id.get(str(user_id or ""))
+
+    def users_version(self) -> Hashable:
+        return self._current_index().signature
+
+    def _current_index(self) -> UserIndex:
+        signature = self._file_signature()
+        index = self._index
+        if index is not None and index.signature == signature:
+            return index
+
+        with self._index_lock:
+            index = self._index
+            if index is None or index.signature != signature:
+                index = self._load_index(signature, previous=index)
+                # Troca atomica: leitores concorrentes veem o indice antigo ou o novo inteiro.
+                self._index = index
+        return index
+
+    def _load_index(
+        self,
+        signature: tuple[int, int] | None,
+        previous: UserIndex | None,
+    ) -> UserIndex:
+        users_file: Path = self.settings.auth_users_file
+        if signature is None:
+            users = self._demo_users() if self.settings.allow_demo_users else []
+            return UserIndex.build(users)
+
+        try:
+            payload = json.loads(users_file.read_text(encoding="utf-8"))
+            users = [self._to_user(record) for record in payload]
+        except (OSError, ValueError, KeyError, AttributeError) as exc:
+            if previous is None:
+                raise
+            logger.warning(
+                "Usuarios mantidos; falha ao recarregar %s: %s", users_file, exc
+            )
+            return UserIndex(
+                active_users=previous.active_users,
+                by_email=previous.by_email,
+                by_id=previous.by_id,
+                signature=signature,
+            )
+
+        logger.info("%s usuarios carregados de %s.", len(users), users_file.name)
+        return UserIndex.build(users, signature)
+
+    def _file_signature(self) -> tuple[int, int] | None:
+        try:
+            stat = self.settings.auth_users_file.stat()
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+
+class SqliteUserRepository(UserRepository):
+    _schema = """
+        CREATE TABLE IF NOT EXISTS users (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            role TEXT NOT NULL,
+            password_hash TEXT NOT NULL,
+            active INTEGER NOT NULL DEFAULT 1
+        )
+    """
+    _columns = "id, name, email, role, password_hash, active"
+
+    def __init__(self, settings: AppSettings) -> None:
+        super().__init__(settings)
+        self.database_file: Path = settings.auth_users_db
+        self._local = threading.local()
+        self._initialize()
+
+    def list_users(self) -> list[UserRecord]:
+        rows = self._connection().execute(
+            f"SELECT {self._columns} FROM users WHERE active = 1 ORDER BY email"
+        )
+        return [self._row_to_user(row) for row in rows]
+
+    def get_by_email(self, email: str | None) -> UserRecord | None:
+        return self._fetch_one("email", self._normalize_email(email))
+
+    def get_by_id(self, user_id: str | None) -> UserRecord | None:
+        return self._fetch_one("id", str(user_id or ""))
+
+    def users_version(self) -> Hashable:
+        # Sem WAL, todo commit (deste ou de outro processo) altera tamanho ou mtime do arquivo.
+        try:
+            stat = self.database_file.stat()
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def upsert_users(self, users: list[UserRecord]) -> int:
+        with self._connection() as connection:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO users ({self._columns}) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        user.id,
+                        user.name,
+                        user.email,
+                        user.role,
+                        user.password_hash,
+                        int(user.active),
+                    )
+                    for user in users
+                ],
+            )
+        return len(users)
+
+    def _initialize(self) -> None:
+        self.database_file.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.execute(self._schema)
+        connection.commit()
+        if connection.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None:
+            return
+
+        # Banco novo: importa o JSON existente ou, em modo demo, os usuarios de demonstracao.
+        if self.settings.auth_users_file.exists():
+            payload = json.loads(self.settings.auth_users_file.read_text(encoding="utf-8"))
+            imported = self.upsert_users([self._to_user(record) for record in payload])
+            logger.info("%s usuarios importados para %s.", imported, self.database_file.name)
+        elif self.settings.allow_demo_users:
+            self.upsert_users(self._demo_users())
+
+    def _fetch_one(self, column: str, value: str) -> UserRecord | None:
+        row = self._connection().execute(
+            f"SELECT {self._columns} FROM users WHERE {column} = ? AND active = 1",
+            (value,),
+        ).fetchone()
+        return self._row_to_user(row) if row is not None else None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Uma conexao por thread e por processo: conexoes herdadas no fork nao sao seguras.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.database_file)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _row_to_user(row: tuple) -> UserRecord:
+        user_id, name, email, role, password_hash, active = row
+        return UserRecord(
+            id=user_id,
+            name=name,
+            email=email,
+            role=role,
+            password_hash=password_hash,
+            active=bool(active),
+        )
+
+
+USER_REPOSITORIES = {
+    "json": JsonUserRepository,
+    "sqlite": SqliteUserRepository,
+}
+
+
+def build_user_repository(settings: AppSettings) -> UserRepository:
+    repository_class = USER_REPOSITORIES.get(settings.user_store)
+    if repository_class is None:
+        raise ValueError(
+            f"APP_USER_STORE desconhecido: {settings.user_store}. "
+            f"Use um de: {', '.join(sorted(USER_REPOSITORIES))}."
+        )
+    return repository_class(settings)
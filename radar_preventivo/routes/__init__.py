@@ -1,5 +1,7 @@
+from .admin import admin_bp
+from .analytics import analytics_bp
 from .auth import auth_bp
 from .health import health_bp
 from .predictions import predictions_bp
 
-__all__ = ["auth_bp", "health_bp", "predictions_bp"]
+__all__ = ["admin_bp", "analytics_bp", "auth_bp", "health_bp", "predictions_bp"]
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from flask import Blueprint, current_app, jsonify, request
+
+from radar_preventivo.auth import auth_required
+from radar_preventivo.services import PredictionService
+
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
+
+
+@admin_bp.post("/reload")
+@auth_required("admin")
+def reload_dataset():
+    prediction_service: PredictionService = current_app.extensions["prediction_service"]
+
+    try:
+        return jsonify(prediction_service.reload())
+    except (FileNotFoundError, ValueError) as exc:
+        return jsonify({"error": f"Base atual mantida; falha ao recarregar: {exc}"}), 422
+
+
+@admin_bp.post("/ingest")
+@auth_required("admin")
+def ingest_events():
+    prediction_service: PredictionService = current_app.extensions["prediction_service"]
+
+    try:
+        batch_df = prediction_service.dataset_repository.parse_event_batch(
+            request.get_data(as_text=True),
+            content_type=request.mimetype,
+        )
+        return jsonify(prediction_service.ingest_events(batch_df))
+    except ValueError as exc:
+        return jsonify({"error": f"Lote rejeitado: {exc}"}), 422
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from flask import Blueprint, current_app, jsonify, request
+
+from radar_preventivo.auth import auth_required, rate_limited
+from radar_preventivo.services import PredictionService
+
+
+analytics_bp = Blueprint("analytics", __name__)
+
+
+@analytics_bp.get("/drivers/<path:name>")
+@auth_required("admin", "gestor", "analista")
+@rate_limited
+def get_driver_detail(name: str):
+    return _entity_detail_response("Motorista", name)
+
+
+@analytics_bp.get("/locations/<path:name>")
+@auth_required("admin", "gestor", "analista")
+@rate_limited
+def get_location_detail(name: str):
+    return _entity_detail_response("Localidade", name)
+
+
+@analytics_bp.get("/hotspots")
+@auth_required("admin", "gestor", "analista")
+@rate_limited
+def get_hotspots():
+    prediction_service: PredictionService = current_app.extensions["prediction_service"]
+
+    try:
+        cached_response = prediction_service.hotspots_response(
+            serializer=lambda payload: current_app.json.dumps(payload) + "\n",
+            bbox_raw=request.args.get("bbox"),
+            zoom_raw=request.args.get("zoom"),
+            days_raw=request.args.get("days"),
+        )
+        return _conditional_response(cached_response)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:  # pragma: no cover
+        return jsonify({"error": f"Erro interno ao calcular hotspots: {exc}"}), 500
+
+
+@analytics_bp.get("/heatmap")
+@auth_required("admin", "gestor", "analista")
+@rate_limited
+def get_heatmap():
+    prediction_service: PredictionService = current_app.extensions["prediction_service"]
+
+    try:
+        cached_response = prediction_service.heatmap_response(
+            serializer=lambda payload: current_app.json.dumps(payload) + "\n",
+            event_types_raw=request.args.getlist("tipo_evento"),
+        )
+        return _conditional_response(cached_response)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except Exception as exc:  # pragma: no cover
+        return jsonify({"error": f"Erro interno ao montar o mapa de calor: {exc}"}), 500
+
+
+def _entity_detail_response(dimension: str, name: str):
+    prediction_service: PredictionService = current_app.extensions["prediction_service"]
+
+    try:
+        cached_response = prediction_service.entity_detail_response(
+            dimension,
+            name,
+            serializer=lambda payload: current_app.json.dumps(payload) + "\n",
+            page_raw=request.args.get("page"),
+            page_size_raw=request.args.get("page_size"),
+        )
+        return _conditional_response(cached_response)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except LookupError as exc:
+        payload = exc.args[0] if exc.args else {"error": f"{dimension} nao encontrado na base."}
+        return jsonify(payload), 404
+    except Exception as exc:  # pragma: no cover
+        return jsonify({"error": f"Erro interno ao consultar {dimension.lower()}: {exc}"}), 500
+
+
+def _conditional_response(cached_response):
+    response = current_app.response_class(cached_response.body, mimetype="application/json")
+    response.set_etag(cached_response.etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Authorization")
+    return response.make_conditional(request)
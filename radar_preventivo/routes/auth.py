@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from flask import Blueprint, current_app, g, jsonify, request
 
-from radar_preventivo.auth import auth_required
+from radar_preventivo.auth import auth_required, rate_limited, rejection_response
+from radar_preventivo.auth.login_guard import LoginRejected
 from radar_preventivo.auth.service import AuthService
 
 
@@ -10,6 +11,7 @@ auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 
 @auth_bp.post("/login")
+@rate_limited
 def login():
     payload = request.get_json(silent=True) or {}
     email = (payload.get("email") or "").strip()
@@ -19,7 +21,14 @@ def login():
         return jsonify({"error": "Informe email e senha para autenticar."}), 400
 
     auth_service: AuthService = current_app.extensions["auth_service"]
-    session_payload = auth_service.authenticate(email=email, password=password)
+    try:
+        session_payload = auth_service.authenticate(
+            email=email,
+            password=password,
+            client_ip=request.remote_addr,
+        )
+    except LoginRejected as exc:
+        return rejection_response(exc)
     if not session_payload:
         return jsonify({"error": "Credenciais invalidas ou usuario sem acesso."}), 401
 
@@ -44,4 +53,6 @@ def list_users():
 @auth_bp.post("/logout")
 @auth_required("admin", "gestor", "analista")
 def logout():
+    auth_service: AuthService = current_app.extensions["auth_service"]
+    auth_service.forget_token(g.auth_token)
     return jsonify({"message": "Logout concluido no cliente. Remova o token armazenado."})
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from flask import Blueprint, current_app, jsonify
+from flask import Blueprint, current_app, jsonify, request
 
+from radar_preventivo.auth import auth_required
 from radar_preventivo.services import PredictionService
 
 
@@ -11,4 +12,25 @@ health_bp = Blueprint("health", __name__)
 @health_bp.get("/health")
 def healthcheck():
     prediction_service: PredictionService = current_app.extensions["prediction_service"]
-    return jsonify(prediction_service.health_payload())
+    payload = prediction_service.health_payload()
+    response = jsonify(payload)
+    response.set_etag(prediction_service.health_etag(payload))
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
+
+@health_bp.get("/health/stats")
+@auth_required("admin")
+def health_stats():
+    prediction_service: PredictionService = current_app.extensions["prediction_service"]
+    auth_service = current_app.extensions["auth_service"]
+    response = jsonify(
+        {
+            **prediction_service.runtime_stats(),
+            "token_cache": auth_service.token_cache.stats(),
+            "rate_limits": current_app.extensions["rate_limiter"].stats(),
+        }
+    )
+    # Contadores mudam a cada requisicao: sem ETag, nunca reaproveitados.
+    response.headers["Cache-Control"] = "no-store"
+    return response
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from flask import Blueprint, current_app, jsonify, request
 
-from radar_preventivo.auth import auth_required
+from radar_preventivo.auth import auth_required, rate_limited, rejection_response
 from radar_preventivo.services import PredictionService
+from radar_preventivo.services.admission import AdmissionRejected
+from radar_preventivo.services.filter_index import FILTER_DIMENSIONS
 
 
 predictions_bp = Blueprint("predictions", __name__)
@@ -11,15 +13,102 @@ predictions_bp = Blueprint("predictions", __name__)
 
 @predictions_bp.get("/predict")
 @auth_required("admin", "gestor", "analista")
+@rate_limited
 def get_prediction():
     prediction_service: PredictionService = current_app.extensions["prediction_service"]
 
     try:
-        return jsonify(prediction_service.predict_for_date(request.args.get("date")))
+        cached_response = prediction_service.predict_response(
+            request.args.get("date"),
+            serializer=lambda payload: current_app.json.dumps(payload) + "\n",
+            ranking_raw=request.args.get("ranking"),
+            filters_raw=_filter_args(),
+        )
+        response = current_app.response_class(cached_response.body, mimetype="application/json")
+        response.set_etag(cached_response.etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Authorization")
+        return response.make_conditional(request)
     except ValueError as exc:
         return jsonify({"error": str(exc), "requested_date": request.args.get("date")}), 400
     except LookupError as exc:
         payload = exc.args[0] if exc.args else {"error": "Data fora do intervalo de previsao."}
         return jsonify(payload), 404
+    except AdmissionRejected as exc:
+        return rejection_response(exc)
     except Exception as exc:  # pragma: no cover
         return jsonify({"error": f"Erro interno ao gerar previsao: {exc}"}), 500
+
+
+@predictions_bp.route("/predict/range", methods=["GET", "POST"])
+@auth_required("admin", "gestor", "analista")
+@rate_limited
+def get_prediction_range():
+    prediction_service: PredictionService = current_app.extensions["prediction_service"]
+
+    try:
+        if request.method == "POST":
+            body = request.get_json(silent=True) or {}
+            if not isinstance(body, dict):
+                raise ValueError("Envie um objeto JSON com a lista 'dates'.")
+            requested_dates = prediction_service.resolve_date_list(body.get("dates"))
+            ranking_raw = body.get("ranking") or request.args.get("ranking")
+            filters_raw = body.get("filters") or _filter_args()
+        else:
+            requested_dates = prediction_service.resolve_date_range(
+                request.args.get("start"),
+                request.args.get("end"),
+            )
+            ranking_raw = request.args.get("ranking")
+            filters_raw = _filter_args()
+
+        if _wants_ndjson():
+            payload = prediction_service.predict_range(
+                requested_dates,
+                ranking_raw=ranking_raw,
+                filters_raw=filters_raw,
+            )
+            return current_app.response_class(
+                _ndjson_lines(payload, current_app.json.dumps),
+                mimetype="application/x-ndjson",
+            )
+
+        cached_response = prediction_service.predict_range_response(
+            requested_dates,
+            serializer=lambda payload: current_app.json.dumps(payload) + "\n",
+            ranking_raw=ranking_raw,
+            filters_raw=filters_raw,
+        )
+        response = current_app.response_class(cached_response.body, mimetype="application/json")
+        response.set_etag(cached_response.etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        response.vary.add("Authorization")
+        return response.make_conditional(request)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    except LookupError as exc:
+        payload = exc.args[0] if exc.args else {"error": "Data fora do intervalo de previsao."}
+        return jsonify(payload), 404
+    except AdmissionRejected as exc:
+        return rejection_response(exc)
+    except Exception as exc:  # pragma: no cover
+        return jsonify({"error": f"Erro interno ao gerar previsao: {exc}"}), 500
+
+
+def _filter_args() -> dict[str, list[str]]:
+    # Cada filtro aceita valores repetidos: ?frota=A&frota=B.
+    return {key: request.args.getlist(key) for key in FILTER_DIMENSIONS if key in request.args}
+
+
+def _wants_ndjson() -> bool:
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == "application/x-ndjson"
+
+
+def _ndjson_lines(payload: dict, dumps):
+    # O gerador roda depois que o contexto da requisicao termina; por isso recebe o serializador.
+    daily_predictions = payload.pop("previsoes_diarias")
+    yield dumps({"tipo": "resumo", **payload}) + "\n"
+    for daily_prediction in daily_predictions:
+        yield dumps({"tipo": "previsao", **daily_prediction}) + "\n"
@@ -1,3 +1,4 @@
+from .dataset_watcher import DatasetWatcher
 from .prediction_service import PredictionService
 
-__all__ = ["PredictionService"]
+__all__ = ["DatasetWatcher", "PredictionService"]
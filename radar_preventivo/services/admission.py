@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from radar_preventivo.config import AppSettings
+
+
+FORECAST_RETRY_AFTER_SECONDS = 5.0
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, status_code: int, retry_after: float) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = max(int(math.ceil(retry_after)), 1)
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate_per_minute: float, burst: int, max_keys: int = 10_000) -> None:
+        self.rate_per_second = max(float(rate_per_minute), 0.0) / 60.0
+        self.capacity = float(max(int(burst), 1))
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._allowed = 0
+        self._rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def acquire(self, key: str) -> float:
+        # Devolve 0 quando a requisicao passa ou os segundos ate a proxima ficha.
+        if not self.enabled:
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.rate_per_second)
+            if tokens >= 1.0:
+                tokens -= 1.0
+                wait_seconds = 0.0
+                self._allowed += 1
+            else:
+                wait_seconds = (1.0 - tokens) / self.rate_per_second
+                self._rejected += 1
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            # Baldes esquecidos voltam cheios; so os clientes ativos ficam em memoria.
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait_seconds
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "rate_per_minute": round(self.rate_per_second * 60.0, 2),
+                "burst": int(self.capacity),
+                "tracked_keys": len(self._buckets),
+                "allowed": self._allowed,
+                "rejected": self._rejected,
+            }
+
+
+class RequestRateLimiter:
+    def __init__(self, settings: AppSettings) -> None:
+        self.user_buckets = TokenBucketLimiter(
+            settings.rate_limit_user_per_minute,
+            settings.rate_limit_user_burst,
+        )
+        self.ip_buckets = TokenBucketLimiter(
+            settings.rate_limit_ip_per_minute,
+            settings.rate_limit_ip_burst,
+        )
+
+    def check(self, user_id: str | None, client_ip: str | None) -> None:
+        wait_seconds = self.ip_buckets.acquire(f"ip:{client_ip or 'desconhecido'}")
+        if not wait_seconds and user_id is not None:
+            wait_seconds = self.user_buckets.acquire(f"user:{user_id}")
+        if wait_seconds:
+            raise AdmissionRejected(
+                "Limite de requisicoes excedido. Aguarde antes de tentar novamente.",
+                429,
+                wait_seconds,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        return {"user": self.user_buckets.stats(), "ip": self.ip_buckets.stats()}
+
+
+class ConcurrencyGate:
+    def __init__(
+        self,
+        limit: int,
+        retry_after_seconds: float = FORECAST_RETRY_AFTER_SECONDS,
+    ) -> None:
+        self.limit = max(int(limit), 0)
+        self.retry_after_seconds = retry_after_seconds
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(self.limit, 1))
+        self._in_flight = 0
+        self._rejected = 0
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        if self.limit == 0:
+            yield
+            return
+
+        # Sem espera: acima do limite a resposta e um 503 imediato, nao uma fila ate o timeout.
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise AdmissionRejected(
+                "Servidor ocupado calculando previsoes. Tente novamente em instantes.",
+                503,
+                self.retry_after_seconds,
+            )
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(self.limit, 1))
+        self._in_flight = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+            }
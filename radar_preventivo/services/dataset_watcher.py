@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+import threading
+
+from radar_preventivo.services.prediction_service import PredictionService
+
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetWatcher:
+    def __init__(self, prediction_service: PredictionService, poll_seconds: float) -> None:
+        self.prediction_service = prediction_service
+        self.poll_seconds = poll_seconds
+        self._pending_signature: tuple | None = None
+        self._failed_signature: tuple | None = None
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.poll_seconds <= 0 or (self._thread and self._thread.is_alive()):
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="radar-dataset-watcher",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("Monitorando alteracoes da base a cada %s segundos.", self.poll_seconds)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_seconds + 1)
+
+    def check_once(self) -> bool:
+        bundle = self.prediction_service.dataset_bundle
+        current_signature = self.prediction_service.source_signature()
+        if bundle is None or current_signature == bundle.source_signature:
+            self._pending_signature = None
+            return False
+
+        if current_signature == self._failed_signature:
+            return False
+
+        # Espera a assinatura estabilizar por um ciclo para nao ler um arquivo em copia.
+        if current_signature != self._pending_signature:
+            self._pending_signature = current_signature
+            return False
+
+        try:
+            summary = self.prediction_service.reload()
+        except Exception:
+            self._failed_signature = current_signature
+            logger.exception("Falha ao recarregar a base; mantendo a versao atual em memoria.")
+            return False
+
+        self._pending_signature = None
+        self._failed_signature = None
+        logger.info(
+            "Base recarregada em %s ms (versao %s).",
+            summary["duration_ms"],
+            summary["dataset_version"],
+        )
+        return True
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.poll_seconds):
+            self.check_once()
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+FILTER_DIMENSIONS = {
+    "empresa": "Empresa",
+    "cliente": "Cliente",
+    "frota": "Frota",
+    "turno": "Turno",
+    "tipo_operacao": "Tipo de Operação",
+    "criticidade": "Criticidade",
+}
+RANKED_DIMENSIONS = ("Motorista", "Localidade", "Tipo de Evento")
+ENTITY_DIMENSIONS = ("Motorista", "Localidade")
+
+Filters = tuple[tuple[str, tuple[str, ...]], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class InvertedIndex:
+    column: str
+    codes: dict[str, int]
+    offsets: np.ndarray
+    rows: np.ndarray
+    daily: np.ndarray | None = None
+
+    def rows_for(self, labels: tuple[str, ...]) -> np.ndarray:
+        slices = [
+            self.rows[self.offsets[self.codes[label]] : self.offsets[self.codes[label] + 1]]
+            for label in labels
+        ]
+        return slices[0] if len(slices) == 1 else np.sort(np.concatenate(slices))
+
+    def daily_for(self, labels: tuple[str, ...]) -> np.ndarray:
+        return self.daily[[self.codes[label] for label in labels]].sum(axis=0)
+
+
+@dataclass(frozen=True, slots=True)
+class FilterIndex:
+    first_day: np.datetime64
+    day_offsets: np.ndarray
+    quantities: np.ndarray
+    entity_codes: dict[str, np.ndarray]
+    entity_labels: dict[str, list[str]]
+    dimensions: dict[str, InvertedIndex]
+    entities: dict[str, InvertedIndex]
+    daily_total: np.ndarray
+
+    def select_rows(self, filters: Filters) -> np.ndarray:
+        # Valores do mesmo filtro somam linhas; filtros diferentes se intersectam.
+        selected: np.ndarray | None = None
+        for key, labels in sorted(filters, key=lambda item: self._selectivity(*item)):
+            rows = self.dimensions[key].rows_for(labels)
+            selected = (
+                rows
+                if selected is None
+                else np.intersect1d(selected, rows, assume_unique=True)
+            )
+            if not selected.size:
+                break
+        return selected if selected is not None else np.arange(len(self.quantities))
+
+    def daily_totals(self, filters: Filters, rows: np.ndarray) -> np.ndarray:
+        if len(filters) == 1:
+            key, labels = filters[0]
+            return self.dimensions[key].daily_for(labels)
+        return np.bincount(
+            self.day_offsets[rows],
+            weights=self.quantities[rows],
+            minlength=len(self.daily_total),
+        )
+
+    def aggregate_totals(
+        self,
+        rows: np.ndarray,
+        weights: np.ndarray | None = None,
+    ) -> dict[str, pd.Series]:
+        weights = self.quantities[rows] if weights is None else weights
+        day_offsets = self.day_offsets[rows]
+        day_mask = np.bincount(day_offsets, minlength=len(self.daily_total)) > 0
+        daily = np.bincount(day_offsets, weights=weights, minlength=len(self.daily_total))
+        days = pd.DatetimeIndex(self.first_day + np.flatnonzero(day_mask))
+
+        totals = {"daily": pd.Series(daily[day_mask], index=days.as_unit("ns"))}
+        for key, column in (
+            ("drivers", "Motorista"),
+            ("locations", "Localidade"),
+            ("events", "Tipo de Evento"),
+        ):
+            totals[key] = self._sum_codes(self.entity_codes[column][rows], weights, column)
+
+        driver_labels = self.entity_labels["Motorista"]
+        event_codes = self.entity_codes["Tipo de Evento"][rows]
+        driver_codes = self.entity_codes["Motorista"][rows]
+        observed = (event_codes >= 0) & (driver_codes >= 0)
+        pair_codes = event_codes[observed] * len(driver_labels) + driver_codes[observed]
+        pair_count = len(self.entity_labels["Tipo de Evento"]) * len(driver_labels)
+        pair_mask = np.bincount(pair_codes, minlength=pair_count) > 0
+        pair_totals = np.bincount(pair_codes, weights=weights[observed], minlength=pair_count)
+        present_pairs = np.flatnonzero(pair_mask)
+        event_labels = np.asarray(self.entity_labels["Tipo de Evento"], dtype=object)
+        totals["event_drivers"] = pd.Series(
+            pair_totals[present_pairs],
+            index=pd.MultiIndex.from_arrays(
+                [
+                    event_labels[present_pairs // len(driver_labels)],
+                    np.asarray(driver_labels, dtype=object)[present_pairs % len(driver_labels)],
+                ],
+                names=["Tipo de Evento", "Motorista"],
+            ),
+        ).sort_index()
+        return totals
+
+    def _sum_codes(self, codes: np.ndarray, weights: np.ndarray, column: str) -> pd.Series:
+        labels = self.entity_labels[column]
+        observed = codes >= 0
+        counts = np.bincount(codes[observed], minlength=len(labels))
+        sums = np.bincount(codes[observed], weights=weights[observed], minlength=len(labels))
+        present = np.flatnonzero(counts > 0)
+        return pd.Series(
+            sums[present],
+            index=pd.Index(np.asarray(labels, dtype=object)[present], name=column),
+        ).sort_index()
+
+    def _selectivity(self, key: str, labels: tuple[str, ...]) -> int:
+        dimension = self.dimensions[key]
+        sizes = np.diff(dimension.offsets)
+        return int(sum(sizes[dimension.codes[label]] for label in labels))
+
+
+def build_filter_index(source_df: pd.DataFrame) -> FilterIndex:
+    event_days = source_df["Data"].to_numpy().astype("datetime64[D]")
+    first_day = event_days.min()
+    day_offsets = (event_days - first_day).astype("int64")
+    day_count = int(day_offsets.max()) + 1
+    quantities = source_df["QUANTIDADE"].to_numpy(dtype="float64")
+
+    entity_codes: dict[str, np.ndarray] = {}
+    entity_labels: dict[str, list[str]] = {}
+    for column in (*RANKED_DIMENSIONS, "Criticidade"):
+        if column in source_df.columns:
+            entity_codes[column], entity_labels[column] = _category_codes(source_df[column])
+
+    dimensions = {
+        key: _build_inverted_index(source_df[column], day_offsets, day_count, quantities)
+        for key, column in FILTER_DIMENSIONS.items()
+        if column in source_df.columns
+    }
+    # Motoristas e localidades podem ser milhares: so os offsets das linhas, sem matriz diaria.
+    entities = {
+        column: _build_inverted_index(source_df[column], day_offsets, day_count, quantities, False)
+        for column in ENTITY_DIMENSIONS
+    }
+    return FilterIndex(
+        first_day=first_day,
+        day_offsets=day_offsets,
+        quantities=quantities,
+        entity_codes=entity_codes,
+        entity_labels=entity_labels,
+        dimensions=dimensions,
+        entities=entities,
+        daily_total=np.bincount(day_offsets, weights=quantities, minlength=day_count),
+    )
+
+
+def extend_filter_index(index: FilterIndex, batch_df: pd.DataFrame) -> FilterIndex:
+    # As linhas do lote entram no fim: codigos e offsets existentes continuam validos e cada
+    # rotulo novo recebe o proximo codigo. Exige que o lote nao comece antes de first_day.
+    batch_days = batch_df["Data"].to_numpy().astype("datetime64[D]")
+    day_offsets = (batch_days - index.first_day).astype("int64")
+    day_count = max(len(index.daily_total), int(day_offsets.max()) + 1)
+    quantities = batch_df["QUANTIDADE"].to_numpy(dtype="float64")
+    first_row = len(index.quantities)
+
+    entity_codes: dict[str, np.ndarray] = {}
+    entity_labels: dict[str, list[str]] = {}
+    for column, codes in index.entity_codes.items():
+        batch_codes, lookup = _extend_codes(
+            {label: code for code, label in enumerate(index.entity_labels[column])},
+            batch_df[column],
+        )
+        entity_codes[column] = np.concatenate([codes, batch_codes])
+        entity_labels[column] = list(lookup)
+
+    daily_total = _pad_days(index.daily_total, day_count)
+    np.add.at(daily_total, day_offsets, quantities)
+    return FilterIndex(
+        first_day=index.first_day,
+        day_offsets=np.concatenate([index.day_offsets, day_offsets]),
+        quantities=np.concatenate([index.quantities, quantities]),
+        entity_codes=entity_codes,
+        entity_labels=entity_labels,
+        dimensions={
+            key: _extend_inverted_index(
+                dimension, batch_df[dimension.column], first_row, day_offsets, day_count, quantities
+            )
+            for key, dimension in index.dimensions.items()
+        },
+        entities={
+            column: _extend_inverted_index(
+                entity, batch_df[column], first_row, day_offsets, day_count, quantities
+            )
+            for column, entity in index.entities.items()
+        },
+        daily_total=daily_total,
+    )
+
+
+def _build_inverted_index(
+    series: pd.Series,
+    day_offsets: np.ndarray,
+    day_count: int,
+    quantities: np.ndarray,
+    with_daily: bool = True,
+) -> InvertedIndex:
+    codes, labels = _category_codes(series)
+    observed = np.flatnonzero(codes >= 0)
+    # Ordenacao estavel: as linhas de cada valor ficam em ordem crescente, prontas para intersect1d.
+    rows = observed[np.argsort(codes[observed], kind="stable")]
+    offsets = np.zeros(len(labels) + 1, dtype="int64")
+    np.cumsum(np.bincount(codes[observed], minlength=len(labels)), out=offsets[1:])
+    daily = None
+    if with_daily:
+        daily = np.bincount(
+            codes[observed] * day_count + day_offsets[observed],
+            weights=quantities[observed],
+            minlength=len(labels) * day_count,
+        ).reshape(len(labels), day_count)
+    return InvertedIndex(
+        column=str(series.name),
+        codes={label: code for code, label in enumerate(labels)},
+        offsets=offsets,
+        rows=rows,
+        daily=daily,
+    )
+
+
+def _extend_inverted_index(
+    index: InvertedIndex,
+    series: pd.Series,
+    first_row: int,
+    day_offsets: np.ndarray,
+    day_count: int,
+    quantities: np.ndarray,
+) -> InvertedIndex:
+    codes, lookup = _extend_codes(index.codes, series)
+    observed = np.flatnonzero(codes >= 0)
+    order = observed[np.argsort(codes[observed], kind="stable")]
+    # Cada linha nova vai para o fim da fatia do seu codigo; so o lote e ordenado.
+    previous_offsets = np.pad(index.offsets, (0, len(lookup) - len(index.codes)), mode="edge")
+    rows = np.insert(index.rows, previous_offsets[codes[order] + 1], first_row + order)
+    offsets = previous_offsets + np.concatenate(
+        [[0], np.cumsum(np.bincount(codes[observed], minlength=len(lookup)))]
+    )
+    daily = None
+    if index.daily is not None:
+        daily = np.zeros((len(lookup), day_count))
+        daily[: index.daily.shape[0], : index.daily.shape[1]] = index.daily
+        np.add.at(daily, (codes[observed], day_offsets[observed]), quantities[observed])
+    return InvertedIndex(
+        column=index.column,
+        codes=lookup,
+        offsets=offsets,
+        rows=rows,
+        daily=daily,
+    )
+
+
+def _extend_codes(
+    lookup: dict[str, int],
+    series: pd.Series,
+) -> tuple[np.ndarray, dict[str, int]]:
+    present = series.notna().to_numpy()
+    labels = series[present].astype(str)
+    lookup = dict(lookup)
+    for label in pd.unique(labels):
+        lookup.setdefault(label, len(lookup))
+    codes = np.full(len(series), -1, dtype="int64")
+    codes[present] = labels.map(lookup).to_numpy(dtype="int64")
+    return codes, lookup
+
+
+def _pad_days(values: np.ndarray, day_count: int) -> np.ndarray:
+    return np.concatenate([values, np.zeros(day_count - len(values))])
+
+
+def _category_codes(series: pd.Series) -> tuple[np.ndarray, list[str]]:
+    categorical = (
+        series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype("category")
+    )
+    return (
+        categorical.cat.codes.to_numpy().astype("int64"),
+        [str(label) for label in categorical.cat.categories],
+    )
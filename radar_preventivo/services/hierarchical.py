@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from radar_preventivo.services.predictors import RidgeTrendPredictorBackend
+
+
+# Um bloco resolve milhares de series em poucos ms; o pool so compensa acima disso.
+HIERARCHY_CHUNK_SIZE = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class EntityForecasts:
+    dimension: str
+    labels: list[str]
+    historical_volumes: np.ndarray
+    days: dict[date, int]
+    values: np.ndarray
+
+    def for_date(self, requested_date: pd.Timestamp) -> np.ndarray | None:
+        day_index = self.days.get(requested_date.date())
+        if day_index is None:
+            return None
+        return self.values[:, day_index]
+
+
+def build_entity_forecasts(
+    source_df: pd.DataFrame,
+    dimension: str,
+    labels: list[str],
+    total_by_day: dict[date, float],
+    max_workers: int = 1,
+) -> EntityForecasts:
+    # A ultima linha da matriz e o grupo "demais": ele entra na reconciliacao mas nao no ranking.
+    event_days = source_df["Data"].to_numpy().astype("datetime64[D]")
+    first_day = event_days.min()
+    history_length = int((event_days.max() - first_day).astype("int64")) + 1
+    history = _entity_daily_matrix(
+        source_df, dimension, labels, event_days, first_day, history_length
+    )
+
+    forecast_days = sorted(total_by_day)
+    forecast_day_numbers = np.array(forecast_days, dtype="datetime64[D]")
+    history_weekdays = RidgeTrendPredictorBackend._weekdays(first_day + np.arange(history_length))
+    future_weekdays = RidgeTrendPredictorBackend._weekdays(forecast_day_numbers)
+    forecasts = _fit_entity_series(history, history_weekdays, future_weekdays, max_workers)
+
+    totals = np.maximum(np.array([total_by_day[day] for day in forecast_days], dtype="float64"), 0)
+    return EntityForecasts(
+        dimension=dimension,
+        labels=list(labels),
+        historical_volumes=history[:-1].sum(axis=1),
+        days={forecast_day: index for index, forecast_day in enumerate(forecast_days)},
+        values=_reconcile_to_total(forecasts, totals, history.sum(axis=1))[:-1],
+    )
+
+
+def _entity_daily_matrix(
+    source_df: pd.DataFrame,
+    dimension: str,
+    labels: list[str],
+    event_days: np.ndarray,
+    first_day: np.datetime64,
+    history_length: int,
+) -> np.ndarray:
+    entity_codes = pd.Categorical(source_df[dimension].astype(object), categories=labels).codes
+    entity_codes = np.where(entity_codes < 0, len(labels), entity_codes).astype("int64")
+    day_offsets = (event_days - first_day).astype("int64")
+    flat_totals = np.bincount(
+        entity_codes * history_length + day_offsets,
+        weights=source_df["QUANTIDADE"].to_numpy(dtype="float64"),
+        minlength=(len(labels) + 1) * history_length,
+    )
+    return flat_totals.reshape(len(labels) + 1, history_length)
+
+
+def _fit_entity_series(
+    history: np.ndarray,
+    history_weekdays: np.ndarray,
+    future_weekdays: np.ndarray,
+    max_workers: int,
+) -> np.ndarray:
+    chunks = [
+        history[start : start + HIERARCHY_CHUNK_SIZE]
+        for start in range(0, len(history), HIERARCHY_CHUNK_SIZE)
+    ]
+    if max_workers <= 1 or len(chunks) == 1:
+        fitted_chunks = [_fit_chunk(chunk, history_weekdays, future_weekdays) for chunk in chunks]
+    else:
+        # "spawn" evita herdar locks de threads do processo web no filho.
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(chunks)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            fitted_chunks = list(
+                pool.map(
+                    _fit_chunk,
+                    chunks,
+                    [history_weekdays] * len(chunks),
+                    [future_weekdays] * len(chunks),
+                )
+            )
+    return np.maximum(np.vstack(fitted_chunks), 0.0)
+
+
+def _fit_chunk(
+    chunk: np.ndarray,
+    history_weekdays: np.ndarray,
+    future_weekdays: np.ndarray,
+) -> np.ndarray:
+    return RidgeTrendPredictorBackend()._fit_predict(chunk.T, history_weekdays, future_weekdays).T
+
+
+def _reconcile_to_total(
+    forecasts: np.ndarray,
+    totals: np.ndarray,
+    historical_volumes: np.ndarray,
+) -> np.ndarray:
+    # Reconciliacao top-down proporcional: cada dia soma exatamente a previsao do total.
+    daily_sums = forecasts.sum(axis=0)
+    proportions = np.divide(
+        forecasts,
+        daily_sums,
+        out=np.zeros_like(forecasts),
+        where=daily_sums > 0,
+    )
+    historical_total = historical_volumes.sum()
+    if historical_total > 0:
+        proportions[:, daily_sums <= 0] = (historical_volumes / historical_total)[:, None]
+    return proportions * totals
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+class ModelStore:
+    def __init__(
+        self,
+        directory: Path,
+        dump: Callable[[Any, Path], None],
+        load: Callable[[Path], Any],
+        max_models: int = 3,
+    ) -> None:
+        self.directory = directory
+        self._dump = dump
+        self._load = load
+        self.max_models = max_models
+
+    @staticmethod
+    def build_key(training_df: pd.DataFrame, hyperparameters: dict[str, Any]) -> str:
+        series = training_df[["ds", "y"]].astype({"y": "float64"})
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        digest.update(json.dumps(hyperparameters, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.model"
+
+    def load(self, key: str) -> Any | None:
+        model_file = self.path_for(key)
+        if not model_file.exists():
+            return None
+
+        try:
+            model = self._load(model_file)
+        except Exception as exc:
+            logger.warning("Modelo salvo em %s nao pode ser carregado (%s).", model_file, exc)
+            return None
+
+        os.utime(model_file)
+        logger.info("Modelo reaproveitado do armazenamento local: %s.", model_file.name)
+        return model
+
+    def save(self, key: str, model: Any) -> Path | None:
+        model_file = self.path_for(key)
+        temporary_file: Path | None = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            file_descriptor, temporary_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            os.close(file_descriptor)
+            temporary_file = Path(temporary_name)
+            self._dump(model, temporary_file)
+            os.replace(temporary_file, model_file)
+        except Exception as exc:
+            if temporary_file is not None:
+                temporary_file.unlink(missing_ok=True)
+            logger.warning("Nao foi possivel salvar o modelo em %s: %s", model_file, exc)
+            return None
+
+        self._prune()
+        return model_file
+
+    def _prune(self) -> None:
+        stored_models = sorted(
+            self.directory.glob("*.model"),
+            key=lambda model_file: model_file.stat().st_mtime_ns,
+            reverse=True,
+        )
+        for stale_model in stored_models[self.max_models :]:
+            stale_model.unlink(missing_ok=True)
@@ -1,13 +1,41 @@
 from __future__ import annotations
 
+import hashlib
+import itertools
+import json
 import logging
-from dataclasses import dataclass
+import threading
+import time
+from collections.abc import Callable, Mapping
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from radar_preventivo.config import AppSettings
-from radar_preventivo.repositories.dataset_repository import CsvDatasetRepository
+from radar_preventivo.repositories.dataset_repository import EVENT_ID_COLUMN, CsvDatasetRepository
+from radar_preventivo.services.admission import ConcurrencyGate
+from radar_preventivo.services.filter_index import (
+    FILTER_DIMENSIONS,
+    RANKED_DIMENSIONS,
+    FilterIndex,
+    Filters,
+    build_filter_index,
+    extend_filter_index,
+)
+from radar_preventivo.services.hierarchical import EntityForecasts, build_entity_forecasts
+from radar_preventivo.services.predictors import build_predictor_backend
+from radar_preventivo.services.response_cache import CachedResponse, ResponseCache
+from radar_preventivo.services.spatial_index import (
+    BASE_ZOOM,
+    SpatialIndex,
+    build_spatial_index,
+    extend_spatial_index,
+    tile_bounds,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -17,6 +45,24 @@ TOP_DRIVER_LIMIT = 10
 TOP_LOCATION_LIMIT = 3
 TOP_EVENT_LIMIT = 4
 TOP_DRIVERS_PER_EVENT_LIMIT = 3
+MAX_RANGE_DAYS = 366
+FILTER_SHARE_WINDOW_DAYS = 90
+ENTITY_PAGE_SIZE = 30
+MAX_ENTITY_PAGE_SIZE = 366
+DEFAULT_HOTSPOT_ZOOM = 10
+MAX_HOTSPOT_CLUSTERS = 500
+WEEKDAY_LABELS = ("segunda", "terca", "quarta", "quinta", "sexta", "sabado", "domingo")
+RANKING_GROUPS = (
+    ("drivers", ["Motorista"]),
+    ("locations", ["Localidade"]),
+    ("events", ["Tipo de Evento"]),
+    ("event_drivers", ["Tipo de Evento", "Motorista"]),
+)
+HIERARCHY_DIMENSIONS = {
+    "Motorista": "driver_totals",
+    "Localidade": "location_totals",
+    "Tipo de Evento": "event_totals",
+}
 
 
 @dataclass(slots=True)
@@ -25,53 +71,55 @@ class DatasetBundle:
     dados_aggregated: pd.DataFrame
     dismissed_drivers: list[str]
     analytics_cache: dict[str, Any]
+    version: str = ""
+    source_signature: tuple = ()
+    event_id_hashes: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.uint64))
+    filter_index: FilterIndex | None = None
+    spatial_index: SpatialIndex | None = None
+    # Muda a cada carga ou ingestao, mesmo quando a versao (hash dos totais diarios) se repete.
+    generation: int = 0
 
 
-class MockPredictorBackend:
-    backend_name = "mock-moving-average"
+@dataclass(frozen=True, slots=True)
+class ForecastHorizon:
+    dataset_version: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+    values: dict[date, float]
+    source: str
+    provisional: bool = False
+    model_generation: int = 0
 
-    def forecast(self, training_df: pd.DataFrame, periods: int) -> pd.DataFrame:
-        recent_window = training_df["y"].tail(7)
-        baseline = float(recent_window.mean()) if not recent_window.empty else 0.0
-        recent_diff = training_df["y"].diff().tail(7)
-        slope = float(recent_diff.mean()) if not recent_diff.dropna().empty else 0.0
+    def lookup(self, requested_date: pd.Timestamp) -> float | None:
+        return self.values.get(requested_date.date())
 
-        forecast_dates = pd.date_range(
-            start=training_df["ds"].max() + pd.Timedelta(days=1),
-            periods=periods,
-            freq="D",
-        )
-        predictions = []
-        for step, forecast_date in enumerate(forecast_dates, start=1):
-            predictions.append(
-                {
-                    "ds": forecast_date,
-                    "yhat1": max(round(baseline + (slope * 0.15 * step), 2), 0.0),
-                }
-            )
-
-        return pd.DataFrame(predictions)
 
+@dataclass(frozen=True, slots=True)
+class RankedShares:
+    labels: list[str]
+    volumes: np.ndarray
+    shares: np.ndarray
 
-class NeuralProphetPredictorBackend:
-    backend_name = "flask-neuralprophet"
 
-    def __init__(self) -> None:
-        self._model = None
-        self._training_signature: tuple[pd.Timestamp, int] | None = None
+@dataclass(frozen=True, slots=True)
+class RankingState:
+    last_day: np.datetime64
+    # Eventos dos ultimos max(janelas) dias somados por dia e entidade: base das janelas.
+    recent: pd.DataFrame
+    decay_totals: dict[str, pd.Series]
+    decay_total: float
 
-    def forecast(self, training_df: pd.DataFrame, periods: int) -> pd.DataFrame:
-        signature = (training_df["ds"].max(), len(training_df))
-        if self._model is None or self._training_signature != signature:
-            from neuralprophet import NeuralProphet
 
-            self._model = NeuralProphet()
-            self._model.fit(training_df, freq="D")
-            self._training_signature = signature
+@dataclass(frozen=True, slots=True)
+class EventHourCube:
+    labels: list[str]
+    values: np.ndarray
 
-        future_df = self._model.make_future_dataframe(df=training_df, periods=periods)
-        predictions = self._model.predict(future_df)
-        return predictions[predictions["ds"] > training_df["ds"].max()][["ds", "yhat1"]].copy()
+    def matrix(self, labels: tuple[str, ...] = ()) -> np.ndarray:
+        if not labels:
+            return self.values.sum(axis=0)
+        positions = [self.labels.index(label) for label in labels]
+        return self.values[positions].sum(axis=0)
 
 
 class PredictionService:
@@ -79,20 +127,197 @@ class PredictionService:
         self.settings = settings
         self.dataset_repository = dataset_repository
         self.dataset_bundle: DatasetBundle | None = None
-        self.predictor_backend = self._build_predictor_backend()
+        self.predictor_backend = build_predictor_backend(settings)
+        self._forecast_horizons: dict[str, ForecastHorizon] = {}
+        # Por geracao, nao por versao: desligados e atribuicao por entidade mudam sem mexer nos
+        # totais diarios que formam a versao.
+        self._entity_breakdowns: dict[int, tuple[ForecastHorizon, dict[str, EntityForecasts]]] = {}
+        self._forecast_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._bundle_generations = itertools.count(1)
+        self.response_cache = ResponseCache(settings.prediction_cache_size)
+        self.forecast_gate = ConcurrencyGate(settings.forecast_max_concurrency)
 
     def initialize(self) -> None:
-        raw_df = self.dataset_repository.load_events()
+        self.dataset_bundle = self._load_dataset_bundle()
+        training_df = self._training_frame(self.dataset_bundle)
+        if self.settings.preload_app:
+            # Com preload o mestre do gunicorn treina antes do fork e os workers herdam o modelo.
+            model_ready = self.predictor_backend.ensure_trained(training_df, wait=True)
+        else:
+            model_ready = self.predictor_backend.warmup(training_df)
+        if model_ready:
+            logger.info(
+                "Modelo de previsao pronto para a versao %s da base.",
+                self.dataset_bundle.version,
+            )
+        self._prepare_forecasts(self.dataset_bundle)
+
+    def after_fork(self) -> None:
+        self._forecast_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.forecast_gate.after_fork()
+        self.predictor_backend.after_fork()
+
+    def reload(self) -> dict[str, Any]:
+        with self._reload_lock:
+            started_at = time.perf_counter()
+            previous_bundle = self.dataset_bundle
+            bundle = self._load_dataset_bundle()
+            self._prepare_forecasts(bundle)
+
+            self.dataset_bundle = bundle
+            self.response_cache.clear()
+
+        return {
+            "reloaded": True,
+            "dataset_version": bundle.version,
+            "previous_dataset_version": previous_bundle.version if previous_bundle else None,
+            "records_loaded": bundle.analytics_cache["total_registros"],
+            "duration_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        }
+
+    def ingest_events(self, batch_df: pd.DataFrame) -> dict[str, Any]:
+        with self._reload_lock:
+            started_at = time.perf_counter()
+            bundle = self._require_dataset_bundle()
+            received = int(len(batch_df))
+
+            batch_hashes = self._hash_event_ids(batch_df[EVENT_ID_COLUMN])
+            is_new = ~pd.Series(batch_hashes).duplicated().to_numpy()
+            is_new &= ~np.isin(batch_hashes, bundle.event_id_hashes)
+            batch_df = batch_df.loc[is_new].drop(columns=[EVENT_ID_COLUMN])
+            summary = {
+                "received": received,
+                "duplicates": received - int(len(batch_df)),
+                "ingested": int(len(batch_df)),
+                "previous_dataset_version": bundle.version,
+            }
+            if batch_df.empty:
+                return {
+                    **summary,
+                    "dataset_version": bundle.version,
+                    "records_loaded": bundle.analytics_cache["total_registros"],
+                    "duration_ms": round((time.perf_counter() - started_at) * 1000, 1),
+                }
+
+            # Totais, janelas de ranking, indices e ids crescem so com o lote; a base ja preparada
+            # nao e reagrupada nem reordenada (anexar linhas ao DataFrame e aos arrays e so copia).
+            totals = self._merge_totals(
+                bundle.analytics_cache["totals"],
+                self._aggregate_totals(batch_df),
+            )
+            dados = self.dataset_repository.append_events(bundle.dados, batch_df)
+            batch_rows = dados.iloc[len(bundle.dados) :]
+            ranking_state = self._update_ranking_state(
+                bundle.analytics_cache["ranking_state"],
+                batch_rows,
+            )
+            analytics_cache = self._finalize_analytics(
+                totals=totals,
+                dismissed_drivers=bundle.dismissed_drivers,
+                total_registros=bundle.analytics_cache["total_registros"] + int(len(batch_df)),
+                ultima_atualizacao=pd.Timestamp.now(tz="UTC").tz_localize(None),
+                ranking_views=self._build_ranking_views(ranking_state, bundle.dismissed_drivers),
+                ranking_state=ranking_state,
+            )
+            dados_aggregated = analytics_cache["aggregated"].copy()
+            filter_index, spatial_index = self._extend_indexes(bundle, dados, batch_rows)
+
+            new_hashes = np.unique(batch_hashes[is_new])
+            event_id_hashes = np.insert(
+                bundle.event_id_hashes,
+                np.searchsorted(bundle.event_id_hashes, new_hashes),
+                new_hashes,
+            )
+            event_id_hashes.flags.writeable = False
+            updated_bundle = DatasetBundle(
+                dados=dados,
+                dados_aggregated=dados_aggregated,
+                dismissed_drivers=bundle.dismissed_drivers,
+                analytics_cache=analytics_cache,
+                version=self._dataset_fingerprint(dados_aggregated),
+                source_signature=bundle.source_signature,
+                event_id_hashes=event_id_hashes,
+                filter_index=filter_index,
+                spatial_index=spatial_index,
+                generation=next(self._bundle_generations),
+            )
+            self._prepare_forecasts(updated_bundle)
+
+            self.dataset_bundle = updated_bundle
+            self.response_cache.clear()
+
+        logger.info(
+            "%s eventos incrementais ingeridos (%s duplicados descartados).",
+            summary["ingested"],
+            summary["duplicates"],
+        )
+        return {
+            **summary,
+            "dataset_version": updated_bundle.version,
+            "records_loaded": analytics_cache["total_registros"],
+            "duration_ms": round((time.perf_counter() - started_at) * 1000, 1),
+        }
+
+    def source_signature(self) -> tuple[tuple[int, int] | None, ...]:
+        signature = []
+        for file_path in (self.settings.data_file, self.settings.dismissed_drivers_file):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                signature.append(None)
+                continue
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    @staticmethod
+    def _extend_indexes(
+        bundle: DatasetBundle,
+        dados: pd.DataFrame,
+        batch_rows: pd.DataFrame,
+    ) -> tuple[FilterIndex, SpatialIndex]:
+        # Evento anterior ao primeiro dia da base desloca todos os offsets: so entao reconstroi.
+        first_batch_day = batch_rows["Data"].to_numpy().astype("datetime64[D]").min()
+        if first_batch_day < bundle.filter_index.first_day:
+            return build_filter_index(dados), build_spatial_index(dados)
+
+        filter_index = extend_filter_index(bundle.filter_index, batch_rows)
+        spatial_index = extend_spatial_index(
+            bundle.spatial_index,
+            batch_rows,
+            filter_index.first_day,
+            len(filter_index.daily_total),
+        )
+        return filter_index, spatial_index
+
+    def _load_dataset_bundle(self) -> DatasetBundle:
+        source_signature = self.source_signature()
+        dados = self.dataset_repository.load_prepared_events()
+        # Os ids so servem para deduplicar a ingestao; guardar hashes uint64 ordenados em vez de
+        # milhares de str evita que o refcount das strings suje paginas compartilhadas apos o fork.
+        event_id_hashes = np.unique(
+            self._hash_event_ids(dados[EVENT_ID_COLUMN].dropna())
+            if EVENT_ID_COLUMN in dados.columns
+            else np.empty(0, dtype=np.uint64)
+        )
+        event_id_hashes.flags.writeable = False
+        dados = dados.drop(columns=[EVENT_ID_COLUMN], errors="ignore")
         dismissed_drivers = self.dataset_repository.load_dismissed_drivers()
-        dados = self.dataset_repository.prepare_events(raw_df)
         analytics_cache = self._build_analytics(dados, dismissed_drivers)
         dados_aggregated = analytics_cache["aggregated"].copy()
 
-        self.dataset_bundle = DatasetBundle(
+        bundle = DatasetBundle(
             dados=dados,
             dados_aggregated=dados_aggregated,
             dismissed_drivers=dismissed_drivers,
             analytics_cache=analytics_cache,
+            version=self._dataset_fingerprint(dados_aggregated),
+            source_signature=source_signature,
+            event_id_hashes=event_id_hashes,
+            filter_index=build_filter_index(dados),
+            spatial_index=build_spatial_index(dados),
+            generation=next(self._bundle_generations),
         )
         logger.info(
             "Base carregada com sucesso. %s registros entre %s e %s.",
@@ -100,6 +325,7 @@ class PredictionService:
             analytics_cache["data_inicio"],
             analytics_cache["data_fim"],
         )
+        return bundle
 
     def health_payload(self) -> dict[str, Any]:
         bundle = self._require_dataset_bundle()
@@ -108,9 +334,11 @@ class PredictionService:
             pd.to_datetime(historical_end) + pd.Timedelta(days=1)
         ).strftime("%Y-%m-%d")
 
+        training_state = self.predictor_backend.training_state()
         return {
             "status": "ok",
-            "model_ready": True,
+            "model_ready": training_state["model_ready"],
+            "model_training": training_state,
             "records_loaded": bundle.analytics_cache["total_registros"],
             "historical_window": {
                 "start": bundle.analytics_cache["data_inicio"],
@@ -121,55 +349,597 @@ class PredictionService:
             "forecast_days": self.settings.forecast_days,
             "predictor_mode": self.settings.predictor_mode,
             "backend_name": self.predictor_backend.backend_name,
+            "dataset_version": bundle.version,
         }
 
-    def predict_for_date(self, requested_date_raw: str | None) -> dict[str, Any]:
+    @staticmethod
+    def health_etag(payload: dict[str, Any]) -> str:
+        # So a versao da base e o estado do treino: contadores ao vivo ficam em /health/stats.
+        fingerprint = json.dumps(
+            [payload["dataset_version"], payload["model_training"]],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(fingerprint.encode("utf-8"), digest_size=16).hexdigest()
+
+    def runtime_stats(self) -> dict[str, Any]:
+        return {
+            "response_cache": self.response_cache.stats(),
+            "forecast_gate": self.forecast_gate.stats(),
+        }
+
+    def predict_for_date(
+        self,
+        requested_date_raw: str | None,
+        ranking_raw: str | None = None,
+        filters_raw: Mapping[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        bundle = self._require_dataset_bundle()
+        requested_date = self._resolve_requested_date(requested_date_raw)
+        ranking = self._resolve_ranking(bundle, ranking_raw)
+        filters = self._resolve_filters(bundle, filters_raw)
+        horizon = self._get_forecast_horizon(bundle, gated=True)
+        with self.forecast_gate.slot():
+            return self._build_prediction(bundle, requested_date, horizon, ranking, filters)
+
+    def predict_response(
+        self,
+        requested_date_raw: str | None,
+        serializer: Callable[[dict[str, Any]], str],
+        ranking_raw: str | None = None,
+        filters_raw: Mapping[str, Any] | None = None,
+    ) -> CachedResponse:
+        bundle = self._require_dataset_bundle()
+        requested_date = self._resolve_requested_date(requested_date_raw)
+        ranking = self._resolve_ranking(bundle, ranking_raw)
+        filters = self._resolve_filters(bundle, filters_raw)
+        horizon = self._get_forecast_horizon(bundle, gated=True)
+        cache_key = (
+            bundle.version,
+            bundle.generation,
+            horizon.model_generation,
+            horizon.provisional,
+            requested_date.strftime("%Y-%m-%d"),
+            ranking,
+            filters,
+        )
+        return self.response_cache.get_or_create(
+            cache_key,
+            lambda: self._serialize_gated(
+                lambda: self._build_prediction(bundle, requested_date, horizon, ranking, filters),
+                serializer,
+            ),
+        )
+
+    def predict_range(
+        self,
+        requested_dates: list[pd.Timestamp],
+        ranking_raw: str | None = None,
+        filters_raw: Mapping[str, Any] | None = None,
+    ) -> dict[str, Any]:
         bundle = self._require_dataset_bundle()
-        requested_date, parse_error = self._parse_requested_date(requested_date_raw)
+        ranking = self._resolve_ranking(bundle, ranking_raw)
+        filters = self._resolve_filters(bundle, filters_raw)
+        horizon = self._get_forecast_horizon(bundle, gated=True)
+        with self.forecast_gate.slot():
+            return self._build_range_prediction(bundle, requested_dates, horizon, ranking, filters)
 
-        if parse_error:
-            raise ValueError(parse_error)
+    def predict_range_response(
+        self,
+        requested_dates: list[pd.Timestamp],
+        serializer: Callable[[dict[str, Any]], str],
+        ranking_raw: str | None = None,
+        filters_raw: Mapping[str, Any] | None = None,
+    ) -> CachedResponse:
+        bundle = self._require_dataset_bundle()
+        ranking = self._resolve_ranking(bundle, ranking_raw)
+        filters = self._resolve_filters(bundle, filters_raw)
+        horizon = self._get_forecast_horizon(bundle, gated=True)
+        cache_key = (
+            bundle.version,
+            bundle.generation,
+            horizon.model_generation,
+            horizon.provisional,
+            "range",
+            tuple(requested_date.strftime("%Y-%m-%d") for requested_date in requested_dates),
+            ranking,
+            filters,
+        )
+        return self.response_cache.get_or_create(
+            cache_key,
+            lambda: self._serialize_gated(
+                lambda: self._build_range_prediction(
+                    bundle, requested_dates, horizon, ranking, filters
+                ),
+                serializer,
+            ),
+        )
 
-        training_df = bundle.dados_aggregated.rename(columns={"Data": "ds", "QUANTIDADE": "y"})
-        future_predictions = self.predictor_backend.forecast(
-            training_df=training_df,
-            periods=self.settings.forecast_days,
+    def _serialize_gated(
+        self,
+        build: Callable[[], dict[str, Any]],
+        serializer: Callable[[dict[str, Any]], str],
+    ) -> bytes:
+        # So o calculo (cache miss) ocupa vaga; respostas em cache nunca sao recusadas.
+        with self.forecast_gate.slot():
+            return serializer(build()).encode("utf-8")
+
+    def resolve_date_range(
+        self,
+        start_raw: str | None,
+        end_raw: str | None,
+    ) -> list[pd.Timestamp]:
+        start = (
+            self._parse_range_date(start_raw, "start")
+            if start_raw
+            else self._resolve_requested_date(None)
+        )
+        if end_raw:
+            end = self._parse_range_date(end_raw, "end")
+        else:
+            bundle = self._require_dataset_bundle()
+            end = self._get_forecast_horizon(bundle, gated=True).end.normalize()
+        if end < start:
+            raise ValueError("Parametro 'end' deve ser igual ou posterior a 'start'.")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise ValueError(f"Intervalo maximo de {MAX_RANGE_DAYS} dias por requisicao.")
+        return list(pd.date_range(start, end, freq="D"))
+
+    def resolve_date_list(self, raw_dates: Any) -> list[pd.Timestamp]:
+        if not isinstance(raw_dates, list) or not raw_dates:
+            raise ValueError("Envie 'dates' como uma lista de datas no formato YYYY-MM-DD.")
+        if len(raw_dates) > MAX_RANGE_DAYS:
+            raise ValueError(f"Maximo de {MAX_RANGE_DAYS} datas por requisicao.")
+        return sorted({self._parse_range_date(raw_date, "dates") for raw_date in raw_dates})
+
+    def entity_detail(
+        self,
+        dimension: str,
+        raw_name: str,
+        page_raw: str | None = None,
+        page_size_raw: str | None = None,
+    ) -> dict[str, Any]:
+        bundle = self._require_dataset_bundle()
+        page, page_size = self._resolve_page(page_raw, page_size_raw)
+        return self._build_entity_detail(bundle, dimension, raw_name.strip(), page, page_size)
+
+    def entity_detail_response(
+        self,
+        dimension: str,
+        raw_name: str,
+        serializer: Callable[[dict[str, Any]], str],
+        page_raw: str | None = None,
+        page_size_raw: str | None = None,
+    ) -> CachedResponse:
+        bundle = self._require_dataset_bundle()
+        page, page_size = self._resolve_page(page_raw, page_size_raw)
+        name = raw_name.strip()
+        cache_key = (bundle.version, bundle.generation, "entity", dimension, name, page, page_size)
+        return self.response_cache.get_or_create(
+            cache_key,
+            lambda: serializer(
+                self._build_entity_detail(bundle, dimension, name, page, page_size)
+            ).encode("utf-8"),
         )
 
-        forecast_start_ts = future_predictions["ds"].min()
-        forecast_end_ts = future_predictions["ds"].max()
-        forecast_start = forecast_start_ts.strftime("%Y-%m-%d")
-        forecast_end = forecast_end_ts.strftime("%Y-%m-%d")
+    def heatmap(self, event_types_raw: list[str] | None = None) -> dict[str, Any]:
+        bundle = self._require_dataset_bundle()
+        event_types = self._resolve_event_types(bundle, event_types_raw)
+        return self._build_heatmap(bundle, event_types)
+
+    def heatmap_response(
+        self,
+        serializer: Callable[[dict[str, Any]], str],
+        event_types_raw: list[str] | None = None,
+    ) -> CachedResponse:
+        bundle = self._require_dataset_bundle()
+        event_types = self._resolve_event_types(bundle, event_types_raw)
+        cache_key = (bundle.version, bundle.generation, "heatmap", event_types)
+        return self.response_cache.get_or_create(
+            cache_key,
+            lambda: serializer(self._build_heatmap(bundle, event_types)).encode("utf-8"),
+        )
+
+    @staticmethod
+    def _resolve_event_types(
+        bundle: DatasetBundle,
+        event_types_raw: list[str] | None,
+    ) -> tuple[str, ...]:
+        event_types = tuple(
+            sorted({value.strip() for value in event_types_raw or []} - {""})
+        )
+        known_labels = bundle.analytics_cache["event_hour_cube"].labels
+        unknown = [event_type for event_type in event_types if event_type not in known_labels]
+        if unknown:
+            raise ValueError(f"Tipo de evento '{unknown[0]}' nao encontrado na base.")
+        return event_types
+
+    def _build_heatmap(self, bundle: DatasetBundle, event_types: tuple[str, ...]) -> dict[str, Any]:
+        # Cubo hora x dia da semana x tipo pre-agregado na carga; aqui so soma fatias.
+        matrix = bundle.analytics_cache["event_hour_cube"].matrix(event_types)
+        peak_weekday, peak_hour = np.unravel_index(int(np.argmax(matrix)), matrix.shape)
+        return {
+            "tipos_evento": list(event_types)
+            or bundle.analytics_cache["event_hour_cube"].labels,
+            "dias_semana": list(WEEKDAY_LABELS),
+            "horas": list(range(24)),
+            "matriz": matrix.astype(np.int64).tolist(),
+            "total_por_dia_semana": matrix.sum(axis=1).astype(np.int64).tolist(),
+            "total_por_hora": matrix.sum(axis=0).astype(np.int64).tolist(),
+            "total_eventos": int(matrix.sum()),
+            "pico": {
+                "dia_semana": WEEKDAY_LABELS[peak_weekday],
+                "hora": int(peak_hour),
+                "eventos": int(matrix[peak_weekday, peak_hour]),
+            },
+            "dataset_version": bundle.version,
+        }
+
+    def hotspots(
+        self,
+        bbox_raw: str | None = None,
+        zoom_raw: str | None = None,
+        days_raw: str | None = None,
+    ) -> dict[str, Any]:
+        bundle = self._require_dataset_bundle()
+        bbox = self._parse_bbox(bbox_raw)
+        zoom = self._parse_int_parameter(zoom_raw, "zoom", DEFAULT_HOTSPOT_ZOOM, 0, BASE_ZOOM)
+        days = self._parse_int_parameter(days_raw, "days", None, 1, None)
+        return self._build_hotspots(bundle, bbox, zoom, days)
 
-        prediction_row = future_predictions[future_predictions["ds"].dt.date == requested_date.date()]
-        if prediction_row.empty:
+    def hotspots_response(
+        self,
+        serializer: Callable[[dict[str, Any]], str],
+        bbox_raw: str | None = None,
+        zoom_raw: str | None = None,
+        days_raw: str | None = None,
+    ) -> CachedResponse:
+        bundle = self._require_dataset_bundle()
+        bbox = self._parse_bbox(bbox_raw)
+        zoom = self._parse_int_parameter(zoom_raw, "zoom", DEFAULT_HOTSPOT_ZOOM, 0, BASE_ZOOM)
+        days = self._parse_int_parameter(days_raw, "days", None, 1, None)
+        cache_key = (bundle.version, bundle.generation, "hotspots", bbox, zoom, days)
+        return self.response_cache.get_or_create(
+            cache_key,
+            lambda: serializer(self._build_hotspots(bundle, bbox, zoom, days)).encode("utf-8"),
+        )
+
+    def _build_hotspots(
+        self,
+        bundle: DatasetBundle,
+        bbox: tuple[float, float, float, float] | None,
+        zoom: int,
+        days: int | None,
+    ) -> dict[str, Any]:
+        clusters = bundle.spatial_index.clusters(bbox, zoom, days)
+        total_eventos = float(clusters["eventos"].sum())
+        top_clusters = clusters.head(MAX_HOTSPOT_CLUSTERS)
+        bounds = tile_bounds(
+            top_clusters["x"].to_numpy(),
+            top_clusters["y"].to_numpy(),
+            int(top_clusters["zoom"].iloc[0]) if not top_clusters.empty else zoom,
+        )
+        return {
+            "zoom": zoom,
+            "bbox": list(bbox) if bbox else None,
+            "dias": days,
+            "total_eventos": int(total_eventos),
+            "total_clusters": int(len(clusters)),
+            "clusters": [
+                {
+                    "latitude": round(row.latitude, 6),
+                    "longitude": round(row.longitude, 6),
+                    "eventos": int(row.eventos),
+                    "registros": int(row.registros),
+                    "participacao_percentual": self._round_float(
+                        row.eventos / total_eventos * 100 if total_eventos > 0 else 0.0
+                    ),
+                    "celula": {"x": int(row.x), "y": int(row.y), "zoom": int(row.zoom)},
+                    "bounds": [round(value, 6) for value in cell_bounds],
+                }
+                for row, cell_bounds in zip(
+                    top_clusters.itertuples(index=False), bounds.tolist()
+                )
+            ],
+            "dataset_version": bundle.version,
+        }
+
+    @staticmethod
+    def _parse_bbox(bbox_raw: str | None) -> tuple[float, float, float, float] | None:
+        if not bbox_raw:
+            return None
+        try:
+            min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox_raw.split(","))
+        except ValueError:
+            raise ValueError(
+                "Parametro 'bbox' invalido. Use min_lon,min_lat,max_lon,max_lat."
+            ) from None
+        if not (-180 <= min_lon <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+            raise ValueError("Parametro 'bbox' fora dos limites ou com minimos acima dos maximos.")
+        return min_lon, min_lat, max_lon, max_lat
+
+    @staticmethod
+    def _parse_int_parameter(
+        raw_value: str | None,
+        parameter: str,
+        default: int | None,
+        minimum: int,
+        maximum: int | None,
+    ) -> int | None:
+        if not raw_value:
+            return default
+        try:
+            value = int(raw_value)
+        except ValueError:
+            raise ValueError(f"Parametro '{parameter}' deve ser inteiro.") from None
+        if value < minimum or (maximum is not None and value > maximum):
+            limits = f"entre {minimum} e {maximum}" if maximum is not None else f">= {minimum}"
+            raise ValueError(f"Parametro '{parameter}' deve ser {limits}.")
+        return value
+
+    @staticmethod
+    def _resolve_page(page_raw: str | None, page_size_raw: str | None) -> tuple[int, int]:
+        try:
+            page = int(page_raw) if page_raw else 1
+            page_size = int(page_size_raw) if page_size_raw else ENTITY_PAGE_SIZE
+        except ValueError:
+            raise ValueError("Parametros 'page' e 'page_size' devem ser inteiros.") from None
+        if page < 1 or not 1 <= page_size <= MAX_ENTITY_PAGE_SIZE:
+            raise ValueError(
+                f"Use 'page' >= 1 e 'page_size' entre 1 e {MAX_ENTITY_PAGE_SIZE}."
+            )
+        return page, page_size
+
+    def _build_entity_detail(
+        self,
+        bundle: DatasetBundle,
+        dimension: str,
+        name: str,
+        page: int,
+        page_size: int,
+    ) -> dict[str, Any]:
+        filter_index = bundle.filter_index
+        entity_index = filter_index.entities[dimension]
+        if name not in entity_index.codes:
+            raise LookupError({"error": f"{dimension} nao encontrado na base.", "nome": name})
+
+        # Offsets do indice por entidade: so as linhas dela sao lidas, sem varrer bundle.dados.
+        rows = entity_index.rows_for((name,))
+        quantities = filter_index.quantities[rows]
+        active_days, day_positions = np.unique(filter_index.day_offsets[rows], return_inverse=True)
+        daily_totals = np.bincount(day_positions, weights=quantities)
+        total_eventos = float(quantities.sum())
+
+        # Serie paginada do dia mais recente para o mais antigo.
+        newest_first = np.arange(len(active_days))[::-1]
+        page_positions = newest_first[(page - 1) * page_size : page * page_size]
+        page_days = filter_index.first_day + active_days[page_positions]
+
+        return {
+            "tipo": dimension.lower(),
+            "nome": name,
+            "desligado": dimension == "Motorista" and name in bundle.dismissed_drivers,
+            "total_registros": int(rows.size),
+            "total_eventos": int(total_eventos),
+            "participacao_percentual": self._round_float(
+                total_eventos / bundle.analytics_cache["total_eventos_historicos"] * 100
+                if bundle.analytics_cache["total_eventos_historicos"] > 0
+                else 0.0
+            ),
+            "primeiro_evento": str(filter_index.first_day + active_days[0]),
+            "ultimo_evento": str(filter_index.first_day + active_days[-1]),
+            "serie_diaria": {
+                "pagina": page,
+                "tamanho_pagina": page_size,
+                "total_dias": int(len(active_days)),
+                "total_paginas": max(-(-len(active_days) // page_size), 1),
+                "itens": [
+                    {"data": str(day), "total": int(total)}
+                    for day, total in zip(page_days, daily_totals[page_positions].tolist())
+                ],
+            },
+            "tipos_evento": self._entity_mix(
+                filter_index, "Tipo de Evento", rows, quantities, "TipoEvento"
+            ),
+            "criticidade": self._entity_mix(
+                filter_index, "Criticidade", rows, quantities, "Criticidade"
+            ),
+            "dataset_version": bundle.version,
+        }
+
+    @staticmethod
+    def _entity_mix(
+        filter_index: FilterIndex,
+        column: str,
+        rows: np.ndarray,
+        quantities: np.ndarray,
+        label_key: str,
+    ) -> list[dict[str, Any]]:
+        if column not in filter_index.entity_codes:
+            return []
+
+        labels = filter_index.entity_labels[column]
+        codes = filter_index.entity_codes[column][rows]
+        observed = codes >= 0
+        volumes = np.bincount(codes[observed], weights=quantities[observed], minlength=len(labels))
+        present = np.flatnonzero(np.bincount(codes[observed], minlength=len(labels)))
+        present = present[np.argsort(-volumes[present], kind="stable")]
+        total = volumes.sum()
+        return [
+            {
+                label_key: labels[code],
+                "Quantidade": int(volumes[code]),
+                "ParticipacaoPercentual": round(float(volumes[code] / total * 100), 2)
+                if total > 0
+                else 0.0,
+            }
+            for code in present.tolist()
+        ]
+
+    @staticmethod
+    def _parse_range_date(raw_date: Any, parameter: str) -> pd.Timestamp:
+        try:
+            return pd.to_datetime(raw_date, format="%Y-%m-%d", errors="raise").normalize()
+        except (TypeError, ValueError):
+            raise ValueError(
+                f"Parametro '{parameter}' invalido. Use o formato YYYY-MM-DD."
+            ) from None
+
+    def _build_prediction(
+        self,
+        bundle: DatasetBundle,
+        requested_date: pd.Timestamp,
+        horizon: ForecastHorizon | None = None,
+        ranking: str = "all",
+        filters: Filters = (),
+    ) -> dict[str, Any]:
+        horizon = horizon or self._get_forecast_horizon(bundle)
+        analytics_cache, filter_share = self._analytics_view(bundle, filters)
+        previsao_total = self._lookup_forecast(horizon, requested_date) * filter_share
+        breakdowns = self._active_breakdowns(bundle, horizon, ranking, filters)
+        top_drivers, top_locations, top_events, event_breakdown = self._build_rankings(
+            analytics_cache=analytics_cache,
+            breakdowns=breakdowns,
+            ranking=ranking,
+            requested_dates=[requested_date],
+            previsao_total=previsao_total,
+        )
+        resumo_executivo, insights_prioritarios = self._build_risk_summary(
+            previsao_total=previsao_total,
+            top_drivers=top_drivers,
+            top_locations=top_locations,
+            top_events=top_events,
+            analytics_cache=analytics_cache,
+        )
+
+        return {
+            "data_previsao": requested_date.strftime("%Y-%m-%d"),
+            "previsao_total_yhat1": self._round_float(previsao_total),
+            "forecast_period_start": horizon.start.strftime("%Y-%m-%d"),
+            "forecast_period_end": horizon.end.strftime("%Y-%m-%d"),
+            "top_10_motoristas_geral": top_drivers,
+            "top_3_localidades": top_locations,
+            "top_tipos_evento": top_events,
+            "probabilidade_eventos_especificos": event_breakdown,
+            "serie_historica_recente": analytics_cache["serie_historica_recente"],
+            "resumo_executivo": resumo_executivo,
+            "insights_prioritarios": insights_prioritarios,
+            "dataset_contexto": {
+                "total_registros": analytics_cache["total_registros"],
+                "total_eventos_historicos": int(
+                    analytics_cache["total_eventos_historicos"]
+                ),
+                "motoristas_monitorados": analytics_cache["motoristas_monitorados"],
+                "localidades_monitoradas": analytics_cache["localidades_monitoradas"],
+                "tipos_evento_monitorados": analytics_cache["tipos_evento_monitorados"],
+                "janela_historica_inicio": analytics_cache["data_inicio"],
+                "janela_historica_fim": analytics_cache["data_fim"],
+                "ultima_atualizacao_arquivo": analytics_cache["ultima_atualizacao_arquivo"],
+                "motoristas_desligados_filtrados": len(bundle.dismissed_drivers),
+            },
+            "meta": self._prediction_meta(horizon, ranking, breakdowns, filters, filter_share),
+        }
+
+    def _build_range_prediction(
+        self,
+        bundle: DatasetBundle,
+        requested_dates: list[pd.Timestamp],
+        horizon: ForecastHorizon | None = None,
+        ranking: str = "all",
+        filters: Filters = (),
+    ) -> dict[str, Any]:
+        horizon = horizon or self._get_forecast_horizon(bundle)
+        analytics_cache, filter_share = self._analytics_view(bundle, filters)
+        daily_totals = [
+            self._lookup_forecast(horizon, requested_date) * filter_share
+            for requested_date in requested_dates
+        ]
+        previsao_total_periodo = float(sum(daily_totals))
+        breakdowns = self._active_breakdowns(bundle, horizon, ranking, filters)
+        top_drivers, top_locations, top_events, event_breakdown = self._build_rankings(
+            analytics_cache=analytics_cache,
+            breakdowns=breakdowns,
+            ranking=ranking,
+            requested_dates=requested_dates,
+            previsao_total=previsao_total_periodo,
+        )
+
+        return {
+            "data_inicio": requested_dates[0].strftime("%Y-%m-%d"),
+            "data_fim": requested_dates[-1].strftime("%Y-%m-%d"),
+            "dias": len(requested_dates),
+            "previsao_total_periodo": self._round_float(previsao_total_periodo),
+            "previsoes_diarias": [
+                {
+                    "data": requested_date.strftime("%Y-%m-%d"),
+                    "previsao_total_yhat1": self._round_float(daily_total),
+                }
+                for requested_date, daily_total in zip(requested_dates, daily_totals)
+            ],
+            "forecast_period_start": horizon.start.strftime("%Y-%m-%d"),
+            "forecast_period_end": horizon.end.strftime("%Y-%m-%d"),
+            "top_10_motoristas_geral": top_drivers,
+            "top_3_localidades": top_locations,
+            "top_tipos_evento": top_events,
+            "probabilidade_eventos_especificos": event_breakdown,
+            "meta": self._prediction_meta(horizon, ranking, breakdowns, filters, filter_share),
+        }
+
+    def _lookup_forecast(self, horizon: ForecastHorizon, requested_date: pd.Timestamp) -> float:
+        predicted_value = horizon.lookup(requested_date)
+        if predicted_value is None:
             raise LookupError(
                 {
                     "error": "Data fora do intervalo de previsao.",
                     "requested_date": requested_date.strftime("%Y-%m-%d"),
-                    "forecast_period_start": forecast_start,
-                    "forecast_period_end": forecast_end,
+                    "forecast_period_start": horizon.start.strftime("%Y-%m-%d"),
+                    "forecast_period_end": horizon.end.strftime("%Y-%m-%d"),
                 }
             )
+        return max(predicted_value, 0.0)
 
-        previsao_total = max(float(prediction_row["yhat1"].iloc[0]), 0.0)
-        total_eventos_historicos = bundle.analytics_cache["total_eventos_historicos"]
+    def _build_rankings(
+        self,
+        analytics_cache: dict[str, Any],
+        breakdowns: dict[str, EntityForecasts],
+        ranking: str,
+        requested_dates: list[pd.Timestamp],
+        previsao_total: float,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]], dict[str, Any]]:
+        rankings = (
+            analytics_cache if ranking == "all" else analytics_cache["ranking_views"][ranking]
+        )
+        total_eventos_historicos = rankings["total_eventos_historicos"]
 
-        top_drivers_df = bundle.analytics_cache["driver_totals"].head(TOP_DRIVER_LIMIT)
-        top_locations_df = bundle.analytics_cache["location_totals"].head(TOP_LOCATION_LIMIT)
-        top_events_df = bundle.analytics_cache["event_totals"].head(TOP_EVENT_LIMIT)
+        if breakdowns:
+            top_drivers_df, expected_drivers = self._rank_by_forecast(
+                breakdowns["Motorista"], requested_dates, TOP_DRIVER_LIMIT
+            )
+            top_locations_df, expected_locations = self._rank_by_forecast(
+                breakdowns["Localidade"], requested_dates, TOP_LOCATION_LIMIT
+            )
+            top_events_df, expected_events = self._rank_by_forecast(
+                breakdowns["Tipo de Evento"], requested_dates, TOP_EVENT_LIMIT
+            )
+        else:
+            top_drivers_df = rankings["driver_totals"].head(TOP_DRIVER_LIMIT)
+            top_locations_df = rankings["location_totals"].head(TOP_LOCATION_LIMIT)
+            top_events_df = rankings["event_totals"].head(TOP_EVENT_LIMIT)
+            expected_drivers = expected_locations = expected_events = None
 
         top_drivers = self._build_ranked_items(
             grouped_df=top_drivers_df,
             label_column="Motorista",
             total_eventos_historicos=total_eventos_historicos,
             previsao_total=previsao_total,
+            expected_events=expected_drivers,
         )
         top_locations = self._build_ranked_items(
             grouped_df=top_locations_df,
             label_column="Localidade",
             total_eventos_historicos=total_eventos_historicos,
             previsao_total=previsao_total,
+            expected_events=expected_locations,
         )
         top_events = self._build_ranked_items(
             grouped_df=top_events_df,
@@ -177,63 +947,294 @@ class PredictionService:
             total_eventos_historicos=total_eventos_historicos,
             previsao_total=previsao_total,
             output_label="TipoEvento",
+            expected_events=expected_events,
         )
         event_breakdown = self._build_event_specific_probabilities(
-            source_df=bundle.dados,
             event_totals=top_events_df,
+            event_driver_shares=rankings["event_driver_shares"],
             previsao_total=previsao_total,
             total_eventos_historicos=total_eventos_historicos,
+            event_expected_totals=expected_events,
+        )
+        return top_drivers, top_locations, top_events, event_breakdown
+
+    def _active_breakdowns(
+        self,
+        bundle: DatasetBundle,
+        horizon: ForecastHorizon,
+        ranking: str,
+        filters: Filters,
+    ) -> dict[str, EntityForecasts]:
+        # As series hierarquicas cobrem todo o historico sem filtros; janelas e filtros voltam ao
+        # modo share para ordenar e dividir pela mesma visao.
+        if filters or ranking != "all":
+            return {}
+        return self._get_entity_breakdowns(bundle, horizon)
+
+    def _prediction_meta(
+        self,
+        horizon: ForecastHorizon,
+        ranking: str,
+        breakdowns: dict[str, EntityForecasts],
+        filters: Filters,
+        filter_share: float,
+    ) -> dict[str, Any]:
+        return {
+            "backend": self.predictor_backend.backend_name,
+            "forecast_source": horizon.source,
+            "provisional": horizon.provisional,
+            "forecast_days": self.settings.forecast_days,
+            "recent_history_days": self.settings.recent_history_days,
+            "predictor_mode": self.settings.predictor_mode,
+            "breakdown_mode": "hierarchical" if breakdowns else "share",
+            "ranking": ranking,
+            "filters": {key: list(labels) for key, labels in filters},
+            "filter_share": round(filter_share, 6),
+        }
+
+    def _analytics_view(
+        self,
+        bundle: DatasetBundle,
+        filters: Filters,
+    ) -> tuple[dict[str, Any], float]:
+        if not filters:
+            return bundle.analytics_cache, 1.0
+
+        # Linhas vindas do indice invertido; nada de varrer e reagrupar bundle.dados por requisicao.
+        filter_index = bundle.filter_index
+        rows = filter_index.select_rows(filters)
+        if not rows.size:
+            raise LookupError(
+                {
+                    "error": "Nenhum evento historico para os filtros informados.",
+                    "filters": {key: list(labels) for key, labels in filters},
+                }
+            )
+
+        # A previsao do filtro e a do total escalada pela participacao recente do recorte.
+        filtered_daily = filter_index.daily_totals(filters, rows)
+        recent_total = filter_index.daily_total[-FILTER_SHARE_WINDOW_DAYS:].sum()
+        if recent_total > 0:
+            filter_share = filtered_daily[-FILTER_SHARE_WINDOW_DAYS:].sum() / recent_total
+        else:
+            filter_share = filtered_daily.sum() / max(filter_index.daily_total.sum(), 1.0)
+
+        quantities = filter_index.quantities[rows]
+        age_days = len(filter_index.daily_total) - 1 - filter_index.day_offsets[rows]
+        ranking_views = {}
+        for view, weights in self._ranking_weights(age_days, quantities).items():
+            totals = filter_index.aggregate_totals(rows, weights)
+            ranking_views[view] = {
+                **self._rank_dimension_totals(
+                    {key: values.loc[values > 0] for key, values in totals.items()},
+                    bundle.dismissed_drivers,
+                ),
+                "total_eventos_historicos": float(weights.sum()),
+            }
+
+        analytics_cache = self._finalize_analytics(
+            totals=filter_index.aggregate_totals(rows),
             dismissed_drivers=bundle.dismissed_drivers,
+            total_registros=int(rows.size),
+            ultima_atualizacao=bundle.analytics_cache["ultima_atualizacao"],
+            ranking_views=ranking_views,
         )
-        resumo_executivo, insights_prioritarios = self._build_risk_summary(
-            previsao_total=previsao_total,
-            top_drivers=top_drivers,
-            top_locations=top_locations,
-            top_events=top_events,
-            analytics_cache=bundle.analytics_cache,
+        return analytics_cache, float(filter_share)
+
+    def _get_forecast_horizon(self, bundle: DatasetBundle, gated: bool = False) -> ForecastHorizon:
+        horizon = self._forecast_horizons.get(bundle.version)
+        if horizon is not None and not self._is_superseded(horizon):
+            return horizon
+
+        # So requisicoes disputam vagas; recarga, ingestao e aquecimento nunca sao recusados.
+        slot = self.forecast_gate.slot() if gated else nullcontext()
+        with slot, self._forecast_lock:
+            horizon = self._forecast_horizons.get(bundle.version)
+            if horizon is None or self._is_superseded(horizon):
+                horizon = self._compute_forecast_horizon(bundle)
+                current_version = self.dataset_bundle.version if self.dataset_bundle else None
+                self._forecast_horizons = {
+                    version: cached
+                    for version, cached in self._forecast_horizons.items()
+                    if version == current_version
+                }
+                self._forecast_horizons[bundle.version] = horizon
+        return horizon
+
+    def _is_superseded(self, horizon: ForecastHorizon) -> bool:
+        return horizon.provisional and (
+            horizon.model_generation != self.predictor_backend.model_generation
+            or self.predictor_backend.training_retry_due()
         )
 
-        return {
-            "data_previsao": requested_date.strftime("%Y-%m-%d"),
-            "previsao_total_yhat1": self._round_float(previsao_total),
-            "forecast_period_start": forecast_start,
-            "forecast_period_end": forecast_end,
-            "top_10_motoristas_geral": top_drivers,
-            "top_3_localidades": top_locations,
-            "top_tipos_evento": top_events,
-            "probabilidade_eventos_especificos": event_breakdown,
-            "serie_historica_recente": bundle.analytics_cache["serie_historica_recente"],
-            "resumo_executivo": resumo_executivo,
-            "insights_prioritarios": insights_prioritarios,
-            "dataset_contexto": {
-                "total_registros": bundle.analytics_cache["total_registros"],
-                "total_eventos_historicos": int(total_eventos_historicos),
-                "motoristas_monitorados": bundle.analytics_cache["motoristas_monitorados"],
-                "localidades_monitoradas": bundle.analytics_cache["localidades_monitoradas"],
-                "tipos_evento_monitorados": bundle.analytics_cache["tipos_evento_monitorados"],
-                "janela_historica_inicio": bundle.analytics_cache["data_inicio"],
-                "janela_historica_fim": bundle.analytics_cache["data_fim"],
-                "ultima_atualizacao_arquivo": bundle.analytics_cache["ultima_atualizacao_arquivo"],
-                "motoristas_desligados_filtrados": len(bundle.dismissed_drivers),
-            },
-            "meta": {
-                "backend": self.predictor_backend.backend_name,
-                "forecast_days": self.settings.forecast_days,
-                "recent_history_days": self.settings.recent_history_days,
-                "predictor_mode": self.settings.predictor_mode,
-            },
+    def _compute_forecast_horizon(self, bundle: DatasetBundle) -> ForecastHorizon:
+        training_df = self._training_frame(bundle)
+        model_generation = self.predictor_backend.model_generation
+        future_predictions = self.predictor_backend.forecast(
+            training_df=training_df,
+            periods=self.settings.forecast_days,
+        )
+        provisional = bool(future_predictions.attrs.get("provisional", False))
+        forecast_dates = pd.to_datetime(future_predictions["ds"])
+        values = {
+            forecast_date.date(): float(value)
+            for forecast_date, value in zip(forecast_dates, future_predictions["yhat1"])
         }
+        logger.info(
+            "Horizonte de previsao %scalculado para a versao %s da base (%s dias).",
+            "provisorio " if provisional else "",
+            bundle.version,
+            len(future_predictions),
+        )
+        return ForecastHorizon(
+            dataset_version=bundle.version,
+            start=forecast_dates.min(),
+            end=forecast_dates.max(),
+            values=values,
+            source=future_predictions.attrs.get("source", self.predictor_backend.backend_name),
+            provisional=provisional,
+            model_generation=model_generation,
+        )
+
+    def _prepare_forecasts(self, bundle: DatasetBundle) -> None:
+        self._get_entity_breakdowns(bundle, self._get_forecast_horizon(bundle))
+
+    def _get_entity_breakdowns(
+        self,
+        bundle: DatasetBundle,
+        horizon: ForecastHorizon,
+    ) -> dict[str, EntityForecasts]:
+        if self.settings.breakdown_mode != "hierarchical":
+            return {}
 
-    def _build_predictor_backend(self):
-        if self.settings.predictor_mode == "mock":
-            return MockPredictorBackend()
-        return NeuralProphetPredictorBackend()
+        cached = self._entity_breakdowns.get(bundle.generation)
+        if cached is not None and cached[0] is horizon:
+            return cached[1]
+
+        with self._forecast_lock:
+            cached = self._entity_breakdowns.get(bundle.generation)
+            if cached is not None and cached[0] is horizon:
+                return cached[1]
+            breakdowns = self._build_hierarchical_breakdowns(bundle, horizon.values)
+            current_generation = self.dataset_bundle.generation if self.dataset_bundle else None
+            self._entity_breakdowns = {
+                generation: cached
+                for generation, cached in self._entity_breakdowns.items()
+                if generation == current_generation
+            }
+            self._entity_breakdowns[bundle.generation] = (horizon, breakdowns)
+        return breakdowns
+
+    def _build_hierarchical_breakdowns(
+        self,
+        bundle: DatasetBundle,
+        total_by_day: dict[date, float],
+    ) -> dict[str, EntityForecasts]:
+        started_at = time.perf_counter()
+        breakdowns = {
+            dimension: build_entity_forecasts(
+                bundle.dados,
+                dimension,
+                labels=bundle.analytics_cache[totals_key][dimension]
+                .head(self.settings.hierarchical_top_entities)
+                .tolist(),
+                total_by_day=total_by_day,
+                max_workers=self.settings.hierarchical_workers,
+            )
+            for dimension, totals_key in HIERARCHY_DIMENSIONS.items()
+        }
+        logger.info(
+            "Previsoes por dimensao reconciliadas em %.1f ms (%s series).",
+            (time.perf_counter() - started_at) * 1000,
+            sum(len(breakdown.labels) + 1 for breakdown in breakdowns.values()),
+        )
+        return breakdowns
+
+    @staticmethod
+    def _rank_by_forecast(
+        entity_forecasts: EntityForecasts,
+        requested_dates: list[pd.Timestamp],
+        limit: int,
+    ) -> tuple[pd.DataFrame, np.ndarray]:
+        expected = np.sum(
+            [entity_forecasts.for_date(requested_date) for requested_date in requested_dates],
+            axis=0,
+        )
+        order = np.argsort(-expected, kind="stable")[:limit]
+        ranked_df = pd.DataFrame(
+            {
+                entity_forecasts.dimension: [entity_forecasts.labels[index] for index in order],
+                "QUANTIDADE": entity_forecasts.historical_volumes[order],
+            }
+        )
+        return ranked_df, expected[order]
+
+    @staticmethod
+    def _training_frame(bundle: DatasetBundle) -> pd.DataFrame:
+        return bundle.dados_aggregated.rename(columns={"Data": "ds", "QUANTIDADE": "y"})
+
+    @staticmethod
+    def _dataset_fingerprint(dados_aggregated: pd.DataFrame) -> str:
+        hashed_rows = pd.util.hash_pandas_object(
+            dados_aggregated.astype({"QUANTIDADE": "float64"}),
+            index=False,
+        )
+        return hashlib.blake2b(hashed_rows.to_numpy().tobytes(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _hash_event_ids(event_ids: pd.Series) -> np.ndarray:
+        return pd.util.hash_array(event_ids.astype(str).to_numpy(dtype=object))
 
     def _require_dataset_bundle(self) -> DatasetBundle:
         if self.dataset_bundle is None:
             raise RuntimeError("A base ainda nao foi carregada.")
         return self.dataset_bundle
 
+    @staticmethod
+    def _resolve_ranking(bundle: DatasetBundle, raw_ranking: str | None) -> str:
+        ranking = (raw_ranking or "all").strip().lower()
+        available_rankings = ["all", *bundle.analytics_cache["ranking_views"]]
+        if ranking not in available_rankings:
+            raise ValueError(
+                f"Parametro 'ranking' invalido. Use um de: {', '.join(available_rankings)}."
+            )
+        return ranking
+
+    @staticmethod
+    def _resolve_filters(bundle: DatasetBundle, raw_filters: Mapping[str, Any] | None) -> Filters:
+        if not raw_filters:
+            return ()
+        if not isinstance(raw_filters, Mapping):
+            raise ValueError("Envie 'filters' como um objeto com listas de valores por filtro.")
+
+        resolved = []
+        for key, raw_values in raw_filters.items():
+            if key not in FILTER_DIMENSIONS:
+                raise ValueError(
+                    f"Filtro '{key}' desconhecido. Use um de: {', '.join(FILTER_DIMENSIONS)}."
+                )
+            values = [raw_values] if isinstance(raw_values, str) else list(raw_values or [])
+            labels = tuple(sorted({str(value).strip() for value in values} - {""}))
+            if not labels:
+                continue
+
+            dimension = bundle.filter_index.dimensions.get(key) if bundle.filter_index else None
+            if dimension is None:
+                raise ValueError(f"Filtro '{key}' indisponivel nesta base.")
+            unknown_labels = [label for label in labels if label not in dimension.codes]
+            if unknown_labels:
+                raise ValueError(
+                    f"Valor '{unknown_labels[0]}' nao encontrado para o filtro '{key}'."
+                )
+            resolved.append((key, labels))
+        return tuple(sorted(resolved))
+
+    def _resolve_requested_date(self, raw_date: str | None) -> pd.Timestamp:
+        requested_date, parse_error = self._parse_requested_date(raw_date)
+        if parse_error:
+            raise ValueError(parse_error)
+        return requested_date
+
     def _parse_requested_date(self, raw_date: str | None) -> tuple[pd.Timestamp | None, str | None]:
         if raw_date:
             try:
@@ -250,58 +1251,203 @@ class PredictionService:
         return next_date, None
 
     def _build_analytics(self, source_df: pd.DataFrame, dismissed_drivers: list[str]) -> dict[str, Any]:
-        aggregated = (
-            source_df.groupby("Data", as_index=False)["QUANTIDADE"]
-            .sum()
-            .sort_values("Data")
-            .reset_index(drop=True)
+        ranking_state = self._update_ranking_state(None, source_df)
+        return self._finalize_analytics(
+            totals=self._aggregate_totals(source_df),
+            dismissed_drivers=dismissed_drivers,
+            total_registros=int(len(source_df)),
+            ultima_atualizacao=pd.Timestamp(self.settings.data_file.stat().st_mtime, unit="s"),
+            ranking_views=self._build_ranking_views(ranking_state, dismissed_drivers),
+            ranking_state=ranking_state,
         )
 
-        driver_totals = (
-            source_df.groupby("Motorista", as_index=False)["QUANTIDADE"]
-            .sum()
-            .sort_values("QUANTIDADE", ascending=False)
-            .reset_index(drop=True)
+    def _aggregate_totals(self, source_df: pd.DataFrame) -> dict[str, pd.Series]:
+        event_times = source_df["Data"].dt
+        return {
+            # Dia de calendario, nao o timestamp do evento: a serie de treino fica O(dias).
+            "daily": self._sum_by(source_df, [event_times.normalize().rename("Data")]),
+            "drivers": self._sum_by(source_df, ["Motorista"]),
+            "locations": self._sum_by(source_df, ["Localidade"]),
+            "events": self._sum_by(source_df, ["Tipo de Evento"]),
+            "event_drivers": self._sum_by(source_df, ["Tipo de Evento", "Motorista"]),
+            "event_hours": self._sum_by(
+                source_df,
+                [
+                    source_df["Tipo de Evento"],
+                    event_times.weekday.rename("DiaSemana"),
+                    event_times.hour.rename("Hora"),
+                ],
+            ),
+        }
+
+    def _update_ranking_state(
+        self,
+        state: RankingState | None,
+        source_df: pd.DataFrame,
+    ) -> RankingState | None:
+        if source_df.empty:
+            return state
+
+        event_days = source_df["Data"].to_numpy().astype("datetime64[D]")
+        last_day = event_days.max() if state is None else max(state.last_day, event_days.max())
+        age_days = (last_day - event_days).astype("int64")
+        quantities = source_df["QUANTIDADE"].to_numpy(dtype="float64")
+        decay_weights = quantities * 0.5 ** (age_days / self.settings.ranking_half_life_days)
+        decay_df = source_df[list(RANKED_DIMENSIONS)].assign(decay=decay_weights)
+        decay_totals = {
+            key: self._sum_by(decay_df, columns, "decay") for key, columns in RANKING_GROUPS
+        }
+        decay_total = float(decay_weights.sum())
+
+        recent_days = max(self.settings.ranking_windows_days, default=0)
+        recent = source_df.loc[age_days < recent_days, list(RANKED_DIMENSIONS)].assign(
+            Dia=event_days[age_days < recent_days],
+            QUANTIDADE=quantities[age_days < recent_days],
         )
-        if dismissed_drivers:
-            driver_totals = driver_totals[
-                ~driver_totals["Motorista"].isin(dismissed_drivers)
-            ].reset_index(drop=True)
+        if state is not None:
+            # O decaimento e exponencial: avancar a data de referencia so reescala o acumulado.
+            factor = 0.5 ** (
+                (last_day - state.last_day).astype("int64") / self.settings.ranking_half_life_days
+            )
+            decay_totals = {
+                key: (state.decay_totals[key] * factor)
+                .add(decay_totals[key], fill_value=0)
+                .sort_index()
+                for key in decay_totals
+            }
+            decay_total += state.decay_total * factor
+            recent_start = last_day - np.timedelta64(recent_days, "D")
+            recent = pd.concat(
+                [state.recent.loc[state.recent["Dia"].to_numpy() > recent_start], recent],
+                ignore_index=True,
+            )
 
-        location_totals = (
-            source_df.groupby("Localidade", as_index=False)["QUANTIDADE"]
+        return RankingState(
+            last_day=last_day,
+            recent=recent.astype({column: object for column in RANKED_DIMENSIONS})
+            .groupby(["Dia", *RANKED_DIMENSIONS], dropna=False)["QUANTIDADE"]
             .sum()
-            .sort_values("QUANTIDADE", ascending=False)
-            .reset_index(drop=True)
+            .reset_index(),
+            decay_totals=decay_totals,
+            decay_total=decay_total,
         )
-        event_totals = (
-            source_df.groupby("Tipo de Evento", as_index=False)["QUANTIDADE"]
-            .sum()
-            .sort_values("QUANTIDADE", ascending=False)
-            .reset_index(drop=True)
+
+    def _build_ranking_views(
+        self,
+        state: RankingState | None,
+        dismissed_drivers: list[str],
+    ) -> dict[str, dict[str, Any]]:
+        if state is None:
+            return {}
+
+        # As janelas so olham os ultimos max(janelas) dias; o decaimento ja vem acumulado.
+        recent_days = state.recent["Dia"].to_numpy().astype("datetime64[D]")
+        quantities = state.recent["QUANTIDADE"].to_numpy(dtype="float64")
+        weighted = {
+            view: weights
+            for view, weights in self._ranking_weights(
+                (state.last_day - recent_days).astype("int64"), quantities
+            ).items()
+            if view != "decay"
+        }
+        weighted_df = state.recent[list(RANKED_DIMENSIONS)].assign(**weighted)
+
+        # Um groupby por dimensao soma todas as janelas de uma vez.
+        view_totals: dict[str, dict[str, pd.Series]] = {view: {} for view in weighted}
+        for key, columns in RANKING_GROUPS:
+            sums = self._sum_by(weighted_df, columns, list(weighted))
+            for view in weighted:
+                view_totals[view][key] = sums[view]
+        view_totals["decay"] = state.decay_totals
+        view_weights = {view: float(weights.sum()) for view, weights in weighted.items()}
+        view_weights["decay"] = state.decay_total
+
+        return {
+            view: {
+                **self._rank_dimension_totals(
+                    {key: values.loc[values > 0] for key, values in totals.items()},
+                    dismissed_drivers,
+                ),
+                "total_eventos_historicos": view_weights[view],
+            }
+            for view, totals in view_totals.items()
+        }
+
+    def _ranking_weights(
+        self,
+        age_days: np.ndarray,
+        quantities: np.ndarray,
+    ) -> dict[str, np.ndarray]:
+        weighted = {
+            f"{window}d": np.where(age_days < window, quantities, 0.0)
+            for window in self.settings.ranking_windows_days
+        }
+        weighted["decay"] = quantities * 0.5 ** (age_days / self.settings.ranking_half_life_days)
+        return weighted
+
+    @staticmethod
+    def _merge_totals(
+        current: dict[str, pd.Series],
+        delta: dict[str, pd.Series],
+    ) -> dict[str, pd.Series]:
+        return {
+            key: current[key].add(delta[key], fill_value=0).sort_index()
+            for key in current
+        }
+
+    @staticmethod
+    def _sum_by(
+        source_df: pd.DataFrame,
+        columns: list[str | pd.Series],
+        value_columns: str | list[str] = "QUANTIDADE",
+    ) -> pd.Series | pd.DataFrame:
+        totals = source_df.groupby(columns, observed=True)[value_columns].sum()
+        if isinstance(totals.index, pd.MultiIndex):
+            totals.index = totals.index.set_levels(
+                [level.astype(object) for level in totals.index.levels]
+            )
+        elif isinstance(totals.index, pd.CategoricalIndex):
+            totals.index = totals.index.astype(object)
+        return totals.sort_index()
+
+    def _finalize_analytics(
+        self,
+        totals: dict[str, pd.Series],
+        dismissed_drivers: list[str],
+        total_registros: int,
+        ultima_atualizacao: pd.Timestamp,
+        ranking_views: dict[str, dict[str, Any]] | None = None,
+        ranking_state: RankingState | None = None,
+    ) -> dict[str, Any]:
+        aggregated = (
+            totals["daily"]
+            .asfreq("D", fill_value=0)
+            .rename_axis("Data")
+            .reset_index(name="QUANTIDADE")
         )
+        rankings = self._rank_dimension_totals(totals, dismissed_drivers)
 
-        total_eventos_historicos = float(source_df["QUANTIDADE"].sum())
+        total_eventos_historicos = float(aggregated["QUANTIDADE"].sum())
         recent_history = aggregated.tail(self.settings.recent_history_days).copy()
 
         return {
+            "totals": totals,
             "aggregated": aggregated,
-            "driver_totals": driver_totals,
-            "location_totals": location_totals,
-            "event_totals": event_totals,
+            **rankings,
+            "ranking_views": ranking_views or {},
+            "ranking_state": ranking_state,
+            "event_hour_cube": self._build_event_hour_cube(totals.get("event_hours")),
+            "ultima_atualizacao": ultima_atualizacao,
             "total_eventos_historicos": total_eventos_historicos,
             "media_diaria_historica": float(aggregated["QUANTIDADE"].mean()),
             "pico_diario_historico": float(aggregated["QUANTIDADE"].max()),
             "data_inicio": aggregated["Data"].min().strftime("%Y-%m-%d"),
             "data_fim": aggregated["Data"].max().strftime("%Y-%m-%d"),
-            "total_registros": int(len(source_df)),
-            "motoristas_monitorados": int(source_df["Motorista"].nunique()),
-            "localidades_monitoradas": int(source_df["Localidade"].nunique()),
-            "tipos_evento_monitorados": int(source_df["Tipo de Evento"].nunique()),
-            "ultima_atualizacao_arquivo": pd.Timestamp(
-                self.settings.data_file.stat().st_mtime, unit="s"
-            )
-            .tz_localize("UTC")
+            "total_registros": total_registros,
+            "motoristas_monitorados": int(len(totals["drivers"])),
+            "localidades_monitoradas": int(len(totals["locations"])),
+            "tipos_evento_monitorados": int(len(totals["events"])),
+            "ultima_atualizacao_arquivo": ultima_atualizacao.tz_localize("UTC")
             .tz_convert("America/Sao_Paulo")
             .strftime("%Y-%m-%d %H:%M"),
             "serie_historica_recente": [
@@ -313,6 +1459,56 @@ class PredictionService:
             ],
         }
 
+    @staticmethod
+    def _build_event_hour_cube(event_hours: pd.Series | None) -> EventHourCube | None:
+        if event_hours is None:
+            return None
+
+        labels = sorted(event_hours.index.get_level_values("Tipo de Evento").unique())
+        label_codes = pd.Index(labels).get_indexer(event_hours.index.get_level_values(0))
+        weekdays = event_hours.index.get_level_values("DiaSemana").to_numpy(dtype="int64")
+        hours = event_hours.index.get_level_values("Hora").to_numpy(dtype="int64")
+        values = np.bincount(
+            (label_codes * 7 + weekdays) * 24 + hours,
+            weights=event_hours.to_numpy(dtype="float64"),
+            minlength=len(labels) * 7 * 24,
+        ).reshape(len(labels), 7, 24)
+        values.flags.writeable = False
+        return EventHourCube(labels=labels, values=values)
+
+    def _rank_dimension_totals(
+        self,
+        totals: dict[str, pd.Series],
+        dismissed_drivers: list[str],
+    ) -> dict[str, Any]:
+        driver_totals = self._rank_totals(totals["drivers"], "Motorista")
+        if dismissed_drivers:
+            driver_totals = driver_totals[
+                ~driver_totals["Motorista"].isin(dismissed_drivers)
+            ].reset_index(drop=True)
+
+        location_totals = self._rank_totals(totals["locations"], "Localidade")
+        event_totals = self._rank_totals(totals["events"], "Tipo de Evento")
+        return {
+            "driver_totals": driver_totals,
+            "location_totals": location_totals,
+            "event_totals": event_totals,
+            "event_driver_shares": self._build_event_driver_shares(
+                totals["event_drivers"],
+                event_totals=event_totals,
+                dismissed_drivers=dismissed_drivers,
+            ),
+        }
+
+    @staticmethod
+    def _rank_totals(totals: pd.Series, label_column: str) -> pd.DataFrame:
+        return (
+            totals.rename_axis(label_column)
+            .reset_index(name="QUANTIDADE")
+            .sort_values("QUANTIDADE", ascending=False)
+            .reset_index(drop=True)
+        )
+
     def _build_ranked_items(
         self,
         grouped_df: pd.DataFrame,
@@ -320,85 +1516,142 @@ class PredictionService:
         total_eventos_historicos: float,
         previsao_total: float,
         output_label: str | None = None,
+        expected_events: np.ndarray | None = None,
     ) -> list[dict[str, Any]]:
         if grouped_df.empty or total_eventos_historicos <= 0:
             return []
 
-        label_key = output_label or label_column
-        ranked_items: list[dict[str, Any]] = []
+        volumes = grouped_df["QUANTIDADE"].to_numpy(dtype=float)
+        return self._build_share_records(
+            labels=grouped_df[label_column].tolist(),
+            volumes=volumes,
+            shares=volumes / total_eventos_historicos,
+            expected_total=previsao_total,
+            label_key=output_label or label_column,
+            share_key="ParticipacaoPercentual",
+            expected_events=expected_events,
+        )
 
-        for _, row in grouped_df.iterrows():
-            volume_historico = float(row["QUANTIDADE"])
-            participacao = (volume_historico / total_eventos_historicos) * 100
-            eventos_esperados = (volume_historico / total_eventos_historicos) * previsao_total
-            ranked_items.append(
-                {
-                    label_key: row[label_column],
-                    "VolumeHistorico": int(volume_historico),
-                    "Probabilidade": self._round_float(participacao),
-                    "ParticipacaoPercentual": self._round_float(participacao),
-                    "EventosEsperados": self._round_float(eventos_esperados),
-                }
-            )
+    @staticmethod
+    def _build_event_driver_shares(
+        event_driver_volumes: pd.Series,
+        event_totals: pd.DataFrame,
+        dismissed_drivers: list[str],
+    ) -> dict[str, RankedShares]:
+        event_driver_totals = event_driver_volumes.rename_axis(
+            ["Tipo de Evento", "Motorista"]
+        ).reset_index(name="QUANTIDADE")
+        if dismissed_drivers:
+            event_driver_totals = event_driver_totals.loc[
+                ~event_driver_totals["Motorista"].isin(dismissed_drivers)
+            ]
+        event_driver_totals = event_driver_totals.sort_values(
+            ["Tipo de Evento", "QUANTIDADE"],
+            ascending=[True, False],
+        )
+        top_event_drivers = event_driver_totals.groupby(
+            "Tipo de Evento",
+            sort=False,
+            observed=True,
+        ).head(TOP_DRIVERS_PER_EVENT_LIMIT)
+        event_volume_lookup = dict(
+            zip(event_totals["Tipo de Evento"].tolist(), event_totals["QUANTIDADE"].tolist())
+        )
 
-        return ranked_items
+        event_driver_shares: dict[str, RankedShares] = {}
+        for event_name, event_rows in top_event_drivers.groupby(
+            "Tipo de Evento",
+            sort=False,
+            observed=True,
+        ):
+            volumes = event_rows["QUANTIDADE"].to_numpy(dtype=float)
+            event_driver_shares[event_name] = RankedShares(
+                labels=event_rows["Motorista"].tolist(),
+                volumes=volumes,
+                shares=volumes / float(event_volume_lookup[event_name]),
+            )
+        return event_driver_shares
 
     def _build_event_specific_probabilities(
         self,
-        source_df: pd.DataFrame,
         event_totals: pd.DataFrame,
+        event_driver_shares: dict[str, RankedShares],
         previsao_total: float,
         total_eventos_historicos: float,
-        dismissed_drivers: list[str],
+        event_expected_totals: np.ndarray | None = None,
     ) -> dict[str, list[dict[str, Any]]]:
-        if source_df.empty or event_totals.empty or total_eventos_historicos <= 0:
+        if event_totals.empty or total_eventos_historicos <= 0:
             return {}
 
-        filtered_source = source_df.copy()
-        if dismissed_drivers:
-            filtered_source = filtered_source[
-                ~filtered_source["Motorista"].isin(dismissed_drivers)
-            ].copy()
-
-        event_driver_totals = (
-            filtered_source.groupby(["Tipo de Evento", "Motorista"], as_index=False)["QUANTIDADE"]
-            .sum()
-            .sort_values(["Tipo de Evento", "QUANTIDADE"], ascending=[True, False])
-        )
+        if event_expected_totals is None:
+            event_expected_totals = (
+                event_totals["QUANTIDADE"].to_numpy(dtype=float) / total_eventos_historicos
+            ) * previsao_total
 
-        event_volume_lookup = {
-            row["Tipo de Evento"]: row["QUANTIDADE"] for _, row in event_totals.iterrows()
-        }
         response: dict[str, list[dict[str, Any]]] = {}
-
-        for event_name in event_totals["Tipo de Evento"].tolist():
-            event_volume = float(event_volume_lookup.get(event_name, 0))
-            if event_volume <= 0:
+        for event_name, event_volume, event_expected_total in zip(
+            event_totals["Tipo de Evento"].tolist(),
+            event_totals["QUANTIDADE"].tolist(),
+            event_expected_totals.tolist(),
+        ):
+            ranked_drivers = event_driver_shares.get(event_name)
+            if event_volume <= 0 or ranked_drivers is None:
                 response[event_name] = []
                 continue
 
-            event_expected_total = (event_volume / total_eventos_historicos) * previsao_total
-            top_event_drivers = event_driver_totals[
-                event_driver_totals["Tipo de Evento"] == event_name
-            ].head(TOP_DRIVERS_PER_EVENT_LIMIT)
-
-            response[event_name] = [
-                {
-                    "Motorista": row["Motorista"],
-                    "VolumeHistorico": int(row["QUANTIDADE"]),
-                    "Probabilidade": self._round_float((row["QUANTIDADE"] / event_volume) * 100),
-                    "ParticipacaoNoEventoPercentual": self._round_float(
-                        (row["QUANTIDADE"] / event_volume) * 100
-                    ),
-                    "EventosEsperados": self._round_float(
-                        (row["QUANTIDADE"] / event_volume) * event_expected_total
-                    ),
-                }
-                for _, row in top_event_drivers.iterrows()
-            ]
+            response[event_name] = self._build_share_records(
+                labels=ranked_drivers.labels,
+                volumes=ranked_drivers.volumes,
+                shares=ranked_drivers.shares,
+                expected_total=event_expected_total,
+                label_key="Motorista",
+                share_key="ParticipacaoNoEventoPercentual",
+            )
 
         return response
 
+    @staticmethod
+    def _build_share_records(
+        labels: list[Any],
+        volumes: np.ndarray,
+        shares: np.ndarray,
+        expected_total: float,
+        label_key: str,
+        share_key: str,
+        expected_events: np.ndarray | None = None,
+    ) -> list[dict[str, Any]]:
+        percentages = np.round(shares * 100, 2).tolist()
+        if expected_events is None:
+            probabilities = percentages
+            expected_events = shares * expected_total
+        else:
+            # No modo hierarquico a probabilidade e a fatia da previsao do dia, nao do historico.
+            probabilities = np.round(
+                np.divide(
+                    expected_events * 100,
+                    expected_total,
+                    out=np.zeros_like(expected_events, dtype=float),
+                    where=expected_total > 0,
+                ),
+                2,
+            ).tolist()
+        return [
+            {
+                label_key: label,
+                "VolumeHistorico": volume,
+                "Probabilidade": probability,
+                share_key: percentage,
+                "EventosEsperados": expected,
+            }
+            for label, volume, probability, percentage, expected in zip(
+                labels,
+                volumes.astype(np.int64).tolist(),
+                probabilities,
+                percentages,
+                np.round(expected_events, 2).tolist(),
+            )
+        ]
+
     def _build_risk_summary(
         self,
         previsao_total: float,
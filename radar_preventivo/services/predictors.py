@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+import importlib.metadata
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from radar_preventivo.config import AppSettings
+from radar_preventivo.services.model_store import ModelStore
+
+
+logger = logging.getLogger(__name__)
+
+
+class StatelessPredictorBackend(ABC):
+    backend_name = ""
+    model_generation = 0
+
+    def warmup(self, training_df: pd.DataFrame) -> bool:
+        return True
+
+    def ensure_trained(self, training_df: pd.DataFrame, wait: bool = False) -> bool:
+        return True
+
+    def after_fork(self) -> None:
+        return None
+
+    def training_state(self) -> dict[str, Any]:
+        return {"state": "ready", "model_ready": True, "model_generation": self.model_generation}
+
+    def training_retry_due(self) -> bool:
+        return False
+
+    @abstractmethod
+    def forecast(self, training_df: pd.DataFrame, periods: int) -> pd.DataFrame: ...
+
+
+class MockPredictorBackend(StatelessPredictorBackend):
+    backend_name = "mock-moving-average"
+
+    def forecast(self, training_df: pd.DataFrame, periods: int) -> pd.DataFrame:
+        recent_window = training_df["y"].tail(7)
+        baseline = float(recent_window.mean()) if not recent_window.empty else 0.0
+        recent_diff = training_df["y"].diff().tail(7)
+        slope = float(recent_diff.mean()) if not recent_diff.dropna().empty else 0.0
+
+        forecast_dates = pd.date_range(
+            start=training_df["ds"].max() + pd.Timedelta(days=1),
+            periods=periods,
+            freq="D",
+        )
+        predictions = []
+        for step, forecast_date in enumerate(forecast_dates, start=1):
+            predictions.append(
+                {
+                    "ds": forecast_date,
+                    "yhat1": max(round(baseline + (slope * 0.15 * step), 2), 0.0),
+                }
+            )
+
+        return pd.DataFrame(predictions)
+
+
+class NeuralProphetPredictorBackend:
+    backend_name = "flask-neuralprophet"
+    hyperparameters: dict[str, Any] = {"freq": "D"}
+    retry_after_failure_seconds = 60.0
+
+    def __init__(self, model_store: ModelStore | None = None) -> None:
+        self.model_store = model_store
+        self.fallback_backend = MockPredictorBackend()
+        self.model_generation = 0
+        self._model = None
+        self._training_signature: str | None = None
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self._training_future: Future | None = None
+        self._pending_signature: str | None = None
+        self._state = "idle"
+        self._last_error: str | None = None
+        self._last_failure_at: float | None = None
+        self._last_training_seconds: float | None = None
+
+    def warmup(self, training_df: pd.DataFrame) -> bool:
+        if self.model_store is None:
+            return False
+
+        signature = self._model_key(training_df)
+        if self._current_model(signature) is not None:
+            return True
+
+        model = self.model_store.load(signature)
+        if model is None:
+            return False
+
+        self._install_model(model, signature)
+        return True
+
+    def forecast(self, training_df: pd.DataFrame, periods: int) -> pd.DataFrame:
+        signature = self._model_key(training_df)
+        model = self._current_model(signature)
+        if model is not None:
+            return self._predict(model, training_df, periods)
+
+        self._start_training(training_df, signature)
+        provisional = self._provisional_forecast(training_df, periods)
+        provisional.attrs["provisional"] = True
+        return provisional
+
+    def ensure_trained(self, training_df: pd.DataFrame, wait: bool = False) -> bool:
+        signature = self._model_key(training_df)
+        if self._current_model(signature) is not None:
+            return True
+
+        future = self._start_training(training_df, signature)
+        if wait and future is not None:
+            future.result()
+        return self._current_model(signature) is not None
+
+    def after_fork(self) -> None:
+        # O modelo treinado e herdado do mestre; a thread de treino e o lock nao sobrevivem ao fork.
+        self._lock = threading.Lock()
+        self._reset_executor()
+
+    def training_state(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "model_ready": self._model is not None and self._pending_signature is None,
+                "model_generation": self.model_generation,
+                "last_training_seconds": self._last_training_seconds,
+                "last_error": self._last_error,
+            }
+
+    def training_retry_due(self) -> bool:
+        # Um treino que falhou nao muda model_generation; sem isto o horizonte provisorio
+        # continuaria em cache e ninguem pediria o treino de novo.
+        with self._lock:
+            return self._state == "failed" and not self._in_failure_backoff()
+
+    def _in_failure_backoff(self) -> bool:
+        return (
+            self._last_failure_at is not None
+            and time.monotonic() - self._last_failure_at < self.retry_after_failure_seconds
+        )
+
+    def _current_model(self, signature: str):
+        with self._lock:
+            if self._model is not None and self._training_signature == signature:
+                return self._model
+        return None
+
+    def _install_model(self, model, signature: str) -> None:
+        with self._lock:
+            self._model = model
+            self._training_signature = signature
+            self._state = "ready"
+            self._last_error = None
+            self.model_generation += 1
+
+    def _start_training(self, training_df: pd.DataFrame, signature: str) -> Future | None:
+        with self._lock:
+            if self._executor_pid is not None and self._executor_pid != os.getpid():
+                self._reset_executor()
+            if self._training_future is not None and not self._training_future.done():
+                if self._pending_signature == signature:
+                    return self._training_future
+                # Um treino de outra versao ainda roda; esta versao entra quando ele terminar.
+                return None
+
+            if (
+                self._state == "failed"
+                and self._pending_signature == signature
+                and self._in_failure_backoff()
+            ):
+                return None
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="radar-model-training",
+                )
+                self._executor_pid = os.getpid()
+            self._pending_signature = signature
+            self._state = "training"
+            self._training_future = self._executor.submit(
+                self._train,
+                training_df.copy(),
+                signature,
+            )
+            return self._training_future
+
+    def _reset_executor(self) -> None:
+        # Um executor criado em outro processo aponta para uma thread que nao existe aqui.
+        self._executor = None
+        self._executor_pid = None
+        self._training_future = None
+        if self._state == "training":
+            self._state = "idle"
+            self._pending_signature = None
+
+    def _train(self, training_df: pd.DataFrame, signature: str) -> None:
+        started_at = time.perf_counter()
+        try:
+            model = self.model_store.load(signature) if self.model_store else None
+            if model is None:
+                logger.info("Treinando NeuralProphet em segundo plano (%s pontos).", len(training_df))
+                model = self._fit_model(training_df)
+                if self.model_store:
+                    self.model_store.save(signature, model)
+        except Exception as exc:
+            logger.exception("Falha no treino do NeuralProphet.")
+            with self._lock:
+                self._state = "failed"
+                self._last_error = str(exc)
+                self._last_failure_at = time.monotonic()
+            return
+
+        self._install_model(model, signature)
+        with self._lock:
+            self._pending_signature = None
+            self._last_training_seconds = round(time.perf_counter() - started_at, 3)
+        logger.info("Modelo NeuralProphet pronto em %.1f s.", self._last_training_seconds)
+
+    def _provisional_forecast(self, training_df: pd.DataFrame, periods: int) -> pd.DataFrame:
+        with self._lock:
+            last_good_model = self._model
+
+        if last_good_model is not None:
+            try:
+                forecast = self._predict(last_good_model, training_df, periods)
+                forecast.attrs["source"] = f"{self.backend_name}:modelo-anterior"
+                return forecast
+            except Exception:
+                logger.warning("Modelo anterior nao conseguiu prever a nova serie; usando fallback.")
+
+        forecast = self.fallback_backend.forecast(training_df, periods)
+        forecast.attrs["source"] = self.fallback_backend.backend_name
+        return forecast
+
+    @staticmethod
+    def _predict(model, training_df: pd.DataFrame, periods: int) -> pd.DataFrame:
+        future_df = model.make_future_dataframe(df=training_df, periods=periods)
+        predictions = model.predict(future_df)
+        return predictions[predictions["ds"] > training_df["ds"].max()][["ds", "yhat1"]].copy()
+
+    def _fit_model(self, training_df: pd.DataFrame):
+        from neuralprophet import NeuralProphet
+
+        model = NeuralProphet()
+        model.fit(training_df, freq=self.hyperparameters["freq"])
+        return model
+
+    def _model_key(self, training_df: pd.DataFrame) -> str:
+        return ModelStore.build_key(
+            training_df,
+            {**self.hyperparameters, "library_version": _package_version("neuralprophet")},
+        )
+
+    @staticmethod
+    def dump_model(model, model_file: Path) -> None:
+        from neuralprophet import save
+
+        save(model, str(model_file))
+
+    @staticmethod
+    def load_model(model_file: Path):
+        from neuralprophet import load
+
+        return load(str(model_file))
+
+
+class StatisticalPredictorBackend(StatelessPredictorBackend):
+    # Modelos em NumPy puro: o ajuste roda a cada previsao porque custa menos de um milissegundo.
+    hyperparameters: dict[str, Any] = {}
+
+    def forecast(self, training_df: pd.DataFrame, periods: int) -> pd.DataFrame:
+        first_day, values = self._daily_history(training_df)
+        history_days = first_day + np.arange(len(values))
+        forecast_days = history_days[-1] + np.arange(1, periods + 1)
+        predictions = self._fit_predict(
+            values,
+            self._weekdays(history_days),
+            self._weekdays(forecast_days),
+        )
+        return pd.DataFrame(
+            {
+                "ds": forecast_days.astype("datetime64[ns]"),
+                "yhat1": np.maximum(np.round(predictions, 2), 0.0),
+            }
+        )
+
+    @abstractmethod
+    def _fit_predict(
+        self,
+        values: np.ndarray,
+        weekdays: np.ndarray,
+        future_weekdays: np.ndarray,
+    ) -> np.ndarray: ...
+
+    @staticmethod
+    def _daily_history(training_df: pd.DataFrame) -> tuple[np.datetime64, np.ndarray]:
+        # Soma por dia de calendario; dias sem eventos nao aparecem no agregado e valem zero.
+        days = pd.to_datetime(training_df["ds"]).to_numpy().astype("datetime64[D]")
+        first_day = days.min()
+        values = np.bincount(
+            (days - first_day).astype("int64"),
+            weights=training_df["y"].to_numpy(dtype="float64"),
+        )
+        return first_day, values
+
+    @staticmethod
+    def _weekdays(days: np.ndarray) -> np.ndarray:
+        # 1970-01-01 foi uma quinta-feira; segunda-feira = 0, como em pandas.
+        return (days.astype("int64") + 3) % 7
+
+
+class SeasonalNaivePredictorBackend(StatisticalPredictorBackend):
+    backend_name = "seasonal-naive"
+    hyperparameters = {"season_weeks": 4}
+
+    def _fit_predict(
+        self,
+        values: np.ndarray,
+        weekdays: np.ndarray,
+        future_weekdays: np.ndarray,
+    ) -> np.ndarray:
+        window = min(len(values), 7 * self.hyperparameters["season_weeks"])
+        recent_values = values[-window:]
+        recent_weekdays = weekdays[-window:]
+        weekday_sums = np.bincount(recent_weekdays, weights=recent_values, minlength=7)
+        weekday_counts = np.bincount(recent_weekdays, minlength=7)
+        weekly_profile = np.divide(
+            weekday_sums,
+            weekday_counts,
+            out=np.full(7, recent_values.mean()),
+            where=weekday_counts > 0,
+        )
+        return weekly_profile[future_weekdays]
+
+
+class HoltWintersPredictorBackend(StatisticalPredictorBackend):
+    backend_name = "holt-winters"
+    hyperparameters = {
+        "alpha": 0.3,
+        "beta": 0.05,
+        "gamma": 0.2,
+        "damping": 0.9,
+        "season_length": 7,
+    }
+
+    def _fit_predict(
+        self,
+        values: np.ndarray,
+        weekdays: np.ndarray,
+        future_weekdays: np.ndarray,
+    ) -> np.ndarray:
+        alpha = self.hyperparameters["alpha"]
+        beta = self.hyperparameters["beta"]
+        gamma = self.hyperparameters["gamma"]
+        damping = self.hyperparameters["damping"]
+        season_length = self.hyperparameters["season_length"]
+
+        if len(values) >= 2 * season_length:
+            first_season = values[:season_length]
+            level = float(first_season.mean())
+            trend = float(values[season_length : 2 * season_length].mean() - level) / season_length
+            seasonal = (first_season - level).tolist()
+        else:
+            level = float(values.mean())
+            trend = 0.0
+            seasonal = [0.0] * season_length
+
+        # Suavizacao exponencial aditiva com tendencia amortecida (ETS A,Ad,A).
+        for step, observed in enumerate(values.tolist()):
+            season_index = step % season_length
+            previous_level = level
+            level = alpha * (observed - seasonal[season_index]) + (1 - alpha) * (
+                previous_level + damping * trend
+            )
+            trend = beta * (level - previous_level) + (1 - beta) * damping * trend
+            seasonal[season_index] = gamma * (observed - level) + (1 - gamma) * seasonal[
+                season_index
+            ]
+
+        horizon = np.arange(1, len(future_weekdays) + 1)
+        damped_trend = trend * np.cumsum(damping**horizon)
+        season_indexes = (len(values) + horizon - 1) % season_length
+        return level + damped_trend + np.asarray(seasonal)[season_indexes]
+
+
+class RidgeTrendPredictorBackend(StatisticalPredictorBackend):
+    backend_name = "ridge-weekday-trend"
+    hyperparameters = {"window_days": 365, "penalty": 1.0}
+
+    def _fit_predict(
+        self,
+        values: np.ndarray,
+        weekdays: np.ndarray,
+        future_weekdays: np.ndarray,
+    ) -> np.ndarray:
+        # Aceita varias series empilhadas em colunas: o sistema e resolvido uma vez para todas.
+        window = min(len(values), self.hyperparameters["window_days"])
+        values = values[-window:]
+        weekdays = weekdays[-window:]
+        steps = np.arange(window + len(future_weekdays), dtype="float64") / max(window, 1)
+
+        design = self._design_matrix(steps[:window], weekdays)
+        penalty = np.eye(design.shape[1]) * self.hyperparameters["penalty"]
+        penalty[0, 0] = 0.0
+        coefficients = np.linalg.solve(design.T @ design + penalty, design.T @ values)
+        return self._design_matrix(steps[window:], future_weekdays) @ coefficients
+
+    @staticmethod
+    def _design_matrix(steps: np.ndarray, weekdays: np.ndarray) -> np.ndarray:
+        weekday_columns = (weekdays[:, None] == np.arange(1, 7)).astype("float64")
+        return np.column_stack([np.ones_like(steps), steps, weekday_columns])
+
+
+def _package_version(package_name: str) -> str:
+    try:
+        return importlib.metadata.version(package_name)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _build_neuralprophet_backend(settings: AppSettings) -> NeuralProphetPredictorBackend:
+    model_store = None
+    if settings.model_store_enabled:
+        model_store = ModelStore(
+            directory=settings.resolved_cache_dir / "models",
+            dump=NeuralProphetPredictorBackend.dump_model,
+            load=NeuralProphetPredictorBackend.load_model,
+        )
+    return NeuralProphetPredictorBackend(model_store=model_store)
+
+
+PREDICTOR_BACKENDS: dict[str, Callable[[AppSettings], Any]] = {
+    "mock": lambda settings: MockPredictorBackend(),
+    "seasonal-naive": lambda settings: SeasonalNaivePredictorBackend(),
+    "holt-winters": lambda settings: HoltWintersPredictorBackend(),
+    "ridge": lambda settings: RidgeTrendPredictorBackend(),
+    "neuralprophet": _build_neuralprophet_backend,
+}
+
+
+def register_predictor_backend(mode: str, factory: Callable[[AppSettings], Any]) -> None:
+    PREDICTOR_BACKENDS[mode.strip().lower()] = factory
+
+
+def build_predictor_backend(settings: AppSettings):
+    factory = PREDICTOR_BACKENDS.get(settings.predictor_mode)
+    if factory is None:
+        available_modes = ", ".join(sorted(PREDICTOR_BACKENDS))
+        raise ValueError(
+            f"APP_PREDICTOR_MODE '{settings.predictor_mode}' desconhecido. "
+            f"Use um dos modos: {available_modes}."
+        )
+    return factory(settings)
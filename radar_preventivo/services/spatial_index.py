@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+# Tiles Web Mercator (os mesmos do Leaflet); no zoom 18 uma celula tem ~150 m no equador.
+BASE_ZOOM = 18
+# Cada cluster cobre 1/4 x 1/4 de tile do zoom pedido (~64 px na tela).
+CLUSTER_ZOOM_OFFSET = 2
+MAX_LATITUDE = 85.05112878
+
+
+@dataclass(frozen=True, slots=True)
+class SpatialIndex:
+    day_count: int
+    cell_x: np.ndarray
+    cell_y: np.ndarray
+    day_offsets: np.ndarray
+    volumes: np.ndarray
+    records: np.ndarray
+    latitude_sums: np.ndarray
+    longitude_sums: np.ndarray
+
+    def clusters(
+        self,
+        bbox: tuple[float, float, float, float] | None,
+        zoom: int,
+        days: int | None = None,
+    ) -> pd.DataFrame:
+        selected = np.ones(len(self.volumes), dtype=bool)
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            min_x, max_y = tile_coordinates(np.array([min_lat]), np.array([min_lon]), BASE_ZOOM)
+            max_x, min_y = tile_coordinates(np.array([max_lat]), np.array([max_lon]), BASE_ZOOM)
+            selected &= (self.cell_x >= min_x[0]) & (self.cell_x <= max_x[0])
+            selected &= (self.cell_y >= min_y[0]) & (self.cell_y <= max_y[0])
+        if days is not None:
+            selected &= self.day_offsets >= self.day_count - days
+
+        # As contagens ja estao binadas por celula e dia; o zoom so desloca os bits da celula.
+        shift = BASE_ZOOM - min(zoom + CLUSTER_ZOOM_OFFSET, BASE_ZOOM)
+        cluster_x = self.cell_x[selected] >> shift
+        cluster_y = self.cell_y[selected] >> shift
+        cluster_keys, positions = np.unique(
+            (cluster_x << 32) | cluster_y,
+            return_inverse=True,
+        )
+        volumes = np.bincount(positions, weights=self.volumes[selected])
+        records = np.bincount(positions, weights=self.records[selected])
+        latitude_sums = np.bincount(positions, weights=self.latitude_sums[selected])
+        longitude_sums = np.bincount(positions, weights=self.longitude_sums[selected])
+        return pd.DataFrame(
+            {
+                "x": cluster_keys >> 32,
+                "y": cluster_keys & 0xFFFFFFFF,
+                "zoom": BASE_ZOOM - shift,
+                "eventos": volumes,
+                "registros": records.astype("int64"),
+                "latitude": latitude_sums / records,
+                "longitude": longitude_sums / records,
+            }
+        ).sort_values(["eventos", "registros"], ascending=False, kind="stable")
+
+
+def tile_coordinates(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    zoom: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    scale = 1 << zoom
+    latitude_radians = np.radians(np.clip(latitude, -MAX_LATITUDE, MAX_LATITUDE))
+    x = (longitude + 180.0) / 360.0 * scale
+    y = (1.0 - np.arcsinh(np.tan(latitude_radians)) / np.pi) / 2.0 * scale
+    return (
+        np.clip(np.floor(x), 0, scale - 1).astype("int64"),
+        np.clip(np.floor(y), 0, scale - 1).astype("int64"),
+    )
+
+
+def tile_bounds(x: np.ndarray, y: np.ndarray, zoom: int) -> np.ndarray:
+    scale = 1 << zoom
+    west = x / scale * 360.0 - 180.0
+    east = (x + 1) / scale * 360.0 - 180.0
+    north = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y / scale))))
+    south = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + 1) / scale))))
+    return np.column_stack([west, south, east, north])
+
+
+def build_spatial_index(
+    source_df: pd.DataFrame,
+    first_day: np.datetime64 | None = None,
+) -> SpatialIndex:
+    if not {"Latitude", "Longitude"}.issubset(source_df.columns):
+        return _empty_spatial_index()
+
+    located = source_df["Latitude"].notna().to_numpy() & source_df["Longitude"].notna().to_numpy()
+    if not located.any():
+        return _empty_spatial_index()
+
+    latitude = source_df["Latitude"].to_numpy(dtype="float64")[located]
+    longitude = source_df["Longitude"].to_numpy(dtype="float64")[located]
+    event_days = source_df["Data"].to_numpy().astype("datetime64[D]")
+    first_day = event_days.min() if first_day is None else first_day
+    day_offsets = (event_days[located] - first_day).astype("int64")
+    cell_x, cell_y = tile_coordinates(latitude, longitude, BASE_ZOOM)
+
+    # Uma entrada por (celula, dia): contagens pre-binadas, independentes do numero de linhas.
+    entry_keys = np.stack([cell_x, cell_y, day_offsets], axis=1)
+    entries, positions = np.unique(entry_keys, axis=0, return_inverse=True)
+    positions = positions.reshape(-1)
+    quantities = source_df["QUANTIDADE"].to_numpy(dtype="float64")[located]
+    return SpatialIndex(
+        day_count=int((event_days.max() - first_day).astype("int64")) + 1,
+        cell_x=entries[:, 0],
+        cell_y=entries[:, 1],
+        day_offsets=entries[:, 2],
+        volumes=np.bincount(positions, weights=quantities),
+        records=np.bincount(positions).astype("float64"),
+        latitude_sums=np.bincount(positions, weights=latitude),
+        longitude_sums=np.bincount(positions, weights=longitude),
+    )
+
+
+def extend_spatial_index(
+    index: SpatialIndex,
+    batch_df: pd.DataFrame,
+    first_day: np.datetime64,
+    day_count: int,
+) -> SpatialIndex:
+    # As entradas do lote so se juntam as existentes: uma (celula, dia) repetida nao muda os
+    # clusters, que somam por chave, e a base nao precisa ser reagrupada.
+    batch = build_spatial_index(batch_df, first_day)
+    return SpatialIndex(
+        day_count=day_count,
+        cell_x=np.concatenate([index.cell_x, batch.cell_x]),
+        cell_y=np.concatenate([index.cell_y, batch.cell_y]),
+        day_offsets=np.concatenate([index.day_offsets, batch.day_offsets]),
+        volumes=np.concatenate([index.volumes, batch.volumes]),
+        records=np.concatenate([index.records, batch.records]),
+        latitude_sums=np.concatenate([index.latitude_sums, batch.latitude_sums]),
+        longitude_sums=np.concatenate([index.longitude_sums, batch.longitude_sums]),
+    )
+
+
+def _empty_spatial_index() -> SpatialIndex:
+    empty_int = np.empty(0, dtype="int64")
+    empty_float = np.empty(0, dtype="float64")
+    return SpatialIndex(
+        day_count=0,
+        cell_x=empty_int,
+        cell_y=empty_int,
+        day_offsets=empty_int,
+        volumes=empty_float,
+        records=empty_float,
+        latitude_sums=empty_float,
+        longitude_sums=empty_float,
+    )
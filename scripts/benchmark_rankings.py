@@ -0,0 +1,104 @@
+"""Micro-benchmark dos construtores de ranking do PredictionService.
+
+Compara a implementacao antiga (iterrows) com a versao vetorizada usando
+tabelas sinteticas de motoristas e localidades.
+
+Uso:
+    python scripts/benchmark_rankings.py --drivers 10000 --locations 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from radar_preventivo.services.prediction_service import PredictionService  # noqa: E402
+
+
+def build_grouped_frame(label_column: str, size: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return (
+        pd.DataFrame(
+            {
+                label_column: [f"{label_column} {index}" for index in range(size)],
+                "QUANTIDADE": rng.integers(1, 500, size=size).astype(float),
+            }
+        )
+        .sort_values("QUANTIDADE", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def legacy_ranked_items(
+    grouped_df: pd.DataFrame,
+    label_column: str,
+    total_eventos_historicos: float,
+    previsao_total: float,
+) -> list[dict]:
+    ranked_items = []
+    for _, row in grouped_df.iterrows():
+        volume_historico = float(row["QUANTIDADE"])
+        participacao = (volume_historico / total_eventos_historicos) * 100
+        eventos_esperados = (volume_historico / total_eventos_historicos) * previsao_total
+        ranked_items.append(
+            {
+                label_column: row[label_column],
+                "VolumeHistorico": int(volume_historico),
+                "Probabilidade": round(participacao, 2),
+                "ParticipacaoPercentual": round(participacao, 2),
+                "EventosEsperados": round(eventos_esperados, 2),
+            }
+        )
+    return ranked_items
+
+
+def benchmark(label_column: str, size: int, repeat: int) -> dict[str, float]:
+    grouped_df = build_grouped_frame(label_column, size, seed=size)
+    total = float(grouped_df["QUANTIDADE"].sum())
+    previsao_total = 42.5
+    service = PredictionService.__new__(PredictionService)
+
+    def run_legacy():
+        return legacy_ranked_items(grouped_df, label_column, total, previsao_total)
+
+    def run_vectorized():
+        return service._build_ranked_items(grouped_df, label_column, total, previsao_total)
+
+    legacy = min(timeit.repeat(run_legacy, number=1, repeat=repeat))
+    vectorized = min(timeit.repeat(run_vectorized, number=1, repeat=repeat))
+    mismatches = sum(
+        1 for expected, current in zip(run_legacy(), run_vectorized()) if expected != current
+    )
+    return {
+        "legacy_ms": legacy * 1000,
+        "vectorized_ms": vectorized * 1000,
+        "speedup": legacy / vectorized if vectorized else float("inf"),
+        "mismatches": mismatches,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=10_000)
+    parser.add_argument("--locations", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for label_column, size in (("Motorista", args.drivers), ("Localidade", args.locations)):
+        result = benchmark(label_column, size, args.repeat)
+        print(
+            f"{label_column:<10} n={size:>6} | iterrows {result['legacy_ms']:8.2f} ms | "
+            f"vetorizado {result['vectorized_ms']:7.2f} ms | "
+            f"ganho {result['speedup']:5.1f}x | divergencias {result['mismatches']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
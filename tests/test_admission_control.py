@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from test_auth_and_predict import build_test_app, login
+
+from radar_preventivo.services.admission import (
+    ConcurrencyGate,
+    RequestRateLimiter,
+    TokenBucketLimiter,
+)
+
+
+def test_token_bucket_allows_a_burst_then_reports_the_wait():
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=2)
+
+    assert [limiter.acquire("user:a") for _ in range(2)] == [0.0, 0.0]
+    assert 0.9 < limiter.acquire("user:a") <= 1.0
+    assert limiter.acquire("user:b") == 0.0
+    assert limiter.stats()["rejected"] == 1
+    assert TokenBucketLimiter(rate_per_minute=0, burst=1).acquire("user:a") == 0.0
+
+
+def test_predict_is_rate_limited_per_user(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    settings = app.config["SETTINGS"].with_overrides(
+        {"rate_limit_user_per_minute": 6, "rate_limit_user_burst": 2}
+    )
+    app.extensions["rate_limiter"] = RequestRateLimiter(settings)
+    client = app.test_client()
+    gestor = {"Authorization": f"Bearer {login(client, 'gestor@radar.local', 'Gestor123!')}"}
+    analista = {
+        "Authorization": f"Bearer {login(client, 'analista@radar.local', 'Analista123!')}"
+    }
+
+    statuses = [client.get("/predict", headers=gestor).status_code for _ in range(3)]
+    limited = client.get("/predict", headers=gestor)
+    other_user = client.get("/predict", headers=analista)
+
+    assert statuses == [200, 200, 429]
+    assert limited.status_code == 429
+    assert 1 <= int(limited.headers["Retry-After"]) <= 10
+    assert other_user.status_code == 200
+    assert app.extensions["rate_limiter"].stats()["user"]["rejected"] == 2
+
+
+def test_forecast_gate_sheds_cache_misses_with_503(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    service.forecast_gate = ConcurrencyGate(1)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'gestor@radar.local', 'Gestor123!')}"}
+    assert client.get("/predict?date=2025-01-06", headers=headers).status_code == 200
+
+    with service.forecast_gate.slot():
+        cached = client.get("/predict?date=2025-01-06", headers=headers)
+        computed = client.get("/predict?date=2025-01-07", headers=headers)
+
+    assert cached.status_code == 200
+    assert computed.status_code == 503
+    assert computed.headers["Retry-After"] == "5"
+    assert service.forecast_gate.stats() == {"limit": 1, "in_flight": 0, "rejected": 1}
+    assert client.get("/predict?date=2025-01-07", headers=headers).status_code == 200
+
+
+def test_forecast_gate_never_rejects_reload_or_ingest(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    service.forecast_gate = ConcurrencyGate(1)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'admin@radar.local', 'Admin123!')}"}
+
+    with service.forecast_gate.slot():
+        reloaded = client.post("/admin/reload", headers=headers)
+        ingested = client.post(
+            "/admin/ingest",
+            data="Id;Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento\n"
+            "g1;06/01/2025 08:00;3;Motorista A;Local A;Fadiga\n",
+            headers={**headers, "Content-Type": "text/csv"},
+        )
+        computed = client.get("/predict?date=2025-01-07", headers=headers)
+
+    assert reloaded.status_code == 200
+    assert ingested.status_code == 200
+    assert ingested.get_json()["records_loaded"] == 6
+    assert computed.status_code == 503
+    assert service.forecast_gate.stats()["rejected"] == 1
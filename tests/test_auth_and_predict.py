@@ -14,9 +14,13 @@ CSV_FIXTURE = """Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento
 """
 
 
-def build_test_app(tmp_path: Path):
+def build_test_app(
+    tmp_path: Path,
+    csv_content: str = CSV_FIXTURE,
+    bootstrap_prediction_date: str | None = "2025-01-06",
+):
     data_file = tmp_path / "basedadosseguranca.csv"
-    data_file.write_text(CSV_FIXTURE, encoding="utf-8")
+    data_file.write_text(csv_content, encoding="utf-8")
 
     dismissed_file = tmp_path / "motoristas_desligados.csv"
     dismissed_file.write_text("Motoristas\n", encoding="utf-8")
@@ -27,8 +31,10 @@ def build_test_app(tmp_path: Path):
             "dismissed_drivers_file": dismissed_file,
             "predictor_mode": "mock",
             "allow_demo_users": True,
+            "auth_users_file": tmp_path / "auth_users.json",
+            "auth_users_db": tmp_path / "auth_users.sqlite3",
             "secret_key": "test-secret",
-            "bootstrap_prediction_date": "2025-01-06",
+            "bootstrap_prediction_date": bootstrap_prediction_date,
         }
     )
     app.config["TESTING"] = True
@@ -110,3 +116,45 @@ def test_non_admin_cannot_list_users(tmp_path: Path):
     )
 
     assert response.status_code == 403
+
+
+def test_predict_answers_conditional_requests_with_not_modified(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    client = app.test_client()
+    token = login(client, "analista@radar.local", "Analista123!")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    first = client.get("/predict?date=2025-01-06", headers=headers)
+    etag = first.headers["ETag"]
+    revalidated = client.get(
+        "/predict?date=2025-01-06",
+        headers={**headers, "If-None-Match": etag},
+    )
+    other_date = client.get(
+        "/predict?date=2025-01-07",
+        headers={**headers, "If-None-Match": etag},
+    )
+
+    assert first.status_code == 200
+    assert "no-cache" in first.headers["Cache-Control"]
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert other_date.status_code == 200
+    assert other_date.headers["ETag"] != etag
+
+
+def test_health_answers_conditional_requests_with_not_modified(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    client = app.test_client()
+
+    first = client.get("/health")
+    headers = {"Authorization": f"Bearer {login(client, 'analista@radar.local', 'Analista123!')}"}
+    # Trafego entre as consultas mexe nos contadores, nao na versao da base.
+    assert client.get("/predict?date=2025-01-06", headers=headers).status_code == 200
+    revalidated = client.get("/health", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert revalidated.status_code == 304
+    admin = {"Authorization": f"Bearer {login(client, 'admin@radar.local', 'Admin123!')}"}
+    assert client.get("/health/stats", headers=admin).get_json()["response_cache"]["misses"] == 1
+    assert client.get("/health/stats", headers=headers).status_code == 403
+    assert client.get("/health/stats").status_code == 401
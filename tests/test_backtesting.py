@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pandas as pd
+from test_auth_and_predict import CSV_FIXTURE
+
+from radar_preventivo.backtesting import main, run_backtest
+from radar_preventivo.config import AppSettings
+
+
+def weekly_training_frame(weeks: int = 10) -> pd.DataFrame:
+    dates = pd.date_range("2025-01-06", periods=7 * weeks, freq="D")
+    return pd.DataFrame({"ds": dates, "y": [10, 12, 14, 16, 18, 4, 2] * weeks})
+
+
+def test_rolling_origin_backtest_reports_metrics_per_horizon():
+    report = run_backtest(
+        weekly_training_frame(),
+        AppSettings.from_env(),
+        modes=["mock", "seasonal-naive"],
+        horizon=7,
+        folds=4,
+        step=7,
+    )
+
+    seasonal = report["backends"]["seasonal-naive"]
+    assert len(report["origins"]) == 4
+    assert len(seasonal["mae_by_horizon"]) == 7
+    assert seasonal["mae"] == 0.0
+    assert seasonal["python_heap_peak_mb"] > 0
+    assert seasonal["fit_seconds"]["mean"] >= 0
+    assert seasonal["predict_seconds"]["mean"] > 0
+    assert seasonal["fits_in_forecast"] is True
+    assert report["ranking_by_mae"] == ["seasonal-naive", "mock"]
+
+
+def test_backtest_records_backends_that_fail_without_stopping():
+    report = run_backtest(
+        weekly_training_frame(),
+        AppSettings.from_env(),
+        modes=["ridge", "arima"],
+        horizon=7,
+        folds=2,
+        step=7,
+    )
+
+    assert report["backends"]["ridge"]["status"] == "ok"
+    assert report["backends"]["arima"]["status"] == "error"
+    assert report["ranking_by_mae"] == ["ridge"]
+
+
+def test_backtest_cli_writes_json_report(tmp_path: Path):
+    data_file = tmp_path / "basedadosseguranca.csv"
+    rows = "".join(
+        f"{day.strftime('%d/%m/%Y')};{3 + day.dayofweek};Motorista A;Local A;Fadiga\n"
+        for day in pd.date_range("2025-01-06", periods=42, freq="D")
+    )
+    data_file.write_text(CSV_FIXTURE.splitlines()[0] + "\n" + rows, encoding="utf-8")
+    output = tmp_path / "report.json"
+
+    main(
+        [
+            "--data-file",
+            str(data_file),
+            "--backends",
+            "mock,holt-winters",
+            "--horizon",
+            "7",
+            "--folds",
+            "2",
+            "--output",
+            str(output),
+        ]
+    )
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert set(report["backends"]) == {"mock", "holt-winters"}
+    assert report["history_end"] == "2025-02-16"
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from test_auth_and_predict import build_test_app, login
+
+
+HOURLY_CSV_FIXTURE = """Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento
+06/01/2025 08:15;2;Motorista A;Local A;Fadiga
+06/01/2025 21:47;3;Motorista B;Local A;Aceleração
+08/01/2025 08:40;4;Motorista A;Local B;Fadiga
+13/01/2025 08:05;1;Motorista C;Local B;Fadiga
+"""
+
+
+def test_training_series_is_resampled_to_calendar_days_with_zero_gaps(tmp_path: Path):
+    app = build_test_app(tmp_path, HOURLY_CSV_FIXTURE, bootstrap_prediction_date=None)
+    service = app.extensions["prediction_service"]
+    training_df = service._training_frame(service.dataset_bundle)
+
+    assert training_df["ds"].dt.strftime("%Y-%m-%d").tolist() == [
+        f"2025-01-{day:02d}" for day in range(6, 14)
+    ]
+    assert training_df["y"].tolist() == [5, 0, 4, 0, 0, 0, 0, 1]
+    assert service.dataset_bundle.analytics_cache["media_diaria_historica"] == 10 / 8
+
+
+def test_heatmap_sums_the_precomputed_hour_weekday_cube(tmp_path: Path):
+    app = build_test_app(tmp_path, HOURLY_CSV_FIXTURE, bootstrap_prediction_date=None)
+    service = app.extensions["prediction_service"]
+
+    everything = service.heatmap()
+    fatigue = service.heatmap(["Fadiga"])
+
+    assert everything["tipos_evento"] == ["Aceleração", "Fadiga"]
+    assert everything["total_eventos"] == 10
+    assert everything["matriz"][0][8] == 3
+    assert everything["matriz"][0][21] == 3
+    assert everything["total_por_dia_semana"][:3] == [6, 0, 4]
+    assert fatigue["pico"] == {"dia_semana": "quarta", "hora": 8, "eventos": 4}
+
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'gestor@radar.local', 'Gestor123!')}"}
+    fatigue_route = client.get("/heatmap?tipo_evento=Fadiga", headers=headers)
+    assert fatigue_route.get_json()["total_eventos"] == 7
+    assert client.get("/heatmap?tipo_evento=Chuva", headers=headers).status_code == 400
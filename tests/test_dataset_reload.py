@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+from test_auth_and_predict import CSV_FIXTURE, build_test_app, login
+from test_prediction_filters import FLEET_CSV_FIXTURE
+
+from radar_preventivo.services import DatasetWatcher
+from radar_preventivo.services import prediction_service as prediction_service_module
+from radar_preventivo.services.filter_index import build_filter_index
+
+
+EXTRA_ROWS = "06/01/2025;9;Motorista D;Local D;Fadiga\n"
+
+
+def append_rows(data_file: Path, rows: str) -> None:
+    data_file.write_text(CSV_FIXTURE + rows, encoding="utf-8")
+    stat = data_file.stat()
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_admin_reload_swaps_dataset_bundle(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    client = app.test_client()
+    token = login(client, "admin@radar.local", "Admin123!")
+    headers = {"Authorization": f"Bearer {token}"}
+    previous_bundle = app.extensions["prediction_service"].dataset_bundle
+
+    append_rows(tmp_path / "basedadosseguranca.csv", EXTRA_ROWS)
+    response = client.post("/admin/reload", headers=headers)
+
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["records_loaded"] == 6
+    assert payload["previous_dataset_version"] == previous_bundle.version
+    assert payload["dataset_version"] != previous_bundle.version
+    assert previous_bundle.analytics_cache["total_registros"] == 5
+    assert client.get("/health").get_json()["records_loaded"] == 6
+
+
+def test_admin_reload_requires_admin_role(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    client = app.test_client()
+    token = login(client, "gestor@radar.local", "Gestor123!")
+
+    response = client.post("/admin/reload", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 403
+
+
+def test_watcher_reloads_after_signature_is_stable(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    watcher = DatasetWatcher(service, poll_seconds=1)
+
+    assert watcher.check_once() is False
+
+    append_rows(tmp_path / "basedadosseguranca.csv", EXTRA_ROWS)
+
+    assert watcher.check_once() is False
+    assert watcher.check_once() is True
+    assert service.dataset_bundle.analytics_cache["total_registros"] == 6
+    assert watcher.check_once() is False
+
+
+def test_watcher_keeps_current_bundle_when_reload_fails(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    watcher = DatasetWatcher(service, poll_seconds=1)
+    current_bundle = service.dataset_bundle
+
+    (tmp_path / "basedadosseguranca.csv").write_text("Data;QUANTIDADE\nsem-data;1\n", encoding="utf-8")
+
+    assert watcher.check_once() is False
+    assert watcher.check_once() is False
+    assert service.dataset_bundle is current_bundle
+
+
+INGEST_BATCH = """Id;Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento
+n1;06/01/2025 08:15;9;Motorista D;Local A;Fadiga
+n2;06/01/2025 09:40;2;Motorista A;Local C;Aceleração
+n2;06/01/2025 09:40;2;Motorista A;Local C;Aceleração
+"""
+
+
+def test_admin_ingest_updates_aggregates_incrementally(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    client = app.test_client()
+    token = login(client, "admin@radar.local", "Admin123!")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "text/csv"}
+    service = app.extensions["prediction_service"]
+
+    response = client.post("/admin/ingest", data=INGEST_BATCH, headers=headers)
+    repeated = client.post("/admin/ingest", data=INGEST_BATCH, headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["ingested"] == 2
+    assert response.get_json()["duplicates"] == 1
+    assert repeated.get_json()["ingested"] == 0
+    assert repeated.get_json()["dataset_version"] == response.get_json()["dataset_version"]
+
+    incremental = service.dataset_bundle.analytics_cache
+    rebuilt = service._build_analytics(service.dataset_bundle.dados, [])
+    for key in ("driver_totals", "location_totals", "event_totals", "aggregated"):
+        assert incremental[key].to_dict("records") == rebuilt[key].to_dict("records")
+    assert incremental["event_hour_cube"].values.tolist() == (
+        rebuilt["event_hour_cube"].values.tolist()
+    )
+    assert incremental["total_registros"] == 7
+    assert incremental["motoristas_monitorados"] == 4
+    assert incremental["event_driver_shares"]["Fadiga"].labels == ["Motorista B", "Motorista D"]
+
+
+def test_admin_ingest_accepts_jsonl_and_rejects_batches_without_id(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    client = app.test_client()
+    token = login(client, "admin@radar.local", "Admin123!")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+
+    accepted = client.post(
+        "/admin/ingest",
+        data='{"Id": "j1", "Data": "2025-01-06 10:00", "QUANTIDADE": 3, "Motorista": "Motorista A",'
+        ' "Localidade": "Local A", "Tipo de Evento": "Fadiga"}\n',
+        headers=headers,
+    )
+    rejected = client.post(
+        "/admin/ingest",
+        data='{"Data": "2025-01-06 10:00", "QUANTIDADE": 3}\n',
+        headers=headers,
+    )
+
+    assert accepted.status_code == 200
+    assert accepted.get_json()["records_loaded"] == 6
+    assert rejected.status_code == 422
+
+
+def test_admin_ingest_keeps_filter_columns_missing_from_the_batch(tmp_path: Path):
+    app = build_test_app(tmp_path, FLEET_CSV_FIXTURE)
+    client = app.test_client()
+    token = login(client, "admin@radar.local", "Admin123!")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "text/csv"}
+    service = app.extensions["prediction_service"]
+
+    response = client.post(
+        "/admin/ingest",
+        data="Id;Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento\n"
+        "f1;06/01/2025 08:00;3;Motorista A;Local A;Fadiga\n",
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.get_json()["ingested"] == 1
+    dados = service.dataset_bundle.dados
+    assert dados["Frota"].cat.categories.tolist() == ["100", "200", "300", "Nao informado"]
+    filter_index = service.dataset_bundle.filter_index
+    assert filter_index.select_rows((("frota", ("Nao informado",)),)).tolist() == [6]
+    assert filter_index.select_rows((("empresa", ("Empresa X",)),)).size == 4
+
+
+def test_ingest_extends_indexes_and_ranking_windows_like_a_rebuild(tmp_path: Path, monkeypatch):
+    app = build_test_app(tmp_path, FLEET_CSV_FIXTURE)
+    service = app.extensions["prediction_service"]
+    batch = service.dataset_repository.parse_event_batch(
+        "Id;Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento;Empresa;Frota;Turno\n"
+        "r1;05/01/2025 18:00;2;Motorista D;Local A;Fadiga;Empresa Z;100;Tarde\n"
+        "r2;09/01/2025 07:00;3;Motorista A;Local D;Aceleração;Empresa X;400;Manha\n",
+        content_type="text/csv",
+    )
+    monkeypatch.setattr(prediction_service_module, "build_filter_index", None)
+    monkeypatch.setattr(prediction_service_module, "build_spatial_index", None)
+
+    service.ingest_events(batch)
+
+    bundle = service.dataset_bundle
+    rebuilt_index = build_filter_index(bundle.dados)
+    for key, dimension in rebuilt_index.dimensions.items():
+        extended = bundle.filter_index.dimensions[key]
+        for label in dimension.codes:
+            assert extended.rows_for((label,)).tolist() == dimension.rows_for((label,)).tolist()
+            assert extended.daily_for((label,)).tolist() == dimension.daily_for((label,)).tolist()
+    assert bundle.filter_index.daily_total.tolist() == rebuilt_index.daily_total.tolist()
+    assert bundle.event_id_hashes.tolist() == sorted(bundle.event_id_hashes.tolist())
+
+    rebuilt_views = service._build_analytics(bundle.dados, bundle.dismissed_drivers)["ranking_views"]
+    for view, ranking in bundle.analytics_cache["ranking_views"].items():
+        expected = rebuilt_views[view]
+        assert ranking["total_eventos_historicos"] == pytest.approx(
+            expected["total_eventos_historicos"]
+        )
+        assert ranking["driver_totals"].set_index("Motorista")["QUANTIDADE"].to_dict() == (
+            pytest.approx(expected["driver_totals"].set_index("Motorista")["QUANTIDADE"].to_dict())
+        )
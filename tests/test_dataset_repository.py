@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from radar_preventivo.config import AppSettings
+from radar_preventivo.repositories.dataset_repository import CsvDatasetRepository
+from radar_preventivo.repositories.dataset_snapshot import DatasetSnapshotStore
+
+
+WIDE_CSV_FIXTURE = """Id;Empresa;Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento;Criticidade;RPM médio
+a1;Empresa X;13/04/2025 21:47;5;Motorista A;Local A;Aceleração;Grave;1200
+a2;Empresa X;14/04/2025 03:06;2;;Local B;Fadiga;Médio;1300
+a3;Empresa X;15/04/2025;4;Motorista B;Local A;Fadiga;Grave;1100
+"""
+
+
+def build_repository(tmp_path: Path, content: str, **overrides) -> CsvDatasetRepository:
+    data_file = tmp_path / "basedadosseguranca.csv"
+    data_file.write_text(content, encoding="utf-8")
+    settings = AppSettings.from_env().with_overrides({"data_file": data_file, **overrides})
+    return CsvDatasetRepository(settings)
+
+
+def test_load_events_reads_only_used_columns_with_categorical_dimensions(tmp_path: Path):
+    repository = build_repository(tmp_path, WIDE_CSV_FIXTURE)
+
+    raw_df = repository.load_events()
+    prepared = repository.prepare_events(raw_df)
+
+    assert list(raw_df.columns) == [
+        "Id",
+        "Empresa",
+        "Data",
+        "QUANTIDADE",
+        "Motorista",
+        "Localidade",
+        "Tipo de Evento",
+        "Criticidade",
+    ]
+    assert isinstance(prepared["Motorista"].dtype, pd.CategoricalDtype)
+    assert prepared["Data"].tolist() == [
+        pd.Timestamp("2025-04-13 21:47"),
+        pd.Timestamp("2025-04-14 03:06"),
+        pd.Timestamp("2025-04-15"),
+    ]
+    assert prepared["Motorista"].isna().sum() == 0
+
+
+def test_load_events_full_mode_keeps_every_column(tmp_path: Path):
+    repository = build_repository(tmp_path, WIDE_CSV_FIXTURE, dataset_load_mode="full")
+
+    assert "RPM médio" in repository.load_events().columns
+
+
+def test_load_events_falls_back_to_full_read_for_unknown_layouts(tmp_path: Path):
+    repository = build_repository(tmp_path, "Dia;Total\n01/01/2025;3\n")
+
+    assert list(repository.load_events().columns) == ["Dia", "Total"]
+
+
+def test_load_prepared_events_reuses_snapshot_until_source_changes(tmp_path: Path, monkeypatch):
+    repository = build_repository(tmp_path, WIDE_CSV_FIXTURE)
+    expected = repository.load_prepared_events()
+
+    def fail_if_csv_is_parsed():
+        raise AssertionError("CSV nao deveria ser relido com snapshot valido.")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(repository, "load_events", fail_if_csv_is_parsed)
+        from_snapshot = repository.load_prepared_events()
+
+    pd.testing.assert_frame_equal(from_snapshot, expected)
+
+    repository.settings.data_file.write_text(
+        WIDE_CSV_FIXTURE + "a4;Empresa X;16/04/2025 08:00;1;Motorista C;Local C;Fadiga;Leve;900\n",
+        encoding="utf-8",
+    )
+    assert len(repository.load_prepared_events()) == 4
+
+
+def test_failed_snapshot_write_leaves_no_temporary_file(tmp_path: Path, monkeypatch):
+    repository = build_repository(tmp_path, WIDE_CSV_FIXTURE)
+    snapshot_store = DatasetSnapshotStore(tmp_path / "snapshots")
+    frame = repository.prepare_events(repository.load_events())
+
+    def fail_midway(handle, **arrays):
+        handle.write(b"parcial")
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(np, "savez", fail_midway)
+
+    assert snapshot_store.save(frame, repository.settings.data_file, "pruned") is None
+    assert list((tmp_path / "snapshots").iterdir()) == []
+
+
+def test_prepare_events_parses_coordinates_into_float_columns(tmp_path: Path):
+    repository = build_repository(
+        tmp_path,
+        "Data;QUANTIDADE;Lat/Long Inicial;Lat/Long Final\n"
+        "01/01/2025;1;-22.88 , -49.60;\n"
+        "02/01/2025;1;;-23.01 , -49.43\n"
+        "03/01/2025;1;0 , 0;sem sinal\n",
+    )
+
+    prepared = repository.prepare_events(repository.load_events())
+
+    assert "Lat/Long Inicial" not in prepared.columns
+    assert prepared["Latitude"].tolist()[:2] == [-22.88, -23.01]
+    assert prepared["Longitude"].tolist()[:2] == [-49.60, -49.43]
+    assert prepared.loc[2, ["Latitude", "Longitude"]].isna().all()
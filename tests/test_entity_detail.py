@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from pathlib import Path
+from urllib.parse import quote
+
+from test_auth_and_predict import build_test_app, login
+from test_prediction_filters import FLEET_CSV_FIXTURE
+
+
+def test_driver_detail_returns_paginated_series_and_mixes(tmp_path: Path):
+    service = build_test_app(tmp_path, FLEET_CSV_FIXTURE).extensions["prediction_service"]
+
+    first_page = service.entity_detail("Motorista", "Motorista A", page_size_raw="2")
+    second_page = service.entity_detail("Motorista", "Motorista A", "2", "2")
+
+    assert first_page["total_eventos"] == 13
+    assert first_page["total_registros"] == 3
+    assert (first_page["primeiro_evento"], first_page["ultimo_evento"]) == (
+        "2025-01-01",
+        "2025-01-05",
+    )
+    assert first_page["serie_diaria"]["total_paginas"] == 2
+    assert first_page["serie_diaria"]["itens"] == [
+        {"data": "2025-01-05", "total": 4},
+        {"data": "2025-01-02", "total": 4},
+    ]
+    assert second_page["serie_diaria"]["itens"] == [{"data": "2025-01-01", "total": 5}]
+    assert first_page["tipos_evento"][0] == {
+        "TipoEvento": "Fadiga",
+        "Quantidade": 8,
+        "ParticipacaoPercentual": 61.54,
+    }
+    assert [item["Criticidade"] for item in first_page["criticidade"]] == ["Grave", "Médio"]
+
+
+def test_location_detail_route_handles_unknown_names_and_bad_pages(tmp_path: Path):
+    app = build_test_app(tmp_path, FLEET_CSV_FIXTURE)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'analista@radar.local', 'Analista123!')}"}
+
+    response = client.get(f"/locations/{quote('Local C')}", headers=headers)
+    revalidated = client.get(
+        f"/locations/{quote('Local C')}",
+        headers={**headers, "If-None-Match": response.headers["ETag"]},
+    )
+    missing = client.get("/locations/Local%20Z", headers=headers)
+    bad_page = client.get("/drivers/Motorista%20A?page=0", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["tipo"] == "localidade"
+    assert response.get_json()["total_eventos"] == 10
+    assert revalidated.status_code == 304
+    assert missing.status_code == 404
+    assert bad_page.status_code == 400
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from test_auth_and_predict import build_test_app
+
+from radar_preventivo.services import hierarchical
+from radar_preventivo.services.hierarchical import build_entity_forecasts
+
+
+def trending_events(weeks: int = 8) -> pd.DataFrame:
+    dates = pd.date_range("2025-01-06", periods=7 * weeks, freq="D")
+    growth = np.linspace(1, 9, len(dates))
+    return pd.concat(
+        [
+            pd.DataFrame({"Data": dates, "Motorista": "Crescente", "QUANTIDADE": growth}),
+            pd.DataFrame({"Data": dates, "Motorista": "Decrescente", "QUANTIDADE": growth[::-1]}),
+            pd.DataFrame({"Data": dates, "Motorista": "Outro", "QUANTIDADE": 2.0}),
+        ],
+        ignore_index=True,
+    )
+
+
+def test_entity_forecasts_follow_trends_and_reconcile_to_total():
+    total_by_day = {day.date(): 20.0 for day in pd.date_range("2025-03-03", periods=7)}
+
+    forecasts = build_entity_forecasts(
+        trending_events(),
+        "Motorista",
+        labels=["Crescente", "Decrescente"],
+        total_by_day=total_by_day,
+    )
+    first_day = forecasts.for_date(pd.Timestamp("2025-03-03"))
+
+    assert forecasts.labels == ["Crescente", "Decrescente"]
+    assert forecasts.historical_volumes[0] == pytest.approx(forecasts.historical_volumes[1])
+    assert first_day[0] > first_day[1]
+    np.testing.assert_allclose(forecasts.values.sum(axis=0), 20.0 * 10 / 12, rtol=0.05)
+    assert forecasts.for_date(pd.Timestamp("2025-04-01")) is None
+
+
+def test_entity_forecasts_match_when_fitted_in_a_process_pool(monkeypatch):
+    total_by_day = {day.date(): 20.0 for day in pd.date_range("2025-03-03", periods=7)}
+    in_process = build_entity_forecasts(
+        trending_events(), "Motorista", ["Crescente", "Decrescente"], total_by_day
+    )
+
+    monkeypatch.setattr(hierarchical, "HIERARCHY_CHUNK_SIZE", 2)
+    pooled = build_entity_forecasts(
+        trending_events(), "Motorista", ["Crescente", "Decrescente"], total_by_day, max_workers=2
+    )
+
+    np.testing.assert_allclose(pooled.values, in_process.values)
+
+
+def test_predict_uses_reconciled_entity_forecasts_in_hierarchical_mode(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    service.settings.breakdown_mode = "hierarchical"
+    service._forecast_horizons.clear()
+
+    payload = service.predict_for_date("2025-01-06")
+
+    expected_by_event = [item["EventosEsperados"] for item in payload["top_tipos_evento"]]
+    assert payload["meta"]["breakdown_mode"] == "hierarchical"
+    assert sum(expected_by_event) == pytest.approx(payload["previsao_total_yhat1"], abs=0.05)
+    assert expected_by_event == sorted(expected_by_event, reverse=True)
+    assert {item["TipoEvento"] for item in payload["top_tipos_evento"]} == {
+        "Aceleração",
+        "Fadiga",
+        "Agressividade",
+    }
+
+
+def test_hierarchical_breakdowns_follow_a_reload_that_keeps_the_daily_totals(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    service.settings.breakdown_mode = "hierarchical"
+    service._forecast_horizons.clear()
+
+    def hierarchical_drivers() -> list[str]:
+        payload = service.predict_for_date("2025-01-06")
+        assert payload["meta"]["breakdown_mode"] == "hierarchical"
+        return [item["Motorista"] for item in payload["top_10_motoristas_geral"]]
+
+    previous_version = service.dataset_bundle.version
+    assert "Motorista A" in hierarchical_drivers()
+
+    (tmp_path / "motoristas_desligados.csv").write_text(
+        "Motoristas\nMotorista A\n", encoding="utf-8"
+    )
+    service.reload()
+
+    assert service.dataset_bundle.version == previous_version
+    assert "Motorista A" not in hierarchical_drivers()
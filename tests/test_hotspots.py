@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from test_auth_and_predict import build_test_app, login
+
+from radar_preventivo.services.spatial_index import (
+    build_spatial_index,
+    tile_bounds,
+    tile_coordinates,
+)
+
+
+GEO_CSV_FIXTURE = """Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento;Lat/Long Inicial;Lat/Long Final
+01/01/2025 08:00;5;Motorista A;Usina;Fadiga;-22.8803928 , -49.604093;
+01/01/2025 09:00;3;Motorista B;Usina;Fadiga;-22.8804100 , -49.604120;
+02/01/2025 10:00;2;Motorista A;Usina;Aceleração;;-22.8803500 , -49.604050
+03/01/2025 11:00;4;Motorista C;Fazenda;Fadiga;-23.0088678 , -49.4384266;
+05/01/2025 12:00;1;Motorista C;Sem GPS;Fadiga;0 , 0;
+"""
+
+
+def test_tile_bounds_contain_the_projected_point():
+    latitude, longitude = np.array([-22.8803928]), np.array([-49.604093])
+
+    x, y = tile_coordinates(latitude, longitude, 14)
+    west, south, east, north = tile_bounds(x, y, 14)[0]
+
+    assert west <= longitude[0] <= east
+    assert south <= latitude[0] <= north
+
+
+def test_hotspots_cluster_prebinned_cells_by_zoom_and_window(tmp_path: Path):
+    service = build_test_app(tmp_path, GEO_CSV_FIXTURE).extensions["prediction_service"]
+
+    regional = service.hotspots(zoom_raw="6")
+    street = service.hotspots(zoom_raw="14")
+    recent = service.hotspots(zoom_raw="14", days_raw="4")
+    framed = service.hotspots(bbox_raw="-49.7,-22.95,-49.5,-22.8", zoom_raw="14")
+
+    assert [cluster["eventos"] for cluster in regional["clusters"]] == [14]
+    assert [cluster["eventos"] for cluster in street["clusters"]] == [10, 4]
+    assert street["clusters"][0]["registros"] == 3
+    assert street["clusters"][0]["latitude"] == np.round(
+        np.mean([-22.8803928, -22.88041, -22.88035]), 6
+    )
+    assert [cluster["eventos"] for cluster in recent["clusters"]] == [4, 2]
+    assert framed["total_eventos"] == 10
+
+
+def test_hotspots_route_validates_parameters(tmp_path: Path):
+    client = build_test_app(tmp_path, GEO_CSV_FIXTURE).test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'gestor@radar.local', 'Gestor123!')}"}
+
+    response = client.get("/hotspots?zoom=12&bbox=-50,-24,-49,-22", headers=headers)
+
+    assert response.status_code == 200
+    assert response.get_json()["total_clusters"] == 2
+    assert client.get("/hotspots?zoom=30", headers=headers).status_code == 400
+    assert client.get("/hotspots?bbox=-49,-22,-50,-24", headers=headers).status_code == 400
+    assert client.get("/hotspots").status_code == 401
+
+
+def test_ingest_appends_batch_cells_to_the_spatial_index(tmp_path: Path):
+    service = build_test_app(tmp_path, GEO_CSV_FIXTURE).extensions["prediction_service"]
+    batch = service.dataset_repository.parse_event_batch(
+        "Id;Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento;Lat/Long Inicial\n"
+        "h1;05/01/2025 15:00;2;Motorista A;Usina;Fadiga;-22.8803928 , -49.604093\n"
+        "h2;07/01/2025 09:00;6;Motorista D;Porto;Fadiga;-23.9608 , -46.3336\n",
+        content_type="text/csv",
+    )
+
+    service.ingest_events(batch)
+
+    bundle = service.dataset_bundle
+    rebuilt = build_spatial_index(bundle.dados)
+    for zoom, days in ((6, None), (14, None), (14, 3)):
+        pd.testing.assert_frame_equal(
+            bundle.spatial_index.clusters(None, zoom, days).reset_index(drop=True),
+            rebuilt.clusters(None, zoom, days).reset_index(drop=True),
+        )
+    assert [cluster["eventos"] for cluster in service.hotspots(zoom_raw="14")["clusters"]] == [
+        12,
+        6,
+        4,
+    ]
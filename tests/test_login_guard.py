@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from test_auth_and_predict import build_test_app
+
+from radar_preventivo.auth.login_guard import LoginRejected, LoginThrottle, PasswordVerifier
+from radar_preventivo.auth.security import hash_password
+
+
+def test_password_verifier_runs_in_the_pool_and_rejects_when_saturated():
+    verifier = PasswordVerifier(workers=1, queue_limit=0, timeout_seconds=30)
+    password_hash = hash_password("Senha123!")
+    results: list[bool] = []
+
+    worker = threading.Thread(
+        target=lambda: results.append(verifier.verify("Senha123!", password_hash))
+    )
+    worker.start()
+    while verifier.stats()["in_flight"] == 0:
+        time.sleep(0.01)
+
+    with pytest.raises(LoginRejected) as rejected:
+        verifier.verify("Senha123!", password_hash)
+    worker.join()
+
+    assert rejected.value.status_code == 429
+    assert results == [True]
+    assert verifier.verify("errada", password_hash) is False
+    assert verifier.stats() == {"workers": 1, "queue_limit": 0, "in_flight": 0, "rejected": 1}
+
+
+def test_login_throttle_counts_failures_per_key_inside_the_window():
+    throttle = LoginThrottle(window_seconds=60)
+    for _ in range(3):
+        throttle.record_failure(["email:a", "ip:1"])
+
+    throttle.check({"email:a": 4, "ip:1": 4})
+    with pytest.raises(LoginRejected) as rejected:
+        throttle.check({"email:b": 3, "ip:1": 3})
+    assert 1 <= rejected.value.retry_after <= 60
+
+    throttle.reset("ip:1")
+    throttle.check({"email:b": 3, "ip:1": 3})
+
+
+def test_login_route_returns_429_after_repeated_failures(tmp_path: Path):
+    client = build_test_app(tmp_path).test_client()
+    credentials = {"email": "gestor@radar.local", "password": "errada"}
+
+    statuses = [client.post("/auth/login", json=credentials).status_code for _ in range(5)]
+    throttled = client.post(
+        "/auth/login",
+        json={"email": "gestor@radar.local", "password": "Gestor123!"},
+    )
+    other_user = client.post(
+        "/auth/login",
+        json={"email": "analista@radar.local", "password": "Analista123!"},
+    )
+
+    assert statuses == [401] * 5
+    assert throttled.status_code == 429
+    assert int(throttled.headers["Retry-After"]) > 0
+    assert other_user.status_code == 200
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+from radar_preventivo.services.model_store import ModelStore
+from radar_preventivo.services.predictors import NeuralProphetPredictorBackend
+
+
+class FakeForecaster:
+    def __init__(self, level: float) -> None:
+        self.level = level
+
+    def make_future_dataframe(self, df: pd.DataFrame, periods: int) -> pd.DataFrame:
+        future_dates = pd.date_range(df["ds"].max() + pd.Timedelta(days=1), periods=periods)
+        return pd.DataFrame({"ds": future_dates})
+
+    def predict(self, future_df: pd.DataFrame) -> pd.DataFrame:
+        return future_df.assign(yhat1=self.level)
+
+
+class FakeNeuralProphetBackend(NeuralProphetPredictorBackend):
+    def __init__(self, model_store: ModelStore) -> None:
+        super().__init__(model_store=model_store)
+        self.fit_calls = 0
+
+    def _fit_model(self, training_df: pd.DataFrame):
+        self.fit_calls += 1
+        return FakeForecaster(float(training_df["y"].mean()))
+
+
+def build_store(tmp_path: Path) -> ModelStore:
+    return ModelStore(
+        directory=tmp_path / "models",
+        dump=lambda model, model_file: model_file.write_bytes(pickle.dumps(model)),
+        load=lambda model_file: pickle.loads(model_file.read_bytes()),
+    )
+
+
+def training_frame(values: list[float]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"ds": pd.date_range("2025-01-01", periods=len(values)), "y": values}
+    )
+
+
+def test_fitted_model_is_reused_by_a_new_backend_instance(tmp_path: Path):
+    training_df = training_frame([3, 4, 5])
+    first_backend = FakeNeuralProphetBackend(build_store(tmp_path))
+    first_backend.ensure_trained(training_df, wait=True)
+
+    restarted_backend = FakeNeuralProphetBackend(build_store(tmp_path))
+    assert restarted_backend.warmup(training_df) is True
+    forecast = restarted_backend.forecast(training_df, periods=2)
+
+    assert first_backend.fit_calls == 1
+    assert restarted_backend.fit_calls == 0
+    assert forecast["yhat1"].tolist() == [4.0, 4.0]
+
+
+def test_model_key_changes_with_training_series(tmp_path: Path):
+    backend = FakeNeuralProphetBackend(build_store(tmp_path))
+    backend.ensure_trained(training_frame([3, 4, 5]), wait=True)
+
+    assert backend.warmup(training_frame([3, 4, 6])) is False
+    backend.ensure_trained(training_frame([3, 4, 6]), wait=True)
+
+    assert backend.fit_calls == 2
+    assert len(list((tmp_path / "models").glob("*.model"))) == 2
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from test_auth_and_predict import build_test_app
+from test_model_store import FakeForecaster, FakeNeuralProphetBackend, build_store, training_frame
+
+from radar_preventivo import prepare_worker
+
+
+class GatedNeuralProphetBackend(FakeNeuralProphetBackend):
+    def __init__(self, model_store) -> None:
+        super().__init__(model_store)
+        self.release_training = threading.Event()
+
+    def _fit_model(self, training_df):
+        self.release_training.wait(timeout=5)
+        return super()._fit_model(training_df)
+
+
+def test_concurrent_forecasts_share_a_single_background_training(tmp_path: Path):
+    backend = GatedNeuralProphetBackend(build_store(tmp_path))
+    training_df = training_frame([3, 4, 5])
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        forecasts = list(pool.map(lambda _: backend.forecast(training_df, periods=2), range(4)))
+
+    assert all(forecast.attrs["provisional"] for forecast in forecasts)
+    assert backend.training_state()["state"] == "training"
+
+    backend.release_training.set()
+    backend.ensure_trained(training_df, wait=True)
+
+    assert backend.fit_calls == 1
+    assert backend.training_state()["model_ready"] is True
+    assert "provisional" not in backend.forecast(training_df, periods=2).attrs
+
+
+def test_provisional_forecast_uses_last_good_model(tmp_path: Path):
+    backend = GatedNeuralProphetBackend(build_store(tmp_path))
+    backend.release_training.set()
+    backend.ensure_trained(training_frame([3, 4, 5]), wait=True)
+    backend.release_training.clear()
+
+    forecast = backend.forecast(training_frame([3, 4, 5, 9]), periods=2)
+
+    assert forecast.attrs["provisional"] is True
+    assert forecast.attrs["source"].endswith("modelo-anterior")
+    assert forecast["yhat1"].tolist() == [4.0, 4.0]
+    backend.release_training.set()
+
+
+def test_predict_marks_provisional_forecasts_until_training_finishes(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    backend = GatedNeuralProphetBackend(build_store(tmp_path))
+    service.predictor_backend = backend
+    service._forecast_horizons.clear()
+
+    provisional = service.predict_for_date("2025-01-06")
+    health = service.health_payload()
+
+    assert provisional["meta"]["provisional"] is True
+    assert provisional["meta"]["forecast_source"] == "mock-moving-average"
+    assert health["model_ready"] is False
+    assert health["model_training"]["state"] == "training"
+
+    backend.release_training.set()
+    backend.ensure_trained(service._training_frame(service.dataset_bundle), wait=True)
+    final = service.predict_for_date("2025-01-06")
+
+    assert final["meta"]["provisional"] is False
+    assert final["previsao_total_yhat1"] == round(FakeForecaster(5.0).level, 2)
+    assert service.health_payload()["model_ready"] is True
+
+
+def test_preload_trains_before_fork_and_workers_reuse_the_model(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    backend = GatedNeuralProphetBackend(build_store(tmp_path))
+    backend.release_training.set()
+    service.predictor_backend = backend
+    service.settings.preload_app = True
+    service._forecast_horizons.clear()
+
+    service.initialize()
+    prepare_worker(app)
+    payload = service.predict_for_date("2025-01-06")
+
+    assert payload["meta"]["provisional"] is False
+    assert backend.fit_calls == 1
+    assert backend.training_state()["model_ready"] is True
+
+
+def test_training_executor_inherited_from_another_process_is_replaced(tmp_path: Path):
+    backend = GatedNeuralProphetBackend(build_store(tmp_path))
+    backend.forecast(training_frame([3, 4, 5]), periods=2)
+    inherited_future = backend._training_future
+
+    backend._executor_pid = -1
+    backend.ensure_trained(training_frame([3, 4, 5]))
+    restarted_future = backend._training_future
+    backend.release_training.set()
+    restarted_future.result(timeout=5)
+
+    assert restarted_future is not inherited_future
+    assert backend.training_state()["model_ready"] is True
+
+
+class FlakyNeuralProphetBackend(FakeNeuralProphetBackend):
+    def __init__(self, model_store) -> None:
+        super().__init__(model_store)
+        self.failures_left = 1
+
+    def _fit_model(self, training_df):
+        if self.failures_left:
+            self.failures_left -= 1
+            raise RuntimeError("falha simulada no ajuste")
+        return super()._fit_model(training_df)
+
+
+def test_failed_training_is_retried_after_the_backoff(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    backend = FlakyNeuralProphetBackend(build_store(tmp_path))
+    service.predictor_backend = backend
+    service._forecast_horizons.clear()
+    training_df = service._training_frame(service.dataset_bundle)
+
+    assert service.predict_for_date("2025-01-06")["meta"]["provisional"] is True
+    assert backend.ensure_trained(training_df, wait=True) is False
+    service.predict_for_date("2025-01-06")
+    assert service.health_payload()["model_training"]["state"] == "failed"
+
+    backend.retry_after_failure_seconds = 0.0
+    assert service.predict_for_date("2025-01-06")["meta"]["provisional"] is True
+    assert service.health_payload()["model_training"]["state"] != "failed"
+    assert backend.ensure_trained(training_df, wait=True) is True
+    final = service.predict_for_date("2025-01-06")
+
+    assert backend.fit_calls == 1
+    assert final["meta"]["provisional"] is False
+    assert service.health_payload()["model_training"]["state"] == "ready"
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from test_auth_and_predict import build_test_app
+
+from radar_preventivo.services.predictors import MockPredictorBackend
+from radar_preventivo.services.response_cache import ResponseCache
+
+
+class CountingPredictorBackend(MockPredictorBackend):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def forecast(self, training_df, periods):
+        self.calls += 1
+        return super().forecast(training_df, periods)
+
+
+def test_forecast_horizon_is_computed_once_per_dataset_version(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    backend = CountingPredictorBackend()
+    service.predictor_backend = backend
+    service._forecast_horizons.clear()
+
+    first = service.predict_for_date("2025-01-06")
+    second = service.predict_for_date("2025-01-20")
+    repeated = service.predict_for_date("2025-01-06")
+
+    assert backend.calls == 1
+    assert first == repeated
+    assert second["data_previsao"] == "2025-01-20"
+
+    service.dataset_bundle.version = "nova-versao"
+    service.predict_for_date("2025-01-06")
+
+    assert backend.calls == 2
+
+
+def test_predict_response_cache_reuses_serialized_body(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    serialized_payloads = []
+
+    def serializer(payload):
+        serialized_payloads.append(payload)
+        return str(payload)
+
+    first = service.predict_response("2025-01-06", serializer=serializer)
+    second = service.predict_response("2025-01-06", serializer=serializer)
+
+    assert first is second
+    assert len(serialized_payloads) == 1
+    stats = service.response_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_response_cache_evicts_least_recently_used_entries():
+    cache = ResponseCache(max_entries=2)
+    cache.get_or_create("a", lambda: b"a")
+    cache.get_or_create("b", lambda: b"b")
+    cache.get_or_create("a", lambda: b"a")
+    cache.get_or_create("c", lambda: b"c")
+
+    assert cache.get_or_create("a", lambda: b"novo-a").body == b"a"
+    assert cache.get_or_create("b", lambda: b"novo-b").body == b"novo-b"
+    assert cache.stats()["evictions"] == 2
+
+
+def test_event_breakdown_is_served_from_precomputed_shares(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    service.dataset_bundle.dados = service.dataset_bundle.dados.iloc[0:0]
+
+    payload = service.predict_for_date("2025-01-06")
+    breakdown = payload["probabilidade_eventos_especificos"]
+
+    assert [item["Motorista"] for item in breakdown["Aceleração"]] == ["Motorista A"]
+    assert breakdown["Fadiga"][0]["ParticipacaoNoEventoPercentual"] == 100.0
+    expected_events = [item["EventosEsperados"] for items in breakdown.values() for item in items]
+    assert sum(expected_events) == pytest.approx(payload["previsao_total_yhat1"], abs=0.05)
+
+
+def test_stale_miss_finished_after_reload_is_not_served(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    old_version = service.dataset_bundle.version
+
+    def driver_names(payload):
+        return str([item["Motorista"] for item in payload["top_10_motoristas_geral"]])
+
+    def reload_mid_build(payload):
+        # So a lista de desligados muda: a versao (hash dos totais diarios) continua igual.
+        (tmp_path / "motoristas_desligados.csv").write_text(
+            "Motoristas\nMotorista A\n", encoding="utf-8"
+        )
+        service.reload()
+        return driver_names(payload)
+
+    stale = service.predict_response("2025-01-06", serializer=reload_mid_build)
+    fresh = service.predict_response("2025-01-06", serializer=driver_names)
+
+    assert service.dataset_bundle.version == old_version
+    assert "Motorista A" in stale.body.decode()
+    assert "Motorista A" not in fresh.body.decode()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from test_auth_and_predict import build_test_app, login
+
+
+FLEET_CSV_FIXTURE = """Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento;Empresa;Frota;Turno;Criticidade
+01/01/2025 08:00;5;Motorista A;Local A;Aceleração;Empresa X;100;Manha;Grave
+01/01/2025 14:00;2;Motorista B;Local B;Fadiga;Empresa Y;200;;Médio
+02/01/2025 09:00;4;Motorista A;Local A;Fadiga;Empresa X;100;Manha;Médio
+03/01/2025 22:00;6;Motorista C;Local C;Aceleração;Empresa X;300;Noite;Grave
+04/01/2025 10:00;3;Motorista B;Local B;Aceleração;Empresa Y;200;Manha;Grave
+05/01/2025 16:00;4;Motorista A;Local C;Fadiga;Empresa X;100;Noite;Grave
+"""
+
+
+def test_filter_index_matches_a_full_scan(tmp_path: Path):
+    service = build_test_app(tmp_path, FLEET_CSV_FIXTURE).extensions["prediction_service"]
+    bundle = service.dataset_bundle
+    filters = (("empresa", ("Empresa X",)), ("turno", ("Noite",)))
+
+    rows = bundle.filter_index.select_rows(filters)
+    scanned = bundle.dados.index[
+        (bundle.dados["Empresa"] == "Empresa X") & (bundle.dados["Turno"] == "Noite")
+    ]
+
+    assert rows.tolist() == scanned.tolist()
+    assert set(bundle.filter_index.dimensions["turno"].codes) == {
+        "Manha",
+        "Noite",
+        "Nao informado",
+    }
+    assert bundle.filter_index.daily_totals((("frota", ("100",)),), rows).tolist() == [
+        5.0,
+        4.0,
+        0.0,
+        0.0,
+        4.0,
+    ]
+
+
+def test_filtered_prediction_uses_the_subset_rankings_and_share(tmp_path: Path):
+    service = build_test_app(tmp_path, FLEET_CSV_FIXTURE).extensions["prediction_service"]
+    overall = service.predict_for_date("2025-01-06")
+
+    payload = service.predict_for_date("2025-01-06", filters_raw={"empresa": ["Empresa X"]})
+
+    assert payload["meta"]["filters"] == {"empresa": ["Empresa X"]}
+    assert payload["meta"]["filter_share"] == pytest.approx(19 / 24)
+    assert payload["previsao_total_yhat1"] == pytest.approx(
+        overall["previsao_total_yhat1"] * 19 / 24, abs=0.01
+    )
+    assert payload["dataset_contexto"]["total_registros"] == 4
+    assert payload["dataset_contexto"]["total_eventos_historicos"] == 19
+    assert [item["Motorista"] for item in payload["top_10_motoristas_geral"]] == [
+        "Motorista A",
+        "Motorista C",
+    ]
+    fatigue_leader = payload["probabilidade_eventos_especificos"]["Fadiga"][0]
+    assert (fatigue_leader["Motorista"], fatigue_leader["VolumeHistorico"]) == ("Motorista A", 8)
+
+
+def test_predict_route_validates_filters_and_caches_each_view(tmp_path: Path):
+    app = build_test_app(tmp_path, FLEET_CSV_FIXTURE)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'gestor@radar.local', 'Gestor123!')}"}
+
+    fleet = client.get("/predict?frota=100&frota=300", headers=headers)
+    unknown_value = client.get("/predict?frota=999", headers=headers)
+    empty_subset = client.get("/predict?frota=300&turno=Manha", headers=headers)
+    overall = client.get("/predict", headers=headers)
+
+    assert fleet.status_code == 200
+    assert fleet.get_json()["meta"]["filters"] == {"frota": ["100", "300"]}
+    assert fleet.get_json()["dataset_contexto"]["total_eventos_historicos"] == 19
+    assert fleet.headers["ETag"] != overall.headers["ETag"]
+    assert unknown_value.status_code == 400
+    assert empty_subset.status_code == 404
+    assert overall.get_json()["meta"]["filters"] == {}
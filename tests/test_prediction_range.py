@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from test_auth_and_predict import build_test_app, login
+
+
+def auth_headers(client) -> dict[str, str]:
+    return {"Authorization": f"Bearer {login(client, 'analista@radar.local', 'Analista123!')}"}
+
+
+def test_predict_range_returns_daily_totals_and_shared_rankings(tmp_path: Path):
+    client = build_test_app(tmp_path).test_client()
+    headers = auth_headers(client)
+
+    response = client.get("/predict/range?start=2025-01-06&end=2025-01-12", headers=headers)
+    single_day = client.get("/predict?date=2025-01-08", headers=headers).get_json()
+
+    assert response.status_code == 200
+    assert response.headers["ETag"]
+    payload = response.get_json()
+    assert payload["dias"] == 7
+    assert [item["data"] for item in payload["previsoes_diarias"]][:2] == [
+        "2025-01-06",
+        "2025-01-07",
+    ]
+    assert payload["previsoes_diarias"][2]["previsao_total_yhat1"] == (
+        single_day["previsao_total_yhat1"]
+    )
+    total = sum(item["previsao_total_yhat1"] for item in payload["previsoes_diarias"])
+    assert payload["previsao_total_periodo"] == pytest.approx(total, abs=0.05)
+    expected_by_event = sum(item["EventosEsperados"] for item in payload["top_tipos_evento"])
+    assert expected_by_event == pytest.approx(payload["previsao_total_periodo"], abs=0.05)
+
+
+def test_predict_range_accepts_date_list_and_streams_ndjson(tmp_path: Path):
+    client = build_test_app(tmp_path).test_client()
+
+    response = client.post(
+        "/predict/range?format=ndjson",
+        json={"dates": ["2025-01-09", "2025-01-06", "2025-01-09"]},
+        headers=auth_headers(client),
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[0]["tipo"] == "resumo"
+    assert [line["data"] for line in lines[1:]] == ["2025-01-06", "2025-01-09"]
+
+
+def test_predict_range_validates_dates(tmp_path: Path):
+    client = build_test_app(tmp_path).test_client()
+    headers = auth_headers(client)
+
+    reversed_range = client.get("/predict/range?start=2025-01-10&end=2025-01-06", headers=headers)
+    outside_horizon = client.get(
+        "/predict/range?start=2025-01-06&end=2025-06-30",
+        headers=headers,
+    )
+    invalid_list = client.post("/predict/range", json={"dates": ["06/01/2025"]}, headers=headers)
+    list_body = client.post("/predict/range", json=["2025-01-06"], headers=headers)
+    string_body = client.post("/predict/range", json="2025-01-06", headers=headers)
+
+    assert reversed_range.status_code == 400
+    assert outside_horizon.status_code == 404
+    assert invalid_list.status_code == 400
+    assert list_body.status_code == 400
+    assert string_body.get_json() == {"error": "Envie um objeto JSON com a lista 'dates'."}
+    assert client.get("/predict/range").status_code == 401
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from test_auth_and_predict import build_test_app, login
+
+from radar_preventivo.config import AppSettings
+from radar_preventivo.services.predictors import (
+    HoltWintersPredictorBackend,
+    RidgeTrendPredictorBackend,
+    SeasonalNaivePredictorBackend,
+    build_predictor_backend,
+)
+
+
+WEEKLY_PATTERN = [10.0, 12.0, 14.0, 16.0, 18.0, 4.0, 2.0]
+
+
+def weekly_training_frame(weeks: int = 8) -> pd.DataFrame:
+    dates = pd.date_range("2025-01-06", periods=7 * weeks, freq="D")
+    return pd.DataFrame({"ds": dates, "y": WEEKLY_PATTERN * weeks})
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [SeasonalNaivePredictorBackend(), HoltWintersPredictorBackend(), RidgeTrendPredictorBackend()],
+)
+def test_statistical_backends_follow_the_weekly_profile(backend):
+    forecast = backend.forecast(weekly_training_frame(), periods=14)
+
+    assert forecast["ds"].iloc[0] == pd.Timestamp("2025-03-03")
+    assert len(forecast) == 14
+    np.testing.assert_allclose(forecast["yhat1"], WEEKLY_PATTERN * 2, atol=1.0)
+
+
+def test_statistical_backends_sum_events_per_calendar_day_and_fill_gaps():
+    training_df = pd.DataFrame(
+        {
+            "ds": pd.to_datetime(["2025-01-01 08:00", "2025-01-01 17:30", "2025-01-03 09:00"]),
+            "y": [2, 3, 4],
+        }
+    )
+
+    first_day, values = SeasonalNaivePredictorBackend._daily_history(training_df)
+
+    assert first_day == np.datetime64("2025-01-01")
+    assert values.tolist() == [5.0, 0.0, 4.0]
+
+
+def test_predictor_mode_selects_backend_from_registry():
+    settings = AppSettings.from_env()
+
+    assert isinstance(
+        build_predictor_backend(settings.with_overrides({"predictor_mode": "holt-winters"})),
+        HoltWintersPredictorBackend,
+    )
+    with pytest.raises(ValueError, match="desconhecido"):
+        build_predictor_backend(settings.with_overrides({"predictor_mode": "arima"}))
+
+
+def test_predict_with_lightweight_backend(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    service = app.extensions["prediction_service"]
+    service.settings.predictor_mode = "seasonal-naive"
+    service.predictor_backend = build_predictor_backend(service.settings)
+    service._forecast_horizons.clear()
+    client = app.test_client()
+    token = login(client, "gestor@radar.local", "Gestor123!")
+
+    response = client.get("/predict?date=2025-01-06", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.get_json()["meta"]["backend"] == "seasonal-naive"
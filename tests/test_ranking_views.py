@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from test_auth_and_predict import build_test_app, login
+
+
+SPIKE_CSV_FIXTURE = """Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento
+01/01/2025;40;Motorista Antigo;Local A;Fadiga
+20/03/2025;3;Motorista Recente;Local B;Aceleração
+24/03/2025;5;Motorista Recente;Local B;Aceleração
+25/03/2025;1;Motorista Antigo;Local A;Fadiga
+"""
+
+
+def test_windowed_and_decayed_views_rank_recent_activity_first(tmp_path: Path):
+    app = build_test_app(tmp_path, SPIKE_CSV_FIXTURE, bootstrap_prediction_date=None)
+    service = app.extensions["prediction_service"]
+    views = service.dataset_bundle.analytics_cache["ranking_views"]
+
+    assert list(views) == ["7d", "30d", "90d", "decay"]
+    assert views["7d"]["driver_totals"].to_dict("records") == [
+        {"Motorista": "Motorista Recente", "QUANTIDADE": 8},
+        {"Motorista": "Motorista Antigo", "QUANTIDADE": 1},
+    ]
+    assert views["90d"]["total_eventos_historicos"] == 49
+    assert views["decay"]["driver_totals"]["Motorista"].tolist()[0] == "Motorista Recente"
+    assert service.dataset_bundle.analytics_cache["driver_totals"]["Motorista"].tolist()[0] == (
+        "Motorista Antigo"
+    )
+
+
+def test_predict_selects_ranking_view_from_query_parameter(tmp_path: Path):
+    app = build_test_app(tmp_path, SPIKE_CSV_FIXTURE, bootstrap_prediction_date=None)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'gestor@radar.local', 'Gestor123!')}"}
+
+    all_time = client.get("/predict", headers=headers).get_json()
+    recent = client.get("/predict?ranking=7d", headers=headers).get_json()
+    invalid = client.get("/predict?ranking=365d", headers=headers)
+
+    assert all_time["top_10_motoristas_geral"][0]["Motorista"] == "Motorista Antigo"
+    assert recent["top_10_motoristas_geral"][0]["Motorista"] == "Motorista Recente"
+    assert recent["top_10_motoristas_geral"][0]["ParticipacaoPercentual"] == pytest.approx(88.89)
+    assert recent["meta"]["ranking"] == "7d"
+    assert recent["dataset_contexto"]["total_eventos_historicos"] == 49
+    assert invalid.status_code == 400
+
+
+def test_ingest_refreshes_ranking_windows(tmp_path: Path):
+    app = build_test_app(tmp_path, SPIKE_CSV_FIXTURE, bootstrap_prediction_date=None)
+    service = app.extensions["prediction_service"]
+    batch = service.dataset_repository.parse_event_batch(
+        "Id;Data;QUANTIDADE;Motorista;Localidade;Tipo de Evento\n"
+        "n1;05/04/2025 10:00;2;Motorista Novo;Local C;Fadiga\n",
+        content_type="text/csv",
+    )
+
+    service.ingest_events(batch)
+
+    views = service.dataset_bundle.analytics_cache["ranking_views"]
+    assert views["7d"]["driver_totals"]["Motorista"].tolist() == ["Motorista Novo"]
+
+
+def test_windowed_ranking_in_hierarchical_mode_uses_the_window_view(tmp_path: Path):
+    app = build_test_app(tmp_path, SPIKE_CSV_FIXTURE, bootstrap_prediction_date=None)
+    service = app.extensions["prediction_service"]
+    service.settings.breakdown_mode = "hierarchical"
+    service._forecast_horizons.clear()
+
+    payload = service.predict_for_date(None, ranking_raw="7d")
+
+    drivers = payload["top_10_motoristas_geral"]
+    assert payload["meta"]["breakdown_mode"] == "share"
+    assert drivers[0]["Motorista"] == "Motorista Recente"
+    assert sum(item["ParticipacaoPercentual"] for item in drivers) == pytest.approx(100, abs=0.1)
+    assert service.predict_for_date(None)["meta"]["breakdown_mode"] == "hierarchical"
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+
+from test_auth_and_predict import build_test_app, login
+
+from radar_preventivo.auth.token_cache import TokenCache
+from radar_preventivo.models import UserRecord
+
+
+USER = UserRecord(
+    id="u1",
+    name="Usuario",
+    email="u1@radar.local",
+    role="analista",
+    password_hash="hash",
+)
+
+
+def test_token_cache_expires_evicts_and_invalidates_on_user_reload():
+    cache = TokenCache(max_entries=2, ttl_seconds=300)
+    first, second, third = (cache.key_for(token) for token in ("a", "b", "c"))
+
+    cache.put(first, USER, token_expires_at=time.time() + 600, users_version=1)
+    cache.put(second, USER, token_expires_at=time.time() - 1, users_version=1)
+    assert cache.get(first, 1) is USER
+    assert cache.get(second, 1) is None
+
+    cache.put(second, USER, token_expires_at=time.time() + 600, users_version=1)
+    cache.put(third, USER, token_expires_at=time.time() + 600, users_version=1)
+    assert cache.get(first, 1) is None
+    assert cache.get(third, 2) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+    assert (stats["expirations"], stats["evictions"], stats["invalidations"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.25
+
+
+def test_verified_tokens_are_cached_until_the_user_store_changes(tmp_path: Path):
+    app = build_test_app(tmp_path)
+    auth_service = app.extensions["auth_service"]
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {login(client, 'analista@radar.local', 'Analista123!')}"}
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert auth_service.token_cache.stats()["hits"] == 1
+    assert auth_service.token_cache.stats()["entries"] == 1
+
+    # Desativar o usuario no arquivo derruba o token ja em cache.
+    users_file = auth_service.settings.auth_users_file
+    analyst = auth_service.user_repository.get_by_email("analista@radar.local")
+    users_file.write_text(
+        json.dumps(
+            [
+                {
+                    "id": analyst.id,
+                    "name": analyst.name,
+                    "email": analyst.email,
+                    "role": analyst.role,
+                    "password_hash": analyst.password_hash,
+                    "active": False,
+                }
+            ]
+        ),
+        encoding="utf-8",
+    )
+    stat = users_file.stat()
+    os.utime(users_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert client.get("/auth/me", headers=headers).status_code == 401
+    assert auth_service.token_cache.stats()["invalidations"] == 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from radar_preventivo.auth.security import hash_password, verify_password
+from radar_preventivo.config import AppSettings
+from radar_preventivo.repositories import JsonUserRepository, SqliteUserRepository
+
+
+PASSWORD_HASH = hash_password("Senha123!", iterations=1000)
+
+
+def write_users(users_file: Path, records: list[dict]) -> None:
+    users_file.write_text(json.dumps(records), encoding="utf-8")
+    stat = users_file.stat()
+    os.utime(users_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def user(user_id: str, email: str, active: bool = True) -> dict:
+    return {
+        "id": user_id,
+        "name": f"Usuario {user_id}",
+        "email": email,
+        "role": "analista",
+        "password_hash": PASSWORD_HASH,
+        "active": active,
+    }
+
+
+def build_settings(tmp_path: Path) -> AppSettings:
+    return AppSettings.from_env().with_overrides(
+        {
+            "auth_users_file": tmp_path / "auth_users.json",
+            "auth_users_db": tmp_path / "auth_users.sqlite3",
+            "allow_demo_users": False,
+        }
+    )
+
+
+def test_json_repository_indexes_users_and_reloads_when_the_file_changes(tmp_path: Path):
+    settings = build_settings(tmp_path)
+    write_users(
+        settings.auth_users_file,
+        [user("u1", "Ana@Radar.local"), user("u2", "b@radar.local", active=False)],
+    )
+    repository = JsonUserRepository(settings)
+
+    assert repository.get_by_email("  ANA@radar.local ").id == "u1"
+    assert repository.get_by_id("u1").email == "ana@radar.local"
+    assert repository.get_by_email("b@radar.local") is None
+    assert [item.id for item in repository.list_users()] == ["u1"]
+
+    write_users(
+        settings.auth_users_file,
+        [user("u1", "ana@radar.local", active=False), user("u3", "c@radar.local")],
+    )
+
+    assert repository.get_by_email("ana@radar.local") is None
+    assert repository.get_by_id("u3").email == "c@radar.local"
+
+
+def test_json_repository_keeps_previous_index_when_reload_fails(tmp_path: Path):
+    settings = build_settings(tmp_path)
+    write_users(settings.auth_users_file, [user("u1", "ana@radar.local")])
+    repository = JsonUserRepository(settings)
+    assert repository.get_by_id("u1") is not None
+
+    settings.auth_users_file.write_text("[{", encoding="utf-8")
+
+    assert repository.get_by_id("u1").email == "ana@radar.local"
+
+
+def test_sqlite_repository_imports_json_users_and_serves_the_same_interface(tmp_path: Path):
+    settings = build_settings(tmp_path)
+    write_users(
+        settings.auth_users_file,
+        [user("u1", "ana@radar.local"), user("u2", "b@radar.local", active=False)],
+    )
+
+    repository = SqliteUserRepository(settings)
+
+    assert repository.get_by_email("ANA@radar.local").id == "u1"
+    assert repository.get_by_id("u2") is None
+    assert verify_password("Senha123!", repository.get_by_id("u1").password_hash)
+    assert [item.email for item in repository.list_users()] == ["ana@radar.local"]
+    assert SqliteUserRepository(settings).get_by_id("u1") is not None